@@ -0,0 +1,713 @@
+"""
+Benchmark headless do Bunny Brave.
+
+Joga partidas completas (PLAYING -> BOSS_PRELUDE -> BOSS_FIGHT) em passo fixo,
+com `random` semeado e entrada por script, e mede quantos passos por segundo a
+lógica do jogo consegue sustentar, além do custo de cada função do loop.
+
+Uso:
+    python benchmark.py                  # 3 partidas com o bot 'fighter'
+    python benchmark.py match --runs 5 --script runner
+    python benchmark.py match --mortal   # o bot pode perder antes do chefão
+    python benchmark.py match --json
+    python benchmark.py work             # trabalho por passo (regressão)
+    python benchmark.py collision        # colisão com plataformas, 100+ entidades
+    python benchmark.py interactions     # coleta/abates em massa num único quadro
+    python benchmark.py memory           # memória por entidade, com e sem __slots__
+    python benchmark.py batched          # passo vetorizado (NumPy) contra o escalar
+    python benchmark.py render           # custo de draw() e renderizações de fonte por tela
+    python benchmark.py assets           # tempo de carga de cada recurso do manifesto
+    python benchmark.py level --level valley  # streaming dos pedaços de um nível grande
+    python benchmark.py timestep         # passo fixo com 60, 30, 20... quadros por segundo
+    python benchmark.py governor         # limites e desaceleração dos spawns sob estresse
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from engine.headless import MAX_MATCH_SECONDS, SCRIPTS, HeadlessGame
+from pgzero.rect import ZRect
+
+# Bot de cada subcomando quando --script não é dado; o 'level' precisa de um bot que atravesse o
+# nível para que os pedaços sejam descarregados e recarregados
+DEFAULT_SCRIPT = 'fighter'
+COMMAND_SCRIPTS = {'level': 'runner'}
+
+# Taxas de quadros do benchmark do passo fixo; 'irregular' sorteia o dt de cada quadro
+TIMESTEP_RATES = (60, 30, 20, 12, 6, 'irregular')
+
+# Funções do loop principal medidas na execução instrumentada
+PROFILED_FUNCTIONS = [
+    'Player.move',
+    'update_enemies',
+    'update_animations',
+    'update_player_interactions',
+    'update_entities',
+    'Flame.move',
+]
+
+class FunctionTimer:
+    """Envolve funções e métodos de game.py para medir chamadas e tempo acumulado."""
+    def __init__(self, game, names):
+        self.stats = {}
+        for name in names:
+            owner_name, _, attr = name.rpartition('.')
+            owner = getattr(game, owner_name) if owner_name else game
+            if not hasattr(owner, attr):
+                continue
+            self.stats[name] = [0, 0.0]
+            setattr(owner, attr, self._wrap(getattr(owner, attr), self.stats[name]))
+    @staticmethod
+    def _wrap(func, stats):
+        perf_counter = time.perf_counter
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats[0] += 1
+                stats[1] += perf_counter() - start
+        return timed
+
+def run_match(runner):
+    """Joga uma partida medindo o tempo de cada passo por estado do jogo."""
+    runner.start_match()
+    game = runner.game
+    max_ticks = int(MAX_MATCH_SECONDS / runner.dt)
+    # A máquina de estados mede o update() de cada estado
+    game.states.reset_timings()
+    peak_enemies = 0
+    while not runner.finished() and runner.tick < max_ticks:
+        runner.step()
+        peak_enemies = max(peak_enemies, len(game.enemies))
+    per_state = {state: (stages['update']['calls'], stages['update']['seconds'])
+                 for state, stages in game.states.timings().items() if 'update' in stages}
+    return {
+        'seed': runner.seed,
+        'ticks': runner.tick,
+        'final_state': game.game_state,
+        'score': game.player.score,
+        'peak_enemies': peak_enemies,
+        'pools': game.pool_stats(),
+        'seconds': sum(b[1] for b in per_state.values()),
+        'states': {state: {'ticks': b[0], 'seconds': b[1]} for state, b in per_state.items()},
+    }
+
+def profile_match(seed, script, god_mode):
+    """Joga uma partida instrumentada e devolve o custo por função."""
+    runner = HeadlessGame(seed=seed, script=script, god_mode=god_mode)
+    timer = FunctionTimer(runner.game, PROFILED_FUNCTIONS)
+    result = run_match(runner)
+    return {
+        name: {'calls': calls, 'seconds': seconds}
+        for name, (calls, seconds) in timer.stats.items()
+    }, result
+
+def measure_work(seed, script, god_mode, seconds):
+    """Conta, passo a passo, quantas vezes cada inimigo se move e quantos testes de colisão são feitos."""
+    runner = HeadlessGame(seed=seed, script=script, god_mode=god_mode)
+    game = runner.game
+    moves = defaultdict(int)
+    def count_moves(cls):
+        move = cls.move
+        def counted(self, dt):
+            moves[id(self)] += 1
+            return move(self, dt)
+        cls.move = counted
+    count_moves(game.Enemy)
+    count_moves(game.Flyman)
+    collisions = [0]
+    colliderect = ZRect.colliderect
+    def counted_colliderect(self, *other):
+        collisions[0] += 1
+        return colliderect(self, *other)
+    ZRect.colliderect = counted_colliderect
+    try:
+        runner.start_match()
+        enemy_ticks = total_moves = worst = 0
+        while game.game_state == 'PLAYING' and runner.tick < seconds / runner.dt:
+            moves.clear()
+            runner.step()
+            enemy_ticks += len(moves)
+            total_moves += sum(moves.values())
+            worst = max(worst, max(moves.values(), default=0))
+    finally:
+        ZRect.colliderect = colliderect
+    return {
+        'ticks': runner.tick,
+        'enemy_moves_per_tick': total_moves / enemy_ticks if enemy_ticks else 0.0,
+        'max_moves_in_one_tick': worst,
+        'collision_tests_per_tick': collisions[0] / runner.tick,
+    }
+
+def run_work(args):
+    """Verifica que cada inimigo é atualizado uma única vez por passo."""
+    work = measure_work(args.seed, args.script, not args.mortal, args.seconds)
+    if args.json:
+        print(json.dumps(work, indent=2))
+    else:
+        print(f"Trabalho por passo em PLAYING (semente {args.seed}, {work['ticks']} passos)")
+        print(f"  movimentos por inimigo por passo: {work['enemy_moves_per_tick']:.2f}")
+        print(f"  maior número de movimentos de um inimigo em um passo: {work['max_moves_in_one_tick']}")
+        print(f"  testes de colisão por passo: {work['collision_tests_per_tick']:.1f}")
+    if work['max_moves_in_one_tick'] > 1:
+        print("ERRO: algum inimigo foi movido mais de uma vez no mesmo passo", file=sys.stderr)
+        sys.exit(1)
+
+class LinearScan:
+    """Índice de referência: devolve todas as faixas de colisão, como um laço linear."""
+    def __init__(self, spans):
+        self.spans = spans
+    def query(self, rect):
+        return self.spans
+
+def collision_stress(game, count, ticks, seed, linear):
+    """Espalha inimigos e chamas pela tela e mede só a física contra as plataformas."""
+    game.match_seed = seed
+    game.change_state('PLAYING')
+    game.player.is_invincible = True
+    if linear:
+        game.platform_index = LinearScan(game.collision_spans)
+    for i in range(count):
+        x = random.uniform(0, game.WIDTH)
+        y = random.uniform(0, game.HEIGHT - 150)
+        game.enemies.append(game.Enemy(x, y) if i % 2 == 0 else game.Flyman(x, y))
+        flame = game.Flame(x, y)
+        flame.max_bounces = 10 ** 9
+        game.flames.append(flame)
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    for _ in range(ticks):
+        game.update_enemies(1 / 60)
+        game.update_flames(1 / 60)
+    elapsed = perf_counter() - start
+    final = [(e.actor.x, e.actor.y, e.vy) for e in game.enemies + game.flames]
+    return elapsed / ticks, final
+
+def run_collision(args):
+    """Compara o laço linear sobre as plataformas com o índice espacial."""
+    game = HeadlessGame().game
+    rows = []
+    for count in args.counts:
+        linear, linear_final = collision_stress(game, count, args.ticks, args.seed, linear=True)
+        indexed, indexed_final = collision_stress(game, count, args.ticks, args.seed, linear=False)
+        rows.append({
+            'entities': count * 2,
+            'linear_us_per_tick': linear * 1e6,
+            'index_us_per_tick': indexed * 1e6,
+            'speedup': linear / indexed,
+            'identical': linear_final == indexed_final,
+        })
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"Colisão com plataformas ({len(game.platforms)} blocos compilados em "
+              f"{len(game.collision_spans)} faixas, {args.ticks} passos)")
+        print(f"{'entidades':>10} {'linear us':>10} {'índice us':>10} {'ganho':>6} {'idêntico':>9}")
+        for r in rows:
+            print(f"{r['entities']:>10} {r['linear_us_per_tick']:>10.0f} {r['index_us_per_tick']:>10.0f} "
+                  f"{r['speedup']:>5.1f}x {'sim' if r['identical'] else 'NÃO':>9}")
+    if not all(r['identical'] for r in rows):
+        print("ERRO: o índice espacial mudou o resultado da simulação", file=sys.stderr)
+        sys.exit(1)
+
+def interactions_flood(game, count, seed, overlap):
+    """
+    Enche a tela com `count` moedas, cenouras, inimigos e chamas, uma fração
+    `overlap` deles em cima da rede do coelho, e mede um único quadro de
+    interações com o jogador.
+    """
+    game.match_seed = seed
+    game.change_state('PLAYING')
+    player = game.player
+    player.is_invincible = True
+    player.attack()
+    player.update_attack(0)
+    for i in range(count):
+        if random.random() < overlap:
+            x, y = player.net.x + random.uniform(-20, 20), player.net.y + random.uniform(-20, 20)
+        else:
+            x, y = random.uniform(0, game.WIDTH), random.uniform(0, game.HEIGHT)
+        kind = i % 4
+        if kind == 0:
+            game.coins.append(game.Coin(x, y, 'gold'))
+        elif kind == 1:
+            game.carrots.append(game.Carrot(x, y))
+        elif kind == 2:
+            game.enemies.append(game.Enemy(x, y))
+        else:
+            game.flames.append(game.Flame(x, y))
+    before = len(game.coins) + len(game.carrots) + len(game.enemies) + len(game.flames)
+    gc.collect()
+    start = time.perf_counter()
+    game.update_animations(0)
+    game.update_player_interactions()
+    elapsed = time.perf_counter() - start
+    after = len(game.coins) + len(game.carrots) + len(game.enemies) + len(game.flames)
+    return elapsed, before - after
+
+def run_interactions(args):
+    """Mede um quadro de interações do jogador com a tela lotada."""
+    game = HeadlessGame().game
+    rows = []
+    for count in args.counts:
+        elapsed, removed = min(interactions_flood(game, count, args.seed, args.overlap)
+                               for _ in range(args.repeat))
+        rows.append({'entities': count, 'removed': removed, 'ms': elapsed * 1e3,
+                     'us_per_entity': elapsed * 1e6 / count})
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"Interações do jogador num quadro lotado ({args.overlap:.0%} em cima da rede)")
+    print(f"{'entidades':>10} {'removidas':>10} {'ms':>8} {'us/entidade':>12}")
+    for r in rows:
+        print(f"{r['entities']:>10} {r['removed']:>10} {r['ms']:>8.2f} {r['us_per_entity']:>12.2f}")
+
+# Como criar cada tipo de entidade medida no benchmark de memória, a partir da classe
+MEMORY_FACTORIES = {
+    'Enemy': lambda cls, x, y: cls(x, y),
+    'Flyman': lambda cls, x, y: cls(x, y),
+    'Flame': lambda cls, x, y: cls(x, y),
+    'Coin': lambda cls, x, y: cls(x, y, 'gold'),
+    'Carrot': lambda cls, x, y: cls(x, y),
+}
+
+def unslotted(cls):
+    """
+    Uma subclasse descartável de `cls` com `__dict__`, como as entidades eram
+    antes dos __slots__: cada instância guarda nele todos os atributos e a
+    sua própria cópia (em lista) das tabelas de quadros da classe.
+    """
+    slots = [name for klass in cls.__mro__ for name in getattr(klass, '__slots__', ())]
+    frames = [name for name in dir(cls) if name.endswith('frames') and isinstance(getattr(cls, name), tuple)]
+    def __init__(self, *args):
+        cls.__init__(self, *args)
+        values = self.__dict__
+        for name in slots:
+            if hasattr(self, name):
+                values[name] = getattr(self, name)
+        for name in frames:
+            values[name] = list(getattr(cls, name))
+    return type(cls.__name__, (cls,), {'__init__': __init__})
+
+def measure_memory(cls, name, count, width):
+    """Cria `count` entidades da classe `cls` e devolve quantos bytes cada uma ocupa, com o Actor."""
+    factory = MEMORY_FACTORIES[name]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        objs = [factory(cls, i % width, 100) for i in range(count)]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del objs
+    return used / count
+
+def run_memory(args):
+    """Mede a memória por entidade de cada classe do jogo, com e sem os __slots__ na mesma execução."""
+    runner = HeadlessGame()
+    game = runner.game
+    runner.start_match()
+    rows = {}
+    for name in MEMORY_FACTORIES:
+        cls = getattr(game, name)
+        rows[name] = {'unslotted': measure_memory(unslotted(cls), name, args.count, game.WIDTH),
+                      'slotted': measure_memory(cls, name, args.count, game.WIDTH)}
+    if args.json:
+        print(json.dumps({'count': args.count,
+                          'bytes_per_entity': {name: r['slotted'] for name, r in rows.items()},
+                          'unslotted_bytes_per_entity': {name: r['unslotted'] for name, r in rows.items()}},
+                         indent=2))
+        return
+    print(f"Memória por entidade ({args.count} instâncias de cada, incluindo o Actor)")
+    print(f"{'classe':>8} {'sem slots':>10} {'com slots':>10} {'redução':>8} {'KiB poupados':>13}")
+    for name, r in rows.items():
+        before, after = r['unslotted'], r['slotted']
+        print(f"{name:>8} {before:>10.0f} {after:>10.0f} {1 - after / before:>8.0%} "
+              f"{(before - after) * args.count / 1024:>13.0f}")
+
+def enemy_state(game):
+    """Estado de movimento de todos os inimigos, para comparar dois caminhos de simulação."""
+    return [(e.actor.left, e.actor.top, e.vx, e.vy, bool(e.on_ground), e.actor.image)
+            for e in game.enemies]
+
+def chasers_stress(game, count, ticks, seed, batched):
+    """
+    Enche a tela com `count` perseguidores (metade voadores), move o jogador em
+    zigue-zague e, na metade do tempo, manda todos fugirem, como no prelúdio.
+    """
+    game.match_seed = seed
+    game.change_state('PLAYING')
+    game.enable_batched_enemies(batched)
+    for i in range(count):
+        x = random.uniform(0, game.WIDTH)
+        y = random.uniform(0, game.HEIGHT - 150)
+        game.enemies.append(game.Enemy(x, y) if i % 2 == 0 else game.Flyman(x, y))
+    states = []
+    elapsed = 0.0
+    perf_counter = time.perf_counter
+    for tick in range(ticks):
+        game.player.actor.x = (tick * 7) % game.WIDTH
+        if tick == ticks // 2:
+            game.start_prelude_phase()
+        start = perf_counter()
+        game.update_enemies(1 / 60)
+        elapsed += perf_counter() - start
+        states.append(enemy_state(game))
+    game.enable_batched_enemies(False)
+    return elapsed / ticks, states
+
+def run_batched(args):
+    """Compara o passo vetorizado dos inimigos com o caminho escalar, passo a passo."""
+    game = HeadlessGame().game
+    if game.BatchedEnemies is None:
+        print("ERRO: o passo vetorizado requer NumPy", file=sys.stderr)
+        sys.exit(1)
+    rows = []
+    for count in args.counts:
+        scalar, scalar_states = chasers_stress(game, count, args.ticks, args.seed, batched=False)
+        batched, batched_states = chasers_stress(game, count, args.ticks, args.seed, batched=True)
+        rows.append({
+            'enemies': count,
+            'scalar_us_per_tick': scalar * 1e6,
+            'batched_us_per_tick': batched * 1e6,
+            'speedup': scalar / batched,
+            'identical': scalar_states == batched_states,
+        })
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"Movimento dos inimigos, escalar x vetorizado ({args.ticks} passos)")
+        print(f"{'inimigos':>9} {'escalar us':>11} {'vetor us':>9} {'ganho':>6} {'idêntico':>9}")
+        for r in rows:
+            print(f"{r['enemies']:>9} {r['scalar_us_per_tick']:>11.0f} {r['batched_us_per_tick']:>9.0f} "
+                  f"{r['speedup']:>5.1f}x {'sim' if r['identical'] else 'NÃO':>9}")
+    if not all(r['identical'] for r in rows):
+        print("ERRO: o passo vetorizado divergiu do caminho escalar", file=sys.stderr)
+        sys.exit(1)
+
+def draw_frames(runner, frames, advance):
+    """
+    Desenha `frames` quadros e devolve o tempo médio de draw(), as
+    renderizações de fonte, os blits por quadro e os redesenhos completos.
+    """
+    game = runner.game
+    cache = game.text_cache
+    renderer = game.renderer
+    renders = cache.renders
+    full_redraws = renderer.full_redraws
+    blits = 0
+    elapsed = 0.0
+    perf_counter = time.perf_counter
+    for _ in range(frames):
+        if advance:
+            runner.step()
+        start = perf_counter()
+        runner.draw()
+        elapsed += perf_counter() - start
+        blits += renderer.frame_blits + renderer.frame_restores
+    return elapsed / frames, cache.renders - renders, blits / frames, renderer.full_redraws - full_redraws
+
+def run_render(args):
+    """Mede o custo de draw() no menu, nas instruções e durante a partida."""
+    # Com vidas infinitas a HUD tentaria desenhar um ícone por vida
+    runner = HeadlessGame(seed=args.seed, script=args.script, render=True)
+    game = runner.game
+    rows = []
+    for state in ('MAIN_MENU', 'HOW_TO_PLAY'):
+        game.change_state(state)
+        rows.append((state, *draw_frames(runner, args.frames, advance=False)))
+    runner.start_match()
+    rows.append(('PLAYING', *draw_frames(runner, args.frames, advance=True)))
+    rows = [{'screen': screen, 'ms_per_frame': seconds * 1e3, 'font_renders': renders,
+             'blits_per_frame': blits, 'full_redraws': full_redraws}
+            for screen, seconds, renders, blits, full_redraws in rows]
+    if args.json:
+        print(json.dumps({'frames': args.frames, 'screens': rows, 'text_cache': game.text_cache.stats()},
+                         indent=2))
+        return
+    print(f"Custo de draw() ({args.frames} quadros por tela, superfície fora da tela)")
+    print(f"{'tela':>12} {'ms/quadro':>10} {'renderizações':>14} {'blits/quadro':>13} {'redesenhos':>11}")
+    for r in rows:
+        print(f"{r['screen']:>12} {r['ms_per_frame']:>10.3f} {r['font_renders']:>14} "
+              f"{r['blits_per_frame']:>13.1f} {r['full_redraws']:>11}")
+
+def run_assets(args):
+    """Pré-carrega o manifesto como no menu e mostra o tempo de carga de cada recurso."""
+    runner = HeadlessGame(seed=args.seed, script=args.script)
+    game = runner.game
+    frames = 0
+    while not game.assets.done:
+        game.preload_assets()
+        frames += 1
+    rows = [{'kind': kind, 'name': name, 'ms': seconds * 1e3} for kind, name, seconds in game.assets.report()]
+    total = sum(r['ms'] for r in rows)
+    if args.json:
+        print(json.dumps({'frames': frames, 'total_ms': total, 'assets': rows}, indent=2))
+        return
+    print(f"{len(rows)} recursos em {total:.1f} ms, {frames} quadros de menu "
+          f"(orçamento de {game.ASSET_PRELOAD_BUDGET * 1e3:.0f} ms por quadro)")
+    print("(no modo headless os sons são silenciosos e a música só é validada)")
+    for r in rows[:args.top]:
+        print(f"{r['ms']:>8.2f} ms  {r['kind']}/{r['name']}")
+
+def run_level(args):
+    """Atravessa um nível e mede o que fica carregado em volta da câmera e o custo dos passos."""
+    runner = HeadlessGame(seed=args.seed, script=args.script, god_mode=not args.mortal, level=args.level)
+    game = runner.game
+    runner.start_match()
+    total_platforms = sum(len(chunk.platforms) for chunk in game.level.chunks)
+    peak = defaultdict(int)
+    worst = elapsed = 0.0
+    steps = int(args.seconds / runner.dt)
+    perf_counter = time.perf_counter
+    for _ in range(steps):
+        if runner.finished():
+            break
+        start = perf_counter()
+        runner.step()
+        seconds = perf_counter() - start
+        elapsed += seconds
+        worst = max(worst, seconds)
+        peak['chunks'] = max(peak['chunks'], len(game.streamer.loaded))
+        peak['platforms'] = max(peak['platforms'], len(game.platforms))
+        peak['spans'] = max(peak['spans'], len(game.collision_spans))
+        peak['collectibles'] = max(peak['collectibles'], len(game.coins) + len(game.carrots))
+        peak['camera'] = max(peak['camera'], game.camera.left)
+    result = {
+        'level': args.level, 'width': game.level.width, 'chunks': len(game.level.chunks),
+        'platforms': total_platforms, 'steps': runner.tick,
+        'us_per_step': elapsed / max(runner.tick, 1) * 1e6, 'worst_step_ms': worst * 1e3,
+        'loads': game.streamer.loads, 'unloads': game.streamer.unloads,
+        'peak': dict(peak),
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"Nível '{args.level}': {result['width']} px, {result['chunks']} pedaços, "
+          f"{total_platforms} blocos ({result['steps']} passos com o bot '{args.script}')")
+    print(f"  carregados no pico: {peak['chunks']} pedaços, {peak['platforms']} blocos, "
+          f"{peak['spans']} faixas de colisão, {peak['collectibles']} colecionáveis")
+    print(f"  pedaços carregados/descarregados: {result['loads']}/{result['unloads']}, "
+          f"câmera até x={peak['camera']}")
+    print(f"  {result['us_per_step']:.1f} us/passo, pior passo {result['worst_step_ms']:.2f} ms")
+
+def frame_times(rate, seconds, seed):
+    """Os dt dos quadros de `seconds` segundos de jogo a `rate` quadros por segundo."""
+    rng = random.Random(seed)
+    total = 0.0
+    while total < seconds:
+        dt = rng.uniform(1 / 120, 1 / 10) if rate == 'irregular' else 1 / rate
+        total += dt
+        yield dt
+
+def run_timestep(args):
+    """Joga com várias taxas de quadros e mede quantos passos fixos a simulação roda por segundo."""
+    rows = []
+    perf_counter = time.perf_counter
+    for rate in TIMESTEP_RATES:
+        runner = HeadlessGame(seed=args.seed, script=args.script, god_mode=not args.mortal)
+        game = runner.game
+        runner.start_match()
+        real = elapsed = 0.0
+        for dt in frame_times(rate, args.seconds, args.seed):
+            if runner.finished():
+                break
+            start = perf_counter()
+            runner.step(dt)
+            elapsed += perf_counter() - start
+            real += dt
+        stats = game.timestep.stats()
+        rows.append({
+            'rate': rate, 'frames': stats['frames'], 'steps': stats['steps'],
+            'steps_per_second': stats['steps'] / real, 'simulated_ratio': stats['steps'] * game.SIMULATION_STEP / real,
+            'skipped_frames': stats['skipped_frames'], 'dropped_ms': stats['dropped_ms'],
+            'us_per_step': elapsed / max(stats['steps'], 1) * 1e6,
+        })
+    if args.json:
+        print(json.dumps({'seconds': args.seconds, 'max_catchup_steps': game.MAX_CATCHUP_STEPS, 'rates': rows},
+                         indent=2))
+        return
+    print(f"{args.seconds:.0f}s de jogo por taxa, passo de {game.SIMULATION_STEP * 1e3:.2f} ms, "
+          f"até {game.MAX_CATCHUP_STEPS} passos por quadro")
+    print(f"{'quadros/s':>10} {'quadros':>8} {'passos':>7} {'passos/s':>9} {'simulado':>9} "
+          f"{'pulados':>8} {'descartado':>11} {'us/passo':>9}")
+    for r in rows:
+        print(f"{r['rate']:>10} {r['frames']:>8} {r['steps']:>7} {r['steps_per_second']:>9.1f} "
+              f"{r['simulated_ratio']:>8.0%} {r['skipped_frames']:>8} {r['dropped_ms']:>8.0f} ms "
+              f"{r['us_per_step']:>9.1f}")
+
+def governor_round(args, adaptive, cap):
+    """
+    Inunda uma partida de spawns e devolve o pico de cada tipo em jogo e as
+    estatísticas do governador. Com `adaptive`, ele mede o tempo real dos
+    passos contra `--budget-ms`; com `cap`, todos os tipos usam esse limite.
+    """
+    runner = HeadlessGame(seed=args.seed, script=args.script, god_mode=not args.mortal)
+    game = runner.game
+    governor = game.governor
+    governor.adaptive = adaptive
+    governor.budget = args.budget_ms / 1e3
+    if cap is not None:
+        governor.caps = {kind: cap for kind in governor.caps}
+    runner.start_match()
+    for spawner in game.spawners:
+        spawner.base_cooldown = spawner.min_cooldown = args.spawn_interval
+    peak = defaultdict(int)
+    steps = int(args.seconds / runner.dt)
+    for _ in range(steps):
+        if runner.finished():
+            break
+        runner.step()
+        for kind, pool in game.SPAWN_POOLS.items():
+            peak[kind] = max(peak[kind], sum(type(e) is pool.factory for e in game.enemies + game.flames))
+    return {'seconds': runner.tick * runner.dt, 'ticks': runner.tick, 'adaptive': adaptive,
+            'caps': governor.caps, 'peak_alive': dict(peak), 'governor': governor.stats(),
+            'stretch_per_level': governor.stretch_per_level}
+
+def run_governor(args):
+    """
+    Mostra os dois mecanismos do governador, um de cada vez: os limites por
+    tipo, com a desaceleração desligada e um limite baixo, e a desaceleração,
+    medindo o tempo real dos passos contra um orçamento apertado.
+    """
+    rounds = [('limites', governor_round(args, adaptive=False, cap=args.cap)),
+              ('desaceleração', governor_round(args, adaptive=True, cap=None))]
+    if args.json:
+        print(json.dumps({'budget_ms': args.budget_ms, 'spawn_interval': args.spawn_interval,
+                          'rounds': dict(rounds)}, indent=2))
+        return
+    print(f"{args.seconds:.0f}s com uma nuvem a cada {args.spawn_interval}s em cada rodada")
+    for name, r in rounds:
+        stats = r['governor']
+        if r['adaptive']:
+            print(f"{name} (orçamento de {args.budget_ms} ms por passo, passo médio {stats['average_ms']:.2f} ms):")
+        else:
+            print(f"{name} (sem desaceleração):")
+        for kind, cap in r['caps'].items():
+            print(f"  {kind:>7}: pico de {r['peak_alive'].get(kind, 0)} em jogo (limite {cap}), "
+                  f"{stats['blocked'][kind]} spawns negados")
+        stretch = 1 + stats['peak_level'] * r['stretch_per_level']
+        print(f"  desaceleração: nível máximo {stats['peak_level']} (x{stretch:.2f}), "
+              f"{stats['throttled_frames']} de {r['ticks']} quadros desacelerados")
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--seed', type=int, default=0, help='primeira semente')
+    common.add_argument('--script', choices=sorted(SCRIPTS), default=None,
+                        help=f"bot que joga (padrão: '{DEFAULT_SCRIPT}'; 'runner' no level)")
+    common.add_argument('--mortal', action='store_true',
+                        help='vidas normais (por padrão o bot tem vidas infinitas e sempre chega ao chefão)')
+    common.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0], parents=[common])
+    commands = parser.add_subparsers(dest='command')
+    match = commands.add_parser('match', parents=[common], help='partidas completas (padrão)')
+    match.add_argument('--runs', type=int, default=3, help='número de partidas (sementes 0..N-1)')
+    work = commands.add_parser('work', parents=[common], help='trabalho por passo, falha se houver repetição')
+    work.add_argument('--seconds', type=float, default=90, help='segundos de PLAYING simulados')
+    collision = commands.add_parser('collision', parents=[common], help='índice espacial contra laço linear')
+    collision.add_argument('--counts', type=int, nargs='+', default=[50, 100, 200],
+                           help='pares inimigo+chama a criar em cada rodada')
+    collision.add_argument('--ticks', type=int, default=300, help='passos simulados por rodada')
+    interactions = commands.add_parser('interactions', parents=[common], help='coleta e abates em massa')
+    interactions.add_argument('--counts', type=int, nargs='+', default=[500, 2000, 8000],
+                              help='entidades na tela em cada rodada')
+    interactions.add_argument('--overlap', type=float, default=0.1,
+                              help='fração das entidades criadas em cima da rede')
+    interactions.add_argument('--repeat', type=int, default=5, help='repetições por rodada (vale a menor)')
+    memory = commands.add_parser('memory', parents=[common], help='memória por entidade')
+    memory.add_argument('--count', type=int, default=5000, help='instâncias de cada classe')
+    batched = commands.add_parser('batched', parents=[common], help='passo vetorizado dos inimigos')
+    batched.add_argument('--counts', type=int, nargs='+', default=[100, 300, 1000],
+                         help='inimigos em cada rodada')
+    batched.add_argument('--ticks', type=int, default=300, help='passos simulados por rodada')
+    render = commands.add_parser('render', parents=[common], help='custo de draw() e dos textos')
+    render.add_argument('--frames', type=int, default=600, help='quadros desenhados em cada tela')
+    assets = commands.add_parser('assets', parents=[common], help='tempo de carga dos recursos')
+    assets.add_argument('--top', type=int, default=15, help='quantos recursos listar')
+    level = commands.add_parser('level', parents=[common], help='streaming dos pedaços de um nível')
+    level.add_argument('--level', default='valley', help='nome do nível em levels/')
+    level.add_argument('--seconds', type=float, default=60, help='segundos de partida simulados')
+    timestep = commands.add_parser('timestep', parents=[common], help='passo fixo com várias taxas de quadros')
+    timestep.add_argument('--seconds', type=float, default=60, help='segundos de jogo em cada taxa')
+    governor = commands.add_parser('governor', parents=[common], help='limites e desaceleração dos spawns')
+    governor.add_argument('--seconds', type=float, default=60, help='segundos de partida simulados')
+    governor.add_argument('--budget-ms', type=float, default=0.1, help='orçamento de tempo por passo')
+    governor.add_argument('--cap', type=int, default=4,
+                          help='limite de cada tipo na rodada dos limites (a outra usa SPAWN_CAPS do jogo)')
+    governor.add_argument('--spawn-interval', type=float, default=0.2, help='segundos entre dois spawns de cada nuvem')
+    parser.set_defaults(command='match', runs=3)
+    args = parser.parse_args()
+    if args.script is None:
+        args.script = COMMAND_SCRIPTS.get(args.command, DEFAULT_SCRIPT)
+    if args.command == 'work':
+        run_work(args)
+    elif args.command == 'collision':
+        run_collision(args)
+    elif args.command == 'interactions':
+        run_interactions(args)
+    elif args.command == 'memory':
+        run_memory(args)
+    elif args.command == 'batched':
+        run_batched(args)
+    elif args.command == 'render':
+        run_render(args)
+    elif args.command == 'assets':
+        run_assets(args)
+    elif args.command == 'level':
+        run_level(args)
+    elif args.command == 'timestep':
+        run_timestep(args)
+    elif args.command == 'governor':
+        run_governor(args)
+    else:
+        run_match_benchmark(args)
+
+def run_match_benchmark(args):
+    """Joga várias partidas e imprime passos por segundo e custo por função."""
+    matches = []
+    for seed in range(args.seed, args.seed + args.runs):
+        runner = HeadlessGame(seed=seed, script=args.script, god_mode=not args.mortal)
+        matches.append(run_match(runner))
+    functions, profiled = profile_match(args.seed, args.script, not args.mortal)
+
+    if args.json:
+        print(json.dumps({'matches': matches, 'functions': functions}, indent=2))
+        return
+
+    print(f"Benchmark headless: bot '{args.script}', {args.runs} partida(s)")
+    print(f"{'semente':>8} {'passos':>7} {'final':>10} {'pontos':>7} {'pico':>5} {'passos/s':>10}")
+    for m in matches:
+        print(f"{m['seed']:>8} {m['ticks']:>7} {m['final_state']:>10} {m['score']:>7} "
+              f"{m['peak_enemies']:>5} {m['ticks'] / m['seconds']:>10.0f}")
+    totals = defaultdict(lambda: [0, 0.0])
+    for m in matches:
+        for state, s in m['states'].items():
+            totals[state][0] += s['ticks']
+            totals[state][1] += s['seconds']
+    print()
+    print(f"{'estado':>14} {'passos':>8} {'passos/s':>10}")
+    for state, (ticks, seconds) in totals.items():
+        print(f"{state:>14} {ticks:>8} {ticks / seconds:>10.0f}")
+    print()
+    print(f"Custo por função (partida instrumentada, semente {args.seed}, {profiled['ticks']} passos)")
+    print(f"{'função':>28} {'chamadas':>9} {'total ms':>9} {'us/chamada':>11} {'us/passo':>9}")
+    for name, s in functions.items():
+        per_call = s['seconds'] / s['calls'] * 1e6 if s['calls'] else 0.0
+        per_tick = s['seconds'] / profiled['ticks'] * 1e6
+        print(f"{name:>28} {s['calls']:>9} {s['seconds'] * 1e3:>9.1f} {per_call:>11.2f} {per_tick:>9.2f}")
+    print()
+    print(f"Pools de entidades (semente {args.seed})")
+    print(f"{'pool':>8} {'acertos':>8} {'falhas':>7} {'livres':>7}")
+    for name, p in profiled['pools'].items():
+        print(f"{name:>8} {p['hits']:>8} {p['misses']:>7} {p['free']:>7}")
+
+if __name__ == '__main__':
+    main()
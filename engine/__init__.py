@@ -0,0 +1 @@
+"""Subsistemas de apoio do Bunny Brave (modo headless, benchmarks e afins)."""
@@ -0,0 +1,58 @@
+"""Animações por quadros declaradas como dados e avançadas num passo central."""
+
+class Clip:
+    """
+    Uma animação: a sequência de imagens e quanto tempo, em segundos, cada
+    uma fica na tela. Um clipe de um quadro só é uma pose parada.
+    """
+    __slots__ = ('frames', 'frame_time')
+    def __init__(self, frames, frame_time):
+        if not frames:
+            raise ValueError("um clipe precisa de pelo menos um quadro")
+        self.frames = tuple(frames)
+        self.frame_time = frame_time
+    def __len__(self):
+        return len(self.frames)
+    def __repr__(self):
+        return f"Clip({self.frames!r}, {self.frame_time!r})"
+
+class AnimationScheduler:
+    """
+    Avança, numa única passagem por quadro, a animação de todas as entidades
+    animadas.
+
+    Cada entidade tem `actor`, `frame_index`, `frame_timer` e um método
+    `animation_clip()` que devolve o clipe que deve tocar agora, ou None para
+    deixar a animação parada (durante um pulo ou um golpe, por exemplo). Como
+    no código original, o índice e o tempo são da entidade e não do clipe:
+    trocar de clipe continua a contagem de onde ela estava. `actor.image` só é
+    trocado quando o quadro muda de fato, já que cada troca recarrega a
+    superfície e recalcula a âncora do Actor.
+
+    Entidades que nunca mudam de imagem (cenouras, chamas) simplesmente não
+    entram nos grupos passados a `update`.
+    """
+    def __init__(self):
+        self.animated = 0
+        self.image_changes = 0
+    def update(self, dt, *groups):
+        animated = image_changes = 0
+        for group in groups:
+            for entity in group:
+                clip = entity.animation_clip()
+                if clip is None:
+                    continue
+                animated += 1
+                timer = entity.frame_timer + dt
+                if timer < clip.frame_time:
+                    entity.frame_timer = timer
+                    continue
+                entity.frame_timer = 0
+                frames = clip.frames
+                index = entity.frame_index = (entity.frame_index + 1) % len(frames)
+                actor = entity.actor
+                if actor.image != frames[index]:
+                    actor.image = frames[index]
+                    image_changes += 1
+        self.animated = animated
+        self.image_changes += image_changes
@@ -0,0 +1,89 @@
+"""Manifesto dos recursos do jogo: validação na partida e pré-carregamento aos poucos."""
+import os
+import time
+from collections import deque
+
+# Extensões procuradas por cada carregador do PgZero, na mesma ordem
+EXTENSIONS = {
+    'images': ('png', 'gif', 'jpg', 'jpeg', 'bmp'),
+    'sounds': ('wav', 'ogg', 'oga'),
+    'music': ('mp3', 'ogg', 'oga'),
+}
+
+class AssetManifest:
+    """
+    Lista dos recursos que o jogo usa, por tipo ('images', 'sounds', 'music').
+
+    `validate()` procura cada arquivo como o PgZero procuraria (o nome exato
+    ou o nome com uma das extensões aceitas) e levanta FileNotFoundError com
+    todos os que faltam, antes de o jogo abrir a janela. `preload_step()`
+    carrega os recursos pendentes aos poucos, respeitando um orçamento de
+    tempo por quadro, e guarda quanto cada um levou para carregar.
+
+    Os carregadores são funções `load(name)` por tipo; um tipo sem carregador
+    (a música, que o PgZero lê direto do arquivo ao tocar) só é validado.
+    """
+    def __init__(self, root, images=(), sounds=(), music=()):
+        self.root = root
+        self.names = {
+            'images': tuple(dict.fromkeys(images)),
+            'sounds': tuple(dict.fromkeys(sounds)),
+            'music': tuple(dict.fromkeys(music)),
+        }
+        self.paths = {}
+        self.load_times = {}
+        self._pending = deque()
+    def __len__(self):
+        return sum(len(names) for names in self.names.values())
+    def find(self, kind, name):
+        """Caminho do arquivo de um recurso, ou None se ele não existir."""
+        folder = os.path.join(self.root, kind)
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            return path
+        for ext in EXTENSIONS[kind]:
+            path = os.path.join(folder, f'{name}.{ext}')
+            if os.path.isfile(path):
+                return path
+        return None
+    def validate(self):
+        missing = []
+        for kind, names in self.names.items():
+            for name in names:
+                path = self.find(kind, name)
+                if path is None:
+                    missing.append(f"{kind}/{name}")
+                else:
+                    self.paths[(kind, name)] = path
+        if missing:
+            raise FileNotFoundError("Recursos não encontrados: " + ", ".join(missing))
+        self._pending = deque((kind, name) for kind, names in self.names.items() for name in names
+                              if (kind, name) not in self.load_times)
+    @property
+    def done(self):
+        return not self._pending
+    def preload_step(self, loaders, budget):
+        """
+        Carrega recursos pendentes até gastar `budget` segundos (pelo menos um
+        por chamada) e devolve True quando não sobrar nenhum.
+        """
+        perf_counter = time.perf_counter
+        start = perf_counter()
+        pending = self._pending
+        while pending:
+            kind, name = pending.popleft()
+            load = loaders.get(kind)
+            loaded = perf_counter()
+            if load is not None:
+                load(name)
+            self.load_times[(kind, name)] = perf_counter() - loaded
+            if perf_counter() - start >= budget:
+                break
+        return not pending
+    def finish(self, loaders):
+        """Carrega de uma vez tudo o que ainda estiver pendente."""
+        return self.preload_step(loaders, float('inf'))
+    def report(self):
+        """Tempo de carga de cada recurso, do mais lento para o mais rápido."""
+        return sorted(((kind, name, seconds) for (kind, name), seconds in self.load_times.items()),
+                      key=lambda row: row[2], reverse=True)
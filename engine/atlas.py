@@ -0,0 +1,151 @@
+"""
+Atlas de texturas: junta as imagens de images/ em poucas folhas.
+
+A construção é feita fora do jogo, sempre que as imagens mudarem:
+
+    python -m engine.atlas build
+    python -m engine.atlas info
+
+e grava as folhas e um índice com o retângulo de cada imagem em atlas/. As
+folhas são gravadas em BMP por padrão: o arquivo é maior que o PNG, mas
+carrega sem descompressão, que é onde vai quase todo o tempo de carga das
+imagens. O atlas é um artefato de build e não vai para o repositório. No
+jogo, `install_atlas` registra no cache do carregador de imagens do PgZero
+uma subsuperfície da folha para cada imagem, de modo que `Actor(nome)` e
+`actor.image = nome` passam a usar o atlas sem nenhuma outra mudança.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGES_DIR = os.path.join(ROOT, 'images')
+ATLAS_DIR = os.path.join(ROOT, 'atlas')
+INDEX_NAME = 'index.json'
+
+# Lado máximo de uma folha e espaço entre as imagens empacotadas
+SHEET_SIZE = 1024
+PADDING = 1
+SHEET_FORMAT = 'bmp'
+
+def file_digest(path):
+    """SHA-1 do conteúdo de um arquivo, que diz se uma imagem mudou depois da construção do atlas."""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def pack(sizes, sheet_size=SHEET_SIZE, padding=PADDING):
+    """
+    Empacotamento em prateleiras. As imagens, da mais alta para a mais baixa,
+    são colocadas lado a lado numa fileira; quando a fileira enche, abre-se
+    outra logo abaixo, e quando a folha enche, uma folha nova.
+
+    Recebe `{nome: (largura, altura)}` e devolve `{nome: (folha, x, y)}`.
+    """
+    placements = {}
+    sheet = x = y = shelf_height = 0
+    for name in sorted(sizes, key=lambda n: (-sizes[n][1], -sizes[n][0], n)):
+        w, h = sizes[name]
+        if w > sheet_size or h > sheet_size:
+            raise ValueError(f"'{name}' ({w}x{h}) não cabe numa folha de {sheet_size}px")
+        if x + w > sheet_size:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        if y + h > sheet_size:
+            sheet += 1
+            x = y = shelf_height = 0
+        placements[name] = (sheet, x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return placements
+
+def build(images_dir=IMAGES_DIR, atlas_dir=ATLAS_DIR, sheet_size=SHEET_SIZE, padding=PADDING,
+          sheet_format=SHEET_FORMAT):
+    """Empacota todos os PNGs de `images_dir` e grava as folhas e o índice em `atlas_dir`."""
+    surfaces = {}
+    for filename in sorted(os.listdir(images_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() == '.png':
+            surfaces[name] = pygame.image.load(os.path.join(images_dir, filename))
+    placements = pack({name: surf.get_size() for name, surf in surfaces.items()}, sheet_size, padding)
+    heights = {}
+    for name, (sheet, x, y) in placements.items():
+        heights[sheet] = max(heights.get(sheet, 0), y + surfaces[name].get_height())
+    sheets = [pygame.Surface((sheet_size, heights[i]), pygame.SRCALPHA, 32) for i in range(len(heights))]
+    images = {}
+    for name, (sheet, x, y) in placements.items():
+        surf = surfaces[name]
+        # A folha começa toda transparente: somar os canais copia os pixels
+        # sem a mistura de alfa que um blit normal faria
+        sheets[sheet].blit(surf, (x, y), special_flags=pygame.BLEND_RGBA_ADD)
+        images[name] = {
+            'sheet': sheet,
+            'rect': [x, y, *surf.get_size()],
+            'sha1': file_digest(os.path.join(images_dir, name + '.png')),
+        }
+    os.makedirs(atlas_dir, exist_ok=True)
+    sheet_names = []
+    for i, surf in enumerate(sheets):
+        sheet_names.append(f'sheet{i}.{sheet_format}')
+        pygame.image.save(surf, os.path.join(atlas_dir, sheet_names[-1]))
+    index = {'sheets': sheet_names, 'images': dict(sorted(images.items()))}
+    with open(os.path.join(atlas_dir, INDEX_NAME), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1)
+    return index
+
+def install_atlas(loader, atlas_dir=ATLAS_DIR, images_dir=IMAGES_DIR):
+    """
+    Carrega as folhas do atlas e registra, no cache de `loader` (o `images`
+    do PgZero), uma subsuperfície para cada imagem, com a mesma chave que
+    `loader.load(nome)` usaria. Uma imagem cujo conteúdo mudou depois da
+    construção do atlas (ou de um índice antigo, sem o SHA-1) fica de fora
+    e continua vindo do próprio arquivo.
+    Sem atlas, não faz nada. Devolve quantas imagens vieram do atlas.
+    """
+    index_path = os.path.join(atlas_dir, INDEX_NAME)
+    if not os.path.exists(index_path):
+        return 0
+    with open(index_path, encoding='utf-8') as f:
+        index = json.load(f)
+    sheets = [pygame.image.load(os.path.join(atlas_dir, name)).convert_alpha() for name in index['sheets']]
+    installed = 0
+    for name, entry in index['images'].items():
+        try:
+            digest = file_digest(os.path.join(images_dir, name + '.png'))
+        except OSError:
+            continue
+        if digest != entry.get('sha1'):
+            continue
+        loader.cache[loader.cache_key(name, (), {})] = sheets[entry['sheet']].subsurface(entry['rect'])
+        installed += 1
+    return installed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Atlas de texturas do Bunny Brave")
+    parser.add_argument('command', choices=['build', 'info'])
+    parser.add_argument('--sheet-size', type=int, default=SHEET_SIZE, help='lado máximo de cada folha')
+    parser.add_argument('--format', choices=['bmp', 'png'], default=SHEET_FORMAT, help='formato das folhas')
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        index = build(sheet_size=args.sheet_size, sheet_format=args.format)
+    else:
+        index_path = os.path.join(ATLAS_DIR, INDEX_NAME)
+        if not os.path.exists(index_path):
+            print("Nenhum atlas construído; rode 'python -m engine.atlas build'", file=sys.stderr)
+            sys.exit(1)
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+    area = sum(w * h for _, _, w, h in (entry['rect'] for entry in index['images'].values()))
+    for name in index['sheets']:
+        w, h = pygame.image.load(os.path.join(ATLAS_DIR, name)).get_size()
+        print(f"{name}: {w}x{h}")
+    print(f"{len(index['images'])} imagens em {len(index['sheets'])} folha(s), {area} pixels ocupados")
+
+if __name__ == '__main__':
+    main()
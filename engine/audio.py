@@ -0,0 +1,86 @@
+"""Fila de comandos de som, esvaziada uma vez por quadro."""
+import time
+
+class AudioQueue:
+    """
+    Recebe os pedidos de som do jogo (`play(nome)`) e só os toca em `flush()`,
+    uma vez por quadro.
+
+    - Pedidos repetidos do mesmo som no mesmo quadro viram um só.
+    - Cada som tem um limite de vozes (quantas cópias dele podem tocar ao
+      mesmo tempo); acima do limite o pedido é descartado.
+    - Com `muted`, os pedidos são ignorados já na entrada.
+    - Erros ao tocar um som são impressos no máximo uma vez a cada
+      `error_interval` segundos por som, com a contagem dos omitidos.
+
+    `sounds` é o carregador de sons do PgZero; cada som é buscado nele uma
+    única vez e guardado.
+    """
+    def __init__(self, sounds, voice_limits=None, default_voices=2, error_interval=5.0,
+                 clock=time.monotonic):
+        self.sounds = sounds
+        self.voice_limits = dict(voice_limits or {})
+        self.default_voices = default_voices
+        self.error_interval = error_interval
+        self.clock = clock
+        self._muted = False
+        self._pending = {}
+        self._loaded = {}
+        self._last_error = {}
+        self._suppressed = {}
+        self.requested = 0
+        self.played = 0
+        self.deduplicated = 0
+        self.over_limit = 0
+        self.errors = 0
+    @property
+    def muted(self):
+        return self._muted
+    @muted.setter
+    def muted(self, muted):
+        self._muted = bool(muted)
+        if self._muted:
+            self._pending.clear()
+    def play(self, name):
+        """Pede para tocar o som `name` no próximo `flush()`."""
+        if self._muted:
+            return
+        self.requested += 1
+        if name in self._pending:
+            self.deduplicated += 1
+        else:
+            self._pending[name] = True
+    def flush(self):
+        """Toca os sons pedidos desde o último quadro e devolve quantos tocaram."""
+        if not self._pending:
+            return 0
+        played = 0
+        for name in self._pending:
+            try:
+                sound = self._loaded.get(name)
+                if sound is None:
+                    sound = self._loaded[name] = getattr(self.sounds, name)
+                if sound.get_num_channels() >= self.voice_limits.get(name, self.default_voices):
+                    self.over_limit += 1
+                    continue
+                sound.play()
+                played += 1
+            except Exception as e:
+                self._report(name, e)
+        self._pending.clear()
+        self.played += played
+        return played
+    def _report(self, name, error):
+        self.errors += 1
+        now = self.clock()
+        last = self._last_error.get(name)
+        if last is not None and now - last < self.error_interval:
+            self._suppressed[name] = self._suppressed.get(name, 0) + 1
+            return
+        self._last_error[name] = now
+        suppressed = self._suppressed.pop(name, 0)
+        extra = f" ({suppressed} erros iguais omitidos)" if suppressed else ""
+        print(f"Erro ao tentar tocar '{name}': {error}{extra}")
+    def stats(self):
+        return {'requested': self.requested, 'played': self.played, 'deduplicated': self.deduplicated,
+                'over_limit': self.over_limit, 'errors': self.errors}
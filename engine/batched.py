@@ -0,0 +1,113 @@
+"""
+Passo vetorizado (NumPy) do movimento dos inimigos, para o modo de estresse
+com centenas de perseguidores.
+
+Reproduz Enemy.move e Flyman.move (sem a animação) para todos os inimigos de
+uma vez: perseguição do jogador, fuga, gravidade e pouso nas faixas de colisão.
+As contas seguem exatamente a mesma sequência de operações do caminho escalar
+(inclusive a conversão entre centro e canto do Actor), então, com a mesma
+semente, o resultado é idêntico ao de chamar enemy.move() um por um.
+"""
+import numpy as np
+
+class BatchedEnemies:
+    """Avança todos os inimigos num único passo vetorizado e devolve o estado aos Actors."""
+    def __init__(self, ground_speed, fly_speed, fleeing_speed, gravity, screen_width):
+        self.ground_speed = ground_speed
+        self.fly_speed = fly_speed
+        self.fleeing_speed = fleeing_speed
+        self.gravity = gravity
+        self.screen_width = screen_width
+        self._spans = None
+        self._span_arrays = None
+    def _span_columns(self, spans):
+        """Colunas das faixas de colisão, refeitas só quando o nível muda."""
+        if spans is not self._spans:
+            rows = np.array([tuple(span) for span in spans], dtype=float).reshape(-1, 4)
+            left, top, width, height = rows.T
+            self._span_arrays = (left, top, left + width, top + height)
+            self._spans = spans
+        return self._span_arrays
+    def _apply_physics(self, mask, old_y, left, top, w, h, vy, on_ground, spans):
+        """Versão vetorizada de PhysicsEntity.apply_physics para as linhas de `mask`."""
+        ay = h * 0.5
+        top[mask] = ((top + ay) + vy)[mask] - ay[mask]
+        vy[mask & ~on_ground] += self.gravity
+        on_ground[mask] = False
+        span_left, span_top, span_right, span_bottom = spans
+        if not len(span_left):
+            return
+        rows = np.flatnonzero(mask)
+        l, t, r, b = left[rows, None], top[rows, None], (left + w)[rows, None], (top + h)[rows, None]
+        hit = (l < span_right) & (t < span_bottom) & (r > span_left) & (b > span_top)
+        lands = hit & (vy[rows, None] > 0) & ((old_y + h / 2)[rows, None] <= span_bottom)
+        landed = lands.any(axis=1)
+        # Como no laço original, vale a primeira faixa (na ordem do nível) em que o pouso acontece
+        first = lands.argmax(axis=1)
+        rows, first = rows[landed], first[landed]
+        top[rows] = span_top[first] - h[rows]
+        vy[rows] = 0
+        on_ground[rows] = True
+    def step(self, enemies, player_actor, spans, dt, view_left=0.0):
+        """Move os inimigos; `view_left` é a borda esquerda da câmera, que decide o lado da fuga."""
+        if not enemies:
+            return
+        state = np.array([
+            (*enemy.actor, enemy.vx, enemy.vy, enemy.on_ground, enemy.is_fleeing,
+             enemy.flies, enemy.is_flying if enemy.flies else False,
+             enemy.ground_timer if enemy.flies else 0.0)
+            for enemy in enemies
+        ], dtype=float)
+        left, top, w, h, vx, vy = (state[:, i].copy() for i in range(6))
+        on_ground, fleeing, flies, flying = (state[:, i] != 0 for i in range(6, 10))
+        ground_timer = state[:, 10].copy()
+        spans = self._span_columns(spans)
+        px, py = player_actor.x, player_actor.y
+        ax, ay = w * 0.5, h * 0.5
+        x = left + ax
+        old_y = top + ay
+
+        # Inimigos terrestres (Enemy.move)
+        walkers = ~flies
+        moving = walkers & on_ground
+        chase = moving & ~fleeing
+        vx[chase] = np.where(px > x, self.ground_speed, np.where(px < x, -self.ground_speed, 0))[chase]
+        self._start_fleeing(moving & fleeing, vx, x, view_left)
+        left[moving] = (x + vx)[moving] - ax[moving]
+        self._apply_physics(walkers, old_y, left, top, w, h, vy, on_ground, spans)
+
+        # Inimigos voadores (Flyman.move)
+        calm = flies & ~fleeing
+        grounded = calm & ~flying
+        airborne = calm & flying
+        self._apply_physics(grounded, old_y, left, top, w, h, vy, on_ground, spans)
+        ground_timer[grounded] -= dt
+        takeoff = grounded & (ground_timer <= 0)
+        flying[takeoff] = True
+        vy[takeoff] = 0
+        y = top + ay
+        speed = self.fly_speed
+        vx[airborne] = np.where(px > x, speed, np.where(px < x, -speed, 0))[airborne]
+        vy[airborne] = np.where(py > y, speed, np.where(py < y, -speed, 0))[airborne]
+        left[airborne] = (x + vx)[airborne] - ax[airborne]
+        top[airborne] = (y + vy)[airborne] - ay[airborne]
+        falling = flies & fleeing
+        self._start_fleeing(falling, vx, x, view_left)
+        left[falling] = (x + vx)[falling] - ax[falling]
+        top[falling] = (y + vy)[falling] - ay[falling]
+        vy[falling] += self.gravity
+
+        for enemy, l, t, evx, evy, grounded_now, is_flying, timer in zip(
+                enemies, left.tolist(), top.tolist(), vx.tolist(), vy.tolist(),
+                on_ground.tolist(), flying.tolist(), ground_timer.tolist()):
+            enemy.actor.topleft = (l, t)
+            enemy.vx = evx
+            enemy.vy = evy
+            enemy.on_ground = grounded_now
+            if enemy.flies:
+                enemy.is_flying = is_flying
+                enemy.ground_timer = timer
+    def _start_fleeing(self, mask, vx, x, view_left):
+        """Quem foge parado escolhe o lado da tela mais próximo, como no caminho escalar."""
+        start = mask & (vx == 0)
+        vx[start] = np.where(x < view_left + self.screen_width / 2, self.fleeing_speed, -self.fleeing_speed)[start]
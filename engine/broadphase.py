@@ -0,0 +1,86 @@
+"""Fase ampla das colisões do jogador e remoções adiadas de entidades."""
+
+class BroadPhase:
+    """
+    Detecção das interações com o jogador em duas fases.
+
+    A cada quadro as entidades são distribuídas em colunas de largura fixa
+    (intervalos no eixo x). Na fase ampla, só as entidades que dividem alguma
+    coluna com uma das sondas (o coelho, a rede) são consideradas; na fase
+    exata, o retângulo de cada uma é comparado com o da sonda usando a mesma
+    regra de `Rect.colliderect`. Os retângulos são lidos uma única vez, na
+    inserção, já que ler atributos de um Actor custa caro.
+    """
+    def __init__(self, column_width=128):
+        self.column_width = column_width
+        self._entries = []
+        self._columns = {}
+    def clear(self):
+        self._entries.clear()
+        self._columns.clear()
+    def add(self, group, obj, rect):
+        x, y, w, h = rect
+        index = len(self._entries)
+        self._entries.append((group, obj, x, y, x + w, y + h))
+        width = self.column_width
+        columns = self._columns
+        for column in range(int(x // width), int((x + w) // width) + 1):
+            bucket = columns.get(column)
+            if bucket is None:
+                columns[column] = [index]
+            else:
+                bucket.append(index)
+    def add_group(self, group, objs):
+        """Registra todos os objetos de uma lista, usando o `actor` de cada um como retângulo."""
+        for obj in objs:
+            self.add(group, obj, obj.actor)
+    def collisions(self, probes):
+        """
+        Devolve `(grupo, objeto, sondas)` para cada objeto que colide com alguma
+        das sondas `(nome, retângulo)`, na ordem em que foram registrados.
+        """
+        width = self.column_width
+        columns = self._columns
+        entries = self._entries
+        hits = {}
+        for tag, rect in probes:
+            left, top, w, h = rect
+            right = left + w
+            bottom = top + h
+            seen = set()
+            for column in range(int(left // width), int(right // width) + 1):
+                for index in columns.get(column, ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    _, _, x0, y0, x1, y1 = entries[index]
+                    if x0 < right and y0 < bottom and x1 > left and y1 > top:
+                        hits.setdefault(index, []).append(tag)
+        return [entries[index][:2] + (hits[index],) for index in sorted(hits)]
+
+class RemovalQueue:
+    """
+    Remoções adiadas: os objetos são marcados durante o quadro e cada lista é
+    filtrada uma única vez em `flush()`, em vez de um `list.remove` por objeto.
+    """
+    def __init__(self):
+        self._pending = {}
+    def remove(self, items, obj):
+        entry = self._pending.get(id(items))
+        if entry is None:
+            self._pending[id(items)] = (items, {id(obj)})
+        else:
+            entry[1].add(id(obj))
+    def is_removed(self, items, obj):
+        entry = self._pending.get(id(items))
+        return entry is not None and id(obj) in entry[1]
+    def flush(self):
+        """Aplica as remoções pendentes e devolve os objetos removidos."""
+        removed = []
+        for items, dead in self._pending.values():
+            kept = []
+            for obj in items:
+                (removed if id(obj) in dead else kept).append(obj)
+            items[:] = kept
+        self._pending.clear()
+        return removed
@@ -0,0 +1,106 @@
+"""
+Governador de spawns: limite de entidades vivas por tipo e intervalos entre
+spawns que se alongam quando a simulação passa do orçamento de tempo.
+
+Todo spawn do jogo passa por `allow(tipo, vivos)`, que nega o pedido quando
+já há `caps[tipo]` entidades daquele tipo em jogo. Os intervalos entre
+spawns passam por `interval(segundos)`, multiplicados por `stretch`.
+
+A cada quadro, `measure()` recebe o tempo médio de um passo da simulação e
+o acumula numa média móvel. A cada `adjust_frames` quadros, se a média
+passou de `budget`, o nível de desaceleração sobe um degrau (cada degrau
+alonga os intervalos em `stretch_per_level`, até `max_level`); se ficou
+abaixo de `relax` vezes o orçamento, desce um. As mudanças de nível e os
+spawns negados pelos limites são avisados no máximo uma vez a cada
+`report_interval` segundos por assunto, com a contagem dos omitidos.
+
+O nível é um número inteiro pequeno para caber junto das teclas em cada
+quadro do replay (0 a 15): refeita, a partida usa os níveis gravados em vez
+de medir o tempo de novo. Com `adaptive` desligado (o modo headless), o
+nível só muda por fora e o resultado não depende da máquina.
+"""
+import time
+
+# O nível vai para os 4 bits altos da máscara de teclas do replay
+MAX_LEVEL = 15
+
+class SpawnGovernor:
+    """Limites de entidades por tipo (`caps`) e desaceleração dos spawns acima do orçamento `budget`, em segundos."""
+    def __init__(self, caps, budget, stretch_per_level=0.25, max_level=8, relax=0.75, smoothing=0.1,
+                 adjust_frames=30, report_interval=5.0, clock=time.monotonic, report=print):
+        if not 0 <= max_level <= MAX_LEVEL:
+            raise ValueError(f"max_level precisa estar entre 0 e {MAX_LEVEL}")
+        self.caps = dict(caps)
+        self.budget = budget
+        self.stretch_per_level = stretch_per_level
+        self.max_level = max_level
+        self.relax = relax
+        self.smoothing = smoothing
+        self.adjust_frames = adjust_frames
+        self.report_interval = report_interval
+        self.clock = clock
+        self.report = report
+        self.adaptive = True
+        self.level = 0
+        self.average = 0.0
+        self._frames = 0
+        self._last_report = {}
+        self._suppressed = {}
+        self.blocked = {kind: 0 for kind in self.caps}
+        self.throttled_frames = 0
+        self.peak_level = 0
+    def reset(self):
+        """Volta ao ritmo normal, sem medições (o começo de uma partida)."""
+        self.level = 0
+        self.average = 0.0
+        self._frames = 0
+    @property
+    def stretch(self):
+        """Quanto os intervalos entre spawns estão alongados (1.0 no ritmo normal)."""
+        return 1 + self.level * self.stretch_per_level
+    def allow(self, kind, alive):
+        """Diz se uma entidade do tipo `kind` pode nascer, com `alive` delas já em jogo."""
+        cap = self.caps.get(kind)
+        if cap is None or alive < cap:
+            return True
+        self.blocked[kind] = self.blocked.get(kind, 0) + 1
+        self._report(kind, f"Limite de {cap} '{kind}' em jogo atingido: novos spawns negados")
+        return False
+    def interval(self, seconds):
+        """Intervalo até o próximo spawn, alongado pelo nível de desaceleração atual."""
+        return seconds * self.stretch
+    def measure(self, seconds):
+        """Soma à média o tempo médio de um passo da simulação no último quadro e ajusta o nível."""
+        if self.level:
+            self.throttled_frames += 1
+        if not self.adaptive:
+            return
+        self.average += (seconds - self.average) * self.smoothing
+        self._frames += 1
+        if self._frames < self.adjust_frames:
+            return
+        self._frames = 0
+        budget = self.budget
+        if self.average > budget and self.level < self.max_level:
+            self.level += 1
+            self.peak_level = max(self.peak_level, self.level)
+            self._report('ritmo', f"Passo médio de {self.average * 1e3:.2f} ms acima do orçamento de "
+                                  f"{budget * 1e3:.2f} ms: intervalo dos spawns x{self.stretch:.2f}")
+        elif self.average < budget * self.relax and self.level > 0:
+            self.level -= 1
+            if self.level == 0:
+                self._report('ritmo', "Passo médio de volta ao orçamento: spawns no ritmo normal")
+    def _report(self, subject, message):
+        now = self.clock()
+        last = self._last_report.get(subject)
+        if last is not None and now - last < self.report_interval:
+            self._suppressed[subject] = self._suppressed.get(subject, 0) + 1
+            return
+        self._last_report[subject] = now
+        suppressed = self._suppressed.pop(subject, 0)
+        extra = f" ({suppressed} avisos omitidos)" if suppressed else ""
+        self.report(f"{message}{extra}")
+    def stats(self):
+        return {'level': self.level, 'stretch': self.stretch, 'peak_level': self.peak_level,
+                'average_ms': self.average * 1e3, 'throttled_frames': self.throttled_frames,
+                'blocked': dict(self.blocked)}
@@ -0,0 +1,225 @@
+"""
+Modo headless do jogo: executa a lógica de game.py em passo fixo, sem janela,
+sem áudio e, a menos que se peça, sem renderização.
+
+O game.py é carregado do mesmo jeito que o runner do PgZero faz (um módulo
+novo com os builtins do PgZero injetados), mas com drivers SDL "dummy", um
+teclado controlado por script no lugar de `keyboard` e objetos silenciosos no
+lugar de `sounds` e `music`. Atores, retângulos e colisões são os do PgZero.
+Com `render=True`, o `screen` do jogo desenha numa superfície fora da tela,
+para medir o custo de draw().
+"""
+import os
+import sys
+from types import ModuleType
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+import pgzero.game
+from pgzero import builtins as pgzero_builtins
+from pgzero import loaders
+from pgzero.constants import keys
+from pgzero.keyboard import Keyboard
+from pgzero.screen import Screen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAME_PATH = os.path.join(ROOT, 'game.py')
+
+# Duração de cada quadro simulado: a mesma do passo fixo do jogo, então cada quadro roda um passo
+FIXED_DT = 1 / 60
+# Limite de segurança para uma partida: 120s de jogo + prelúdio + luta
+MAX_MATCH_SECONDS = 240
+
+# ==============================================================================
+#                      SUBSTITUTOS DE ENTRADA E ÁUDIO
+# ==============================================================================
+
+class ScriptedKeyboard(Keyboard):
+    """Um teclado do PgZero cujas teclas pressionadas são definidas por script."""
+    def __init__(self):
+        self._pressed = set()
+    def set_pressed(self, names):
+        self._pressed = {keys[name.upper()].value for name in names}
+
+class SilentSound:
+    """Um som que não toca nada."""
+    def play(self, *args, **kwargs):
+        pass
+    def stop(self):
+        pass
+    def set_volume(self, volume):
+        pass
+    def get_num_channels(self):
+        return 0
+
+class SilentSounds:
+    """Substituto de `sounds`: valida o nome do arquivo, mas não toca nada."""
+    EXTNS = ['wav', 'ogg', 'oga']
+    def __init__(self, root=ROOT):
+        self._dir = os.path.join(root, 'sounds')
+        self._cache = {}
+    def load(self, name):
+        if name not in self._cache:
+            for ext in self.EXTNS:
+                if os.path.exists(os.path.join(self._dir, f'{name}.{ext}')):
+                    break
+            else:
+                raise KeyError(f"No sound found like '{name}'.")
+            self._cache[name] = SilentSound()
+        return self._cache[name]
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self.load(name)
+        except KeyError as e:
+            raise AttributeError(*e.args) from None
+
+class SilentMusic:
+    """Substituto de `music`: guarda apenas qual faixa estaria tocando."""
+    def __init__(self):
+        self.current = None
+        self.volume = 1.0
+    def play(self, name, loop=True):
+        self.current = name
+    def play_once(self, name):
+        self.current = name
+    def queue(self, name):
+        pass
+    def stop(self):
+        self.current = None
+    def fadeout(self, seconds):
+        self.current = None
+    def pause(self):
+        pass
+    def unpause(self):
+        pass
+    def is_playing(self, name):
+        return self.current is not None
+    def set_volume(self, volume):
+        self.volume = volume
+    def get_volume(self):
+        return self.volume
+
+# ==============================================================================
+#                      SCRIPTS DE ENTRADA (BOTS)
+# ==============================================================================
+
+def script_idle(tick, game):
+    """Não aperta nada."""
+    return ()
+
+def script_runner(tick, game):
+    """Corre para a direita, pulando e atacando em intervalos fixos."""
+    pressed = ['right']
+    if tick % 45 == 0:
+        pressed.append('up')
+    if tick % 30 == 0:
+        pressed.append('space')
+    return pressed
+
+def script_fighter(tick, game):
+    """Persegue o inimigo mais próximo (ou o chefão) e ataca quando perto."""
+    player = game.player
+    targets = [enemy.actor for enemy in game.enemies]
+    if game.boss:
+        targets.append(game.boss.actor)
+    if not targets:
+        return ['up'] if tick % 60 == 0 else ()
+    target = min(targets, key=lambda actor: abs(actor.x - player.actor.x))
+    pressed = []
+    dx = target.x - player.actor.x
+    if abs(dx) > 40:
+        pressed.append('right' if dx > 0 else 'left')
+    if target.y < player.actor.y - 60 and tick % 20 == 0:
+        pressed.append('up')
+    if abs(dx) < 120:
+        pressed.append('space')
+    return pressed
+
+SCRIPTS = {
+    'idle': script_idle,
+    'runner': script_runner,
+    'fighter': script_fighter,
+}
+
+# ==============================================================================
+#                      CARREGAMENTO E EXECUÇÃO
+# ==============================================================================
+
+def load_game(keyboard=None, path=GAME_PATH):
+    """Carrega game.py como um módulo novo, pronto para rodar sem janela."""
+    # Com sys._pgzrun ligado, 'import pgzrun' não mexe no __main__ e
+    # pgzrun.go() retorna sem entrar no loop do PgZero.
+    sys._pgzrun = True
+    loaders.set_root(path)
+    if pygame.display.get_surface() is None:
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+    mod = ModuleType('game')
+    mod.__dict__.update(
+        (k, v) for k, v in vars(pgzero_builtins).items() if not k.startswith('__'))
+    mod.__file__ = path
+    mod.keyboard = keyboard or ScriptedKeyboard()
+    mod.sounds = SilentSounds(os.path.dirname(path))
+    mod.music = SilentMusic()
+    with open(path, encoding='utf-8') as f:
+        code = compile(f.read(), path, 'exec', dont_inherit=True)
+    exec(code, mod.__dict__)
+    return mod
+
+def attach_screen(mod):
+    """Dá ao jogo um `screen` do PgZero que desenha numa superfície fora da tela."""
+    pygame.font.init()
+    # Actor.draw() desenha no screen do módulo pgzero.game
+    mod.screen = pgzero.game.screen = Screen(pygame.Surface((mod.WIDTH, mod.HEIGHT)))
+    return mod.screen
+
+class HeadlessGame:
+    """Roda partidas de game.py em passo fixo, com `random` semeado e entrada por script."""
+    def __init__(self, seed=0, script='fighter', dt=FIXED_DT, god_mode=False, render=False, level=None):
+        self.seed = seed
+        self.script = SCRIPTS[script] if isinstance(script, str) else script
+        self.dt = dt
+        self.god_mode = god_mode
+        self.keyboard = ScriptedKeyboard()
+        self.game = load_game(self.keyboard)
+        # Partidas simuladas não gravam replays em disco, e o ritmo dos spawns não depende da máquina
+        self.game.SAVE_REPLAYS = False
+        self.game.governor.adaptive = False
+        if level is not None:
+            self.game.level = self.game.load_level(level, os.path.join(self.game.GAME_DIR, 'levels'))
+        self.screen = attach_screen(self.game) if render else None
+        self.tick = 0
+    def start_match(self):
+        """Começa uma partida nova pelo menu, como o jogador faria com ENTER."""
+        self.game.match_seed = self.seed
+        self.keyboard.set_pressed(())
+        self.game.change_state('MAIN_MENU')
+        self.game.menu_selection = 0
+        self.game.on_key_down(keys.RETURN)
+        if self.god_mode:
+            self.game.player.lives = 10 ** 9
+        self.tick = 0
+    def step(self, dt=None):
+        """Avança a simulação em um passo fixo (ou de `dt` segundos, como num replay)."""
+        self.keyboard.set_pressed(self.script(self.tick, self.game))
+        self.game.update(self.dt if dt is None else dt)
+        self.tick += 1
+    def draw(self):
+        """Desenha o quadro atual na superfície fora da tela (requer `render=True`)."""
+        self.game.draw()
+    def finished(self):
+        return self.game.game_state in ('GAMEOVER', 'WIN')
+    def run_match(self, max_seconds=MAX_MATCH_SECONDS, on_tick=None):
+        """Joga uma partida inteira e devolve o número de passos simulados."""
+        self.start_match()
+        max_ticks = int(max_seconds / self.dt)
+        while not self.finished() and self.tick < max_ticks:
+            if on_tick:
+                on_tick(self)
+            self.step()
+        return self.tick
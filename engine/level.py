@@ -0,0 +1,157 @@
+"""
+Níveis em JSON (pasta levels/), divididos em pedaços carregados em volta da câmera.
+
+Formato de um nível:
+
+    {
+      "name": "Campina",
+      "width": 1270,             largura do mundo em pixels
+      "wrap": true,              o coelho sai por um lado e volta pelo outro
+      "chunk_width": 1270,       largura de cada pedaço carregado de uma vez
+      "player": [150, 0],        posição inicial (meio da base do coelho)
+      "spawners": [[600, 30]],   nuvens que geram inimigos: [x, y] (meio do topo)
+                                 ou [x, y, esquerda, direita] da patrulha
+      "ground": {"image": "ground_grass", "y": 700, "spacing": 400},
+      "platforms": [["ground_grass", 10, 520], ...]
+    }
+
+Sem limites, a nuvem patrulha o mundo inteiro. O chão é uma fileira de
+blocos repetidos a cada `spacing` pixels ao longo de todo o mundo; as
+plataformas são `[imagem, x, y]` com (x, y) no meio do topo do bloco. Cada
+bloco pertence ao pedaço onde está o seu x.
+"""
+import json
+import math
+import os
+
+class Chunk:
+    """
+    Um pedaço do nível: o intervalo [left, right) no eixo x e os blocos que
+    caem nele, na ordem do arquivo (primeiro o chão, depois as plataformas).
+
+    `populated` diz se as moedas e cenouras do pedaço já foram sorteadas, e
+    `loot` guarda as que sobraram enquanto o pedaço está descarregado.
+    """
+    __slots__ = ('index', 'left', 'right', 'platforms', 'populated', 'loot')
+    def __init__(self, index, left, right):
+        self.index = index
+        self.left = left
+        self.right = right
+        self.platforms = []
+        self.populated = False
+        self.loot = []
+    def __repr__(self):
+        return f"Chunk({self.index}, {self.left}, {self.right}, {len(self.platforms)} blocos)"
+
+class Level:
+    """Um nível já lido e dividido em pedaços; `name` é o nome do arquivo e `title`, o do jogo."""
+    def __init__(self, data, name=''):
+        self.name = name
+        try:
+            self.title = data.get('name', name)
+            self.width = int(data['width'])
+            self.wrap = bool(data.get('wrap', False))
+            self.chunk_width = int(data.get('chunk_width', self.width))
+            self.player_start = tuple(data['player'])
+            self.spawners = [self._spawner(*spawner) for spawner in data.get('spawners', ())]
+            ground = data.get('ground')
+            platforms = [(image, x, y) for image, x, y in data.get('platforms', ())]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"nível '{name}' inválido: {e!r}") from None
+        if self.width <= 0 or self.chunk_width <= 0:
+            raise ValueError(f"nível '{name}' inválido: largura e largura dos pedaços precisam ser positivas")
+        count = math.ceil(self.width / self.chunk_width)
+        self.chunks = [Chunk(i, i * self.chunk_width, min((i + 1) * self.chunk_width, self.width))
+                       for i in range(count)]
+        if ground:
+            spacing = ground['spacing']
+            # Como no nível original, o chão passa um pouco da borda direita do mundo
+            for i in range(int(self.width / spacing) + 2):
+                self._add_platform(ground['image'], i * spacing + (spacing // 2), ground['y'])
+        for image, x, y in platforms:
+            self._add_platform(image, x, y)
+    def _spawner(self, x, y, left=0, right=None):
+        return (x, y, left, self.width if right is None else right)
+    def _add_platform(self, image, x, y):
+        self.chunks[self.chunk_index(x)].platforms.append((image, x, y))
+    def chunk_index(self, x):
+        """Índice do pedaço que contém o x dado (as bordas valem para o que estiver fora do mundo)."""
+        return min(max(int(x // self.chunk_width), 0), len(self.chunks) - 1)
+    def reset(self):
+        """Esquece o que foi sorteado e coletado, para começar uma partida nova."""
+        for chunk in self.chunks:
+            chunk.populated = False
+            chunk.loot = []
+
+def load_level(name, levels_dir):
+    """Lê levels/<name>.json."""
+    path = os.path.join(levels_dir, f'{name}.json')
+    with open(path, encoding='utf-8') as f:
+        return Level(json.load(f), name)
+
+class Camera:
+    """
+    A janela de visão sobre o mundo, com a largura da tela. Segue o x do
+    jogador sem sair das bordas do nível; travada, fica parada (a arena da
+    luta contra o chefão).
+    """
+    __slots__ = ('view_width', 'world_width', 'left', 'locked')
+    def __init__(self, view_width, world_width):
+        self.view_width = view_width
+        self.world_width = world_width
+        self.left = 0
+        self.locked = False
+    @property
+    def right(self):
+        return self.left + self.view_width
+    @property
+    def center_x(self):
+        return self.left + self.view_width / 2
+    def follow(self, x):
+        if self.locked:
+            return
+        left = int(round(x - self.view_width / 2))
+        self.left = max(0, min(left, self.world_width - self.view_width))
+
+class ChunkStreamer:
+    """
+    Mantém carregados só os pedaços do nível que tocam a câmera, com uma
+    margem de cada lado. `load(chunk)` e `unload(chunk)` são chamados quando
+    um pedaço entra ou sai da região; `update()` devolve True se algo mudou.
+    """
+    def __init__(self, level, margin, load, unload):
+        self.level = level
+        self.margin = margin
+        self.load = load
+        self.unload = unload
+        self.loaded = {}
+        self._range = None
+        self.loads = 0
+        self.unloads = 0
+    def region(self):
+        """Intervalo [left, right) do mundo coberto pelos pedaços carregados."""
+        if not self.loaded:
+            return (0, 0)
+        chunks = self.level.chunks
+        first, last = self._range
+        return (chunks[first].left, chunks[last].right)
+    def update(self, left, right):
+        level = self.level
+        wanted = (level.chunk_index(left - self.margin), level.chunk_index(right + self.margin))
+        if wanted == self._range:
+            return False
+        first, last = wanted
+        for index in sorted(self.loaded):
+            if not first <= index <= last:
+                self.unload(self.loaded.pop(index))
+                self.unloads += 1
+        for index in range(first, last + 1):
+            if index not in self.loaded:
+                chunk = level.chunks[index]
+                self.loaded[index] = chunk
+                self.load(chunk)
+                self.loads += 1
+        self._range = wanted
+        return True
+    def loaded_chunks(self):
+        return [self.loaded[index] for index in sorted(self.loaded)]
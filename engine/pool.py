@@ -0,0 +1,33 @@
+"""Pools de objetos reaproveitáveis."""
+
+class Pool:
+    """
+    Reaproveita instâncias de uma classe de entidade.
+
+    `acquire(*args)` devolve um objeto livre reiniciado com `obj.reset(*args)`
+    ou, se não houver nenhum, cria um novo com `factory(*args)`. Objetos que
+    saem de jogo voltam com `release(obj)`. Os contadores de acertos e falhas
+    ficam expostos para o profiling.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.hits = 0
+        self.misses = 0
+        self._free = []
+        self._free_ids = set()
+    def acquire(self, *args):
+        if self._free:
+            obj = self._free.pop()
+            self._free_ids.discard(id(obj))
+            obj.reset(*args)
+            self.hits += 1
+            return obj
+        self.misses += 1
+        return self.factory(*args)
+    def release(self, obj):
+        if id(obj) in self._free_ids:
+            raise ValueError(f"{obj!r} já foi devolvido à pool")
+        self._free_ids.add(id(obj))
+        self._free.append(obj)
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'free': len(self._free)}
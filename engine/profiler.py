@@ -0,0 +1,139 @@
+"""
+Profiler de quadros: mede o tempo de cada etapa do update() e do draw().
+
+As etapas são funções e métodos do jogo, dados pelo nome ('update_enemies',
+'Player.move', 'audio.flush'). Só enquanto o profiler está ligado elas são
+trocadas por versões cronometradas; desligado, o jogo roda sem nenhuma
+medição no caminho.
+
+A cada passo, `next_tick()` fecha a linha do passo anterior: o tempo somado
+de cada etapa naquele passo (update e o draw que vem depois dele). As
+últimas `window` linhas alimentam os percentis (p50/p95/p99) do overlay, e
+as últimas `trace_limit` ficam guardadas para `export()` em CSV ou JSON.
+"""
+import csv
+import json
+import time
+from collections import deque
+
+class FrameProfiler:
+    """
+    Cronometra as etapas `stages`, uma sequência de (rótulo, nome), onde o
+    nome é procurado em `namespace` (os globais do jogo), com um atributo
+    opcional depois do ponto.
+    """
+    def __init__(self, namespace, stages, window=600, trace_limit=36000, clock=time.perf_counter):
+        self.namespace = namespace
+        self.stages = tuple(stages)
+        self.labels = tuple(label for label, _ in self.stages)
+        self.window = window
+        self.clock = clock
+        self.enabled = False
+        self.samples = {label: deque(maxlen=window) for label in ('quadro',) + self.labels}
+        self.trace = deque(maxlen=trace_limit)
+        self._patched = []
+        self._row = None
+        self._totals = {}
+    def _resolve(self, name):
+        """Devolve (dono, atributo) do nome: um global do jogo ou um atributo de um deles."""
+        if '.' not in name:
+            return self.namespace, name
+        owner, attr = name.split('.', 1)
+        return self.namespace[owner], attr
+    def _timed(self, label, func):
+        clock = self.clock
+        totals = self._totals
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                totals[label] = totals.get(label, 0.0) + clock() - start
+        timed.__wrapped__ = func
+        return timed
+    def enable(self):
+        """Liga o profiler, trocando as etapas pelas versões cronometradas e zerando as medições."""
+        if self.enabled:
+            return
+        for samples in self.samples.values():
+            samples.clear()
+        self.trace.clear()
+        self._row = None
+        self._totals.clear()
+        for label, name in self.stages:
+            owner, attr = self._resolve(name)
+            if isinstance(owner, dict):
+                original = owner[attr]
+                owner[attr] = self._timed(label, original)
+                self._patched.append((owner, attr, True, original))
+            else:
+                # Métodos de classe ficam no __dict__ da classe; os de instância são ligados na hora
+                own = attr in vars(owner)
+                original = vars(owner)[attr] if own else getattr(owner, attr)
+                setattr(owner, attr, self._timed(label, original))
+                self._patched.append((owner, attr, own, original))
+        self.enabled = True
+    def disable(self):
+        """Desliga o profiler e devolve as etapas originais (as medições continuam disponíveis)."""
+        if not self.enabled:
+            return
+        self._commit()
+        for owner, attr, own, original in reversed(self._patched):
+            if isinstance(owner, dict):
+                owner[attr] = original
+            elif own:
+                setattr(owner, attr, original)
+            else:
+                delattr(owner, attr)
+        self._patched.clear()
+        self.enabled = False
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+    def next_tick(self, tick, state, dt):
+        """Fecha a linha do passo anterior e começa a do passo `tick`, no estado `state`, de `dt` segundos."""
+        self._commit()
+        self._row = (tick, state, dt)
+    def _commit(self):
+        if self._row is None:
+            return
+        tick, state, dt = self._row
+        totals = self._totals
+        samples = self.samples
+        samples['quadro'].append(dt)
+        for label, seconds in totals.items():
+            samples[label].append(seconds)
+        self.trace.append((tick, state, dt, *(totals.get(label) for label in self.labels)))
+        totals.clear()
+        self._row = None
+    def percentiles(self, label, points=(50, 95, 99)):
+        """Percentis, em segundos, da etapa `label` nos últimos passos em que ela rodou."""
+        ordered = sorted(self.samples[label])
+        if not ordered:
+            return None
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(round(last * point / 100)))] for point in points)
+    def summary(self):
+        """(rótulo, p50, p95, p99) do quadro e de cada etapa medida, em milissegundos."""
+        rows = []
+        for label in ('quadro',) + self.labels:
+            values = self.percentiles(label)
+            if values is not None:
+                rows.append((label, *(value * 1e3 for value in values)))
+        return rows
+    def export(self, path):
+        """Grava as linhas guardadas em CSV ou JSON (pela extensão de `path`); devolve quantas."""
+        columns = ('tick', 'state', 'dt_ms') + tuple(f'{label}_ms' for label in self.labels)
+        rows = [(tick, state, *(None if value is None else round(value * 1e3, 4) for value in values))
+                for tick, state, *values in self.trace]
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                json.dump({'columns': columns, 'rows': rows}, f)
+            else:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(['' if value is None else value for value in row] for row in rows)
+        return len(rows)
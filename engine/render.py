@@ -0,0 +1,111 @@
+"""Renderização em camadas, com retângulos sujos."""
+import pgzero
+import pygame
+
+class LayeredRenderer:
+    """
+    Desenha o quadro em duas camadas.
+
+    O fundo (a cor do céu mais uma camada estática, como as plataformas do
+    nível) é composto uma única vez numa superfície opaca e só é refeito
+    quando a cor, a camada ou o nível mudam. A cada quadro, em vez de pintar
+    a tela inteira e redesenhar o cenário, o renderizador copia do fundo
+    apenas as áreas onde algo foi desenhado no quadro anterior e desenha por
+    cima os sprites móveis e a interface, guardando as áreas que eles ocupam.
+
+    Tudo que aparece na tela precisa passar por `blit`, `draw`, `draw_overlay`
+    ou `fill`, senão não é apagado no quadro seguinte. A tela precisa manter o
+    conteúdo entre um quadro e outro (o caso da janela do PgZero).
+
+    As camadas estáticas e os Actors de `draw` estão em coordenadas do mundo
+    e são deslocados pela rolagem horizontal da câmera (`scroll_x`); `blit`,
+    `fill` e `draw_overlay` desenham direto nas coordenadas da tela (a
+    interface). Quando a câmera anda, o fundo é recomposto.
+    """
+    def __init__(self):
+        self.target = None
+        self._layers = {}
+        self._version = 0
+        self._background = None
+        self._background_key = None
+        self._restored = []
+        self._drawn = []
+        self.scroll_x = 0
+        self.frames = 0
+        self.full_redraws = 0
+        self.frame_blits = 0
+        self.frame_restores = 0
+    def set_layer(self, name, actors):
+        """Define (ou troca) uma camada estática; o fundo é recomposto no próximo quadro."""
+        self._layers[name] = [(self._surface(actor), actor.topleft) for actor in actors]
+        self._version += 1
+    def invalidate(self):
+        """Força o próximo quadro a redesenhar a tela inteira."""
+        self._background_key = None
+    def _surface(self, actor):
+        # A mesma superfície (já girada/espelhada) que o Actor.draw() usa. O PgZero não expõe
+        # essa superfície publicamente; se uma versão nova mudar o atributo, o erro diz o porquê
+        # em vez de o renderizador desenhar a imagem original sem a rotação
+        try:
+            return actor._surf
+        except AttributeError:
+            raise RuntimeError(f"Actor sem o atributo interno '_surf' (PgZero {pgzero.__version__}): "
+                               f"LayeredRenderer precisa ser ajustado a esta versão") from None
+    def _compose(self, color, layer):
+        size = self.target.get_size()
+        if self._background is None or self._background.get_size() != size:
+            self._background = pygame.Surface(size, 0, self.target)
+        background = self._background
+        background.fill(color)
+        if layer is not None:
+            blits = self._layers[layer]
+            scroll_x = self.scroll_x
+            if scroll_x:
+                blits = [(surface, (x - scroll_x, y)) for surface, (x, y) in blits]
+            background.blits(blits, doreturn=False)
+    def begin(self, target, color, layer=None, scroll_x=0):
+        """
+        Começa um quadro sobre `target`, com o fundo de cor `color`, a camada
+        estática `layer` e a câmera rolada `scroll_x` pixels para a direita.
+        """
+        key = (color, layer, self._version, scroll_x)
+        previous = self._drawn
+        self._drawn = []
+        self.scroll_x = scroll_x
+        self.frames += 1
+        self.frame_blits = 0
+        if target is not self.target or key != self._background_key:
+            self.target = target
+            self._compose(color, layer)
+            self._background_key = key
+            target.blit(self._background, (0, 0))
+            self.full_redraws += 1
+            self._restored = [target.get_rect()]
+        else:
+            background = self._background
+            for rect in previous:
+                target.blit(background, rect, rect)
+            self._restored = previous
+        self.frame_restores = len(self._restored)
+    def blit(self, surface, pos):
+        self._drawn.append(self.target.blit(surface, pos))
+        self.frame_blits += 1
+    def draw(self, actor):
+        """Desenha um Actor posicionado no mundo."""
+        x, y = actor.topleft
+        self.blit(self._surface(actor), (x - self.scroll_x, y))
+    def draw_overlay(self, actor):
+        """Desenha um Actor posicionado na tela, fora da rolagem (botões da interface)."""
+        self.blit(self._surface(actor), actor.topleft)
+    def fill(self, rect, color):
+        self._drawn.append(self.target.fill(color, rect))
+        self.frame_blits += 1
+    def changed_rects(self):
+        """
+        Devolve as áreas da tela que mudaram no quadro (as apagadas e as
+        desenhadas), que é o que `pygame.display.update` precisaria receber.
+        """
+        return self._restored + self._drawn
+    def stats(self):
+        return {'frames': self.frames, 'full_redraws': self.full_redraws,
+                'blits_last_frame': self.frame_blits, 'restores_last_frame': self.frame_restores}
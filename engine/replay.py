@@ -0,0 +1,246 @@
+"""
+Gravação e replay da entrada de uma partida.
+
+Cada partida começa com uma semente nova para o `random` e, a cada quadro,
+o jogo grava quais teclas da partida estavam apertadas, o `dt` recebido do
+PgZero e o nível de desaceleração dos spawns (que depende do tempo medido
+na máquina, então não pode ser medido de novo). Com a semente e essa
+sequência, a partida inteira é refeita no modo headless, passo a passo,
+muitas vezes mais rápido que o tempo real:
+
+    python -m engine.replay info replays/<arquivo>.bbr
+    python -m engine.replay run replays/<arquivo>.bbr
+    python -m engine.replay run replays/<arquivo>.bbr --profile 5321
+    python -m engine.replay run replays/<arquivo>.bbr --trace passos.csv
+
+`info` lista também os quadros mais longos da gravação: um `dt` alto no
+passo t quer dizer que o quadro anterior (t - 1) travou. `run --profile t`
+refaz a partida até ali e mede com o cProfile só aquele passo, e
+`run --trace` liga o profiler de quadros do jogo e exporta o tempo de cada
+etapa em cada passo (CSV ou JSON, pela extensão).
+
+Formato do arquivo (little-endian): o cabeçalho
+
+    'BBRP', versão (u8), semente (u32), passos (u32), pontuação final (i32),
+    nível e estado final (u8 + UTF-8 cada)
+
+seguido das sequências (u16 repetições, u8 teclas, f64 dt) comprimidas com
+zlib: um trecho em que nada muda vira uma sequência só. As teclas ocupam os
+4 bits baixos do u8 e o nível de desaceleração dos spawns, os 4 altos.
+"""
+import argparse
+import cProfile
+import pstats
+import random
+import struct
+import sys
+import time
+import zlib
+
+MAGIC = b'BBRP'
+# Versão 2: o dt de cada quadro passa pelo passo fixo da simulação (as de antes não são refeitas igual)
+VERSION = 2
+HEADER = struct.Struct('<4sBIIi')
+RUN = struct.Struct('<HBd')
+MAX_RUN = 0xFFFF
+# Teclas lidas durante a partida, na ordem dos bits da máscara
+REPLAY_KEYS = ('left', 'right', 'up', 'space')
+# Bits da máscara a partir dos quais vai o nível de desaceleração dos spawns
+LEVEL_SHIFT = 4
+
+def new_seed():
+    """Sorteia a semente de uma partida nova, sem tocar no estado do `random`."""
+    return random.SystemRandom().getrandbits(32)
+
+class InputLog:
+    """
+    A entrada de uma partida: semente, nível e, por passo, a máscara das
+    teclas apertadas e o `dt`, guardados como sequências de passos iguais.
+    """
+    def __init__(self, seed, level, keys=REPLAY_KEYS):
+        self.seed = seed
+        self.level = level
+        self.keys = keys
+        self.runs = []
+        self.ticks = 0
+        self.final_state = ''
+        self.final_score = 0
+    def append(self, mask, dt):
+        runs = self.runs
+        if runs:
+            last = runs[-1]
+            if last[1] == mask and last[2] == dt and last[0] < MAX_RUN:
+                last[0] += 1
+                self.ticks += 1
+                return
+        runs.append([1, mask, dt])
+        self.ticks += 1
+    def frames(self):
+        """Gera (máscara, dt) de cada passo, em ordem."""
+        for count, mask, dt in self.runs:
+            for _ in range(count):
+                yield mask, dt
+    def pressed(self, mask):
+        """Nomes das teclas de uma máscara."""
+        return tuple(name for bit, name in enumerate(self.keys) if mask & (1 << bit))
+    def throttle_level(self, mask):
+        """Nível de desaceleração dos spawns gravado numa máscara."""
+        return mask >> LEVEL_SHIFT
+    def to_bytes(self):
+        text = b''.join(bytes((len(value),)) + value
+                        for value in (self.level.encode('utf-8'), self.final_state.encode('utf-8')))
+        body = b''.join(RUN.pack(*run) for run in self.runs)
+        return (HEADER.pack(MAGIC, VERSION, self.seed, self.ticks, self.final_score)
+                + text + zlib.compress(body))
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, ticks, score = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("arquivo de replay inválido ou de outra versão")
+        offset = HEADER.size
+        text = []
+        for _ in range(2):
+            size = data[offset]
+            text.append(data[offset + 1:offset + 1 + size].decode('utf-8'))
+            offset += 1 + size
+        log = cls(seed, text[0])
+        log.final_state = text[1]
+        log.final_score = score
+        body = zlib.decompress(data[offset:])
+        log.runs = [list(run) for run in RUN.iter_unpack(body)]
+        log.ticks = sum(run[0] for run in log.runs)
+        if log.ticks != ticks:
+            raise ValueError(f"replay corrompido: {log.ticks} passos gravados, {ticks} esperados")
+        return log
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+class ReplayRecorder:
+    """Grava a entrada do jogo enquanto uma partida está em andamento."""
+    def __init__(self, keys=REPLAY_KEYS):
+        self.keys = keys
+        self.log = None
+        self.active = False
+    def start(self, seed, level):
+        self.log = InputLog(seed, level, self.keys)
+        self.active = True
+    def record(self, keyboard, dt, level=0):
+        """Grava as teclas apertadas em `keyboard`, o `dt` e o nível de desaceleração dos spawns de um passo."""
+        mask = level << LEVEL_SHIFT
+        for bit, name in enumerate(self.keys):
+            if getattr(keyboard, name):
+                mask |= 1 << bit
+        self.log.append(mask, dt)
+    def finish(self, state, score):
+        """Encerra a gravação anotando como a partida terminou; devolve o log."""
+        self.active = False
+        self.log.final_state = state
+        self.log.final_score = score
+        return self.log
+    @property
+    def tick(self):
+        """Passo atual da gravação (o índice que o replay usa)."""
+        return self.log.ticks if self.log is not None else 0
+
+# ==============================================================================
+#                      RE-SIMULAÇÃO HEADLESS
+# ==============================================================================
+
+def replay(log, until=None, on_tick=None, profile=False):
+    """
+    Refaz a partida de `log` no modo headless e devolve o HeadlessGame no fim
+    (ou antes do passo `until`). `on_tick(runner, dt)` é chamado antes de
+    cada passo; com `profile`, o profiler de quadros do jogo fica ligado.
+    """
+    # O modo headless troca os drivers do SDL, então só é importado aqui
+    from engine.headless import HeadlessGame
+    masks = [mask for mask, _ in log.frames()]
+    names = {mask: log.pressed(mask) for mask in set(masks)}
+    runner = HeadlessGame(seed=log.seed, script=lambda tick, game: names[masks[tick]], level=log.level)
+    runner.start_match()
+    governor = runner.game.governor
+    if profile:
+        runner.game.profiler.enable()
+    for tick, (mask, dt) in enumerate(log.frames()):
+        if tick == until:
+            break
+        if on_tick:
+            on_tick(runner, dt)
+        governor.level = log.throttle_level(mask)
+        runner.step(dt)
+    return runner
+
+def slowest_frames(log, count):
+    """Os `count` passos com o maior `dt` gravado, como (passo, dt)."""
+    frames = [(tick, dt) for tick, (_, dt) in enumerate(log.frames())]
+    return sorted(frames, key=lambda frame: frame[1], reverse=True)[:count]
+
+def run_info(log, args):
+    duration = sum(dt for _, dt in log.frames())
+    print(f"semente {log.seed}, nível '{log.level}', {log.ticks} passos ({duration:.1f}s), "
+          f"{len(log.runs)} sequências, {len(log.to_bytes())} bytes")
+    print(f"fim: {log.final_state or '(não terminou)'} com {log.final_score} pontos")
+    print("quadros mais longos (o passo anterior travou):")
+    for tick, dt in slowest_frames(log, args.top):
+        print(f"  passo {tick:>6}: dt {dt * 1e3:7.1f} ms")
+
+def run_replay(log, args):
+    if args.profile is not None:
+        runner = replay(log, until=args.profile)
+        dt = next(dt for tick, (_, dt) in enumerate(log.frames()) if tick == args.profile)
+        profiler = cProfile.Profile()
+        profiler.runcall(runner.step, dt)
+        print(f"passo {args.profile} ({runner.game.game_state}):")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(args.top)
+        return
+    perf_counter = time.perf_counter
+    starts = []
+    simulated = 0.0
+    def on_tick(runner, dt):
+        nonlocal simulated
+        starts.append(perf_counter())
+        simulated += dt
+    runner = replay(log, until=args.until, on_tick=on_tick, profile=args.trace is not None)
+    starts.append(perf_counter())
+    # Sem contar a carga do game.py, que acontece antes do primeiro passo
+    elapsed = starts[-1] - starts[0]
+    game = runner.game
+    print(f"{runner.tick} passos em {elapsed:.2f}s ({simulated / elapsed:.0f}x o tempo real): "
+          f"{game.game_state} com {game.player.score} pontos")
+    if args.trace is not None:
+        # Fecha a linha do último passo antes de exportar
+        runner.game.profiler.disable()
+        print(f"{runner.game.profiler.export(args.trace)} passos exportados para {args.trace}")
+    print("passos mais lentos na re-simulação:")
+    steps = sorted(((starts[tick + 1] - starts[tick], tick) for tick in range(len(starts) - 1)), reverse=True)
+    for seconds, tick in steps[:args.top]:
+        print(f"  passo {tick:>6}: {seconds * 1e3:7.2f} ms")
+    if args.until is None and log.final_state:
+        if (game.game_state, game.player.score) != (log.final_state, log.final_score):
+            print(f"ERRO: a partida gravada terminou em {log.final_state} com {log.final_score} pontos",
+                  file=sys.stderr)
+            sys.exit(1)
+        print("o resultado confere com o da partida gravada")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay das partidas do Bunny Brave")
+    parser.add_argument('command', choices=['info', 'run'])
+    parser.add_argument('path', help='arquivo .bbr gravado pelo jogo')
+    parser.add_argument('--until', type=int, help='para antes deste passo')
+    parser.add_argument('--profile', type=int, help='mede com o cProfile só este passo')
+    parser.add_argument('--trace', help='exporta o tempo de cada etapa por passo (.csv ou .json)')
+    parser.add_argument('--top', type=int, default=10, help='quantas linhas listar')
+    args = parser.parse_args(argv)
+    log = InputLog.load(args.path)
+    if args.command == 'info':
+        run_info(log, args)
+    else:
+        run_replay(log, args)
+
+if __name__ == '__main__':
+    main()
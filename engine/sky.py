@@ -0,0 +1,74 @@
+"""Céu de fundo: linhas do tempo de cores pré-calculadas."""
+
+class SkyTimeline:
+    """
+    Cores do céu ao longo de uma fase, pré-calculadas numa tabela.
+
+    `keyframes` é uma lista de `(segundos, (r, g, b))` em ordem crescente de
+    tempo. Entre dois quadros-chave a cor é interpolada linearmente (cada
+    componente truncado para inteiro); antes do primeiro vale a primeira cor
+    e depois do último, a última. A tabela guarda `samples_per_second` cores
+    por segundo, então consultar a cor de um quadro é só indexar a tabela.
+    """
+    def __init__(self, keyframes, samples_per_second=60):
+        if not keyframes:
+            raise ValueError("a linha do tempo do céu precisa de pelo menos um quadro-chave")
+        self.keyframes = [(float(t), tuple(color)) for t, color in keyframes]
+        self.samples_per_second = samples_per_second
+        end = self.keyframes[-1][0]
+        colors = {}
+        # Amostras com a mesma cor compartilham a mesma tupla
+        self._colors = [colors.setdefault(color, color)
+                        for color in map(self._interpolate,
+                                         (i / samples_per_second
+                                          for i in range(int(end * samples_per_second) + 1)))]
+    def __len__(self):
+        return len(self._colors)
+    def _interpolate(self, t):
+        keyframes = self.keyframes
+        if t <= keyframes[0][0]:
+            return keyframes[0][1]
+        for (t0, c0), (t1, c1) in zip(keyframes, keyframes[1:]):
+            if t <= t1:
+                progress = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+                return tuple(int(a + (b - a) * progress) for a, b in zip(c0, c1))
+        return keyframes[-1][1]
+    def color_at(self, seconds):
+        index = int(seconds * self.samples_per_second)
+        colors = self._colors
+        if index >= len(colors):
+            return colors[-1]
+        return colors[index] if index > 0 else colors[0]
+
+class Sky:
+    """
+    O céu do jogo: uma linha do tempo por estado. Estados sem linha do tempo
+    (menus, fim de jogo) mantêm a última cor mostrada.
+
+    O primeiro quadro-chave de uma fase pode ter a cor None: a cor de partida
+    só é conhecida quando a fase começa, e `start()` refaz a tabela dela.
+    Até lá vale a cor `color`.
+    """
+    def __init__(self, keyframes_by_state, color, samples_per_second=60):
+        self.color = tuple(color)
+        self.samples_per_second = samples_per_second
+        self.keyframes = {state: list(keyframes) for state, keyframes in keyframes_by_state.items()}
+        self.timelines = {state: self._timeline(keyframes, self.color)
+                          for state, keyframes in self.keyframes.items()}
+    def _timeline(self, keyframes, start_color):
+        (t, color), *rest = keyframes
+        return SkyTimeline([(t, start_color if color is None else color)] + rest, self.samples_per_second)
+    def start(self, state, color):
+        """Refaz a linha do tempo de `state` partindo de `color`, se o primeiro quadro-chave dela não tem cor."""
+        keyframes = self.keyframes[state]
+        if keyframes[0][1] is None:
+            self.timelines[state] = self._timeline(keyframes, color)
+    def color_at(self, state, seconds):
+        """A cor da linha do tempo de `state` aos `seconds` segundos, sem mudar o céu."""
+        return self.timelines[state].color_at(seconds)
+    def update(self, state, seconds):
+        """Devolve a cor do céu no estado `state`, `seconds` segundos depois do início dele."""
+        timeline = self.timelines.get(state)
+        if timeline is not None:
+            self.color = timeline.color_at(seconds)
+        return self.color
@@ -0,0 +1,196 @@
+"""Trilha sonora: faixas de music/ em streaming, pré-carga da próxima e transição cruzada."""
+import os
+import sys
+import threading
+import time
+
+import pygame
+
+# Extensões aceitas pelo carregador de música do PgZero, na mesma ordem
+EXTENSIONS = ('mp3', 'ogg', 'oga')
+
+class Soundtrack:
+    """
+    Controla a música de fundo sem consultar o mixer a cada quadro.
+
+    Normalmente as faixas tocam em streaming pelo `music` do PgZero, lidas
+    aos poucos de music/. `prebuffer(nome)` decodifica uma faixa inteira
+    numa thread, enquanto outra coisa toca. Quando essa faixa é pedida,
+    ela toca num canal reservado do mixer, sem nenhuma espera, entrando
+    aos poucos enquanto a faixa anterior sai (`crossfade` segundos).
+
+    `play()` guarda a faixa que deveria estar tocando e não faz nada se ela
+    já é a atual; o repetir fica a cargo do próprio mixer. Com `muted`, a
+    música para, e ao desligar o mudo a faixa atual volta: a de repetir, do
+    começo; a que toca uma vez só, do ponto em que estaria se não tivesse
+    sido silenciada (ou fica quieta, se já teria acabado). Sem mixer (modo
+    headless), só o streaming é usado.
+    """
+    def __init__(self, music, music_dir, crossfade=1.0, clock=time.monotonic):
+        self.music = music
+        self.music_dir = music_dir
+        self.crossfade = crossfade
+        self.clock = clock
+        self.track = None
+        self.loop = True
+        self.source = None
+        self._started = 0.0
+        self._muted = False
+        self._buffers = {}
+        self._loading = {}
+        self._channel = None
+    def _path(self, name):
+        for ext in EXTENSIONS:
+            path = os.path.join(self.music_dir, f'{name}.{ext}')
+            if os.path.isfile(path):
+                return path
+        raise FileNotFoundError(f"música não encontrada em {self.music_dir}: {name}")
+    def _mixer_channel(self):
+        if self._channel is None and pygame.mixer.get_init():
+            # O canal 0 fica reservado para a trilha: os efeitos sonoros não o roubam
+            pygame.mixer.set_reserved(1)
+            self._channel = pygame.mixer.Channel(0)
+        return self._channel
+    def prebuffer(self, name):
+        """Começa a decodificar a faixa `name` em segundo plano, se ainda não estiver pronta."""
+        if name in self._buffers or name in self._loading or self._mixer_channel() is None:
+            return
+        path = self._path(name)
+        thread = threading.Thread(target=self._decode, args=(name, path), daemon=True)
+        self._loading[name] = thread
+        thread.start()
+    def _decode(self, name, path):
+        try:
+            self._buffers[name] = pygame.mixer.Sound(path)
+        except Exception as e:
+            print(f"Erro ao pré-carregar a música '{name}': {e}")
+        finally:
+            self._loading.pop(name, None)
+    def is_buffered(self, name):
+        return name in self._buffers
+    def play(self, name, loop=True):
+        """Toca a faixa `name` (em laço, a menos que `loop` seja False), trocando com a atual."""
+        if name == self.track and loop == self.loop:
+            return
+        self.track = name
+        self.loop = loop
+        if self._muted:
+            # A faixa "começa" agora mesmo sem som, para que o desligar do mudo a retome do ponto certo
+            self._started = self.clock()
+        else:
+            self._start()
+    def stop(self):
+        """Para a música, deixando-a sumir aos poucos."""
+        self.track = None
+        self._fade_out()
+    def _fade_out(self, fade=True):
+        try:
+            if self.source == 'stream':
+                if fade:
+                    self.music.fadeout(self.crossfade)
+                else:
+                    self.music.stop()
+            elif self.source == 'buffer':
+                if fade:
+                    self._channel.fadeout(int(self.crossfade * 1000))
+                else:
+                    self._channel.stop()
+        except Exception as e:
+            print(f"Erro ao tentar parar a música: {e}")
+        self.source = None
+    def _skip(self, buffer, seconds):
+        """Uma cópia da faixa decodificada `buffer` sem os primeiros `seconds` segundos, ou None se ela já acabou."""
+        frequency, size, channels = pygame.mixer.get_init()
+        offset = int(seconds * frequency) * (abs(size) // 8) * channels
+        raw = buffer.get_raw()
+        if offset >= len(raw):
+            return None
+        return pygame.mixer.Sound(buffer=raw[offset:])
+    def _start(self, position=0.0):
+        """Toca a faixa atual a partir de `position` segundos."""
+        name = self.track
+        buffer = self._buffers.get(name)
+        self._started = self.clock() - position
+        try:
+            if buffer is not None:
+                self._fade_out()
+                if position:
+                    buffer = self._skip(buffer, position)
+                    if buffer is None:
+                        return
+                self._channel.play(buffer, loops=-1 if self.loop else 0, fade_ms=int(self.crossfade * 1000))
+                self.source = 'buffer'
+            else:
+                if self.source == 'buffer':
+                    self._fade_out()
+                # Começar uma faixa no streaming enquanto a anterior ainda some
+                # trava até o fim da transição, então a anterior é cortada
+                self.music.stop()
+                if self.loop:
+                    self.music.play(name)
+                else:
+                    self.music.play_once(name)
+                if position and pygame.mixer.get_init():
+                    # Logo depois de play(), o set_pos de um MP3 (relativo) e o de um OGG (absoluto) coincidem
+                    pygame.mixer.music.set_pos(position)
+                self.source = 'stream'
+        except Exception as e:
+            print(f"Erro ao tentar tocar a música '{name}': {e}")
+    @property
+    def position(self):
+        """Segundos desde o começo da faixa atual, contando o tempo em que ela esteve silenciada."""
+        return self.clock() - self._started
+    @property
+    def muted(self):
+        return self._muted
+    @muted.setter
+    def muted(self, muted):
+        muted = bool(muted)
+        if muted == self._muted:
+            return
+        self._muted = muted
+        if muted:
+            self._fade_out(fade=False)
+        elif self.track is not None:
+            self._start(0.0 if self.loop else self.position)
+
+def main():
+    """Confere, com um relógio falso e sem mixer, de onde a faixa volta quando o mudo é desligado."""
+    class Music:
+        def play(self, name): pass
+        def play_once(self, name): pass
+        def stop(self): pass
+        def fadeout(self, seconds): pass
+    now = [0.0]
+    soundtrack = Soundtrack(Music(), '', clock=lambda: now[0])
+    def at(seconds, action):
+        now[0] = seconds
+        action()
+    def mute(muted):
+        return lambda: setattr(soundtrack, 'muted', muted)
+    # (descrição, passos (instante, ação), posição esperada ao desligar o mudo)
+    cases = [
+        ("faixa de repetir volta do começo",
+         [(0, lambda: soundtrack.play('menu_game')), (5, mute(True)), (8, mute(False))], 0.0),
+        ("faixa única volta de onde estaria",
+         [(0, lambda: soundtrack.play('boss_arriving', loop=False)), (1, mute(True)), (3, mute(False))], 3.0),
+        ("faixa única pedida com o mudo ligado conta a partir do pedido",
+         [(0, lambda: soundtrack.play('menu_game')), (0, mute(True)),
+          (100, lambda: soundtrack.play('boss_arriving', loop=False)), (101, mute(False))], 1.0),
+    ]
+    failed = 0
+    for description, steps, expected in cases:
+        soundtrack.track = None
+        soundtrack.loop = True
+        soundtrack._muted = False
+        for seconds, action in steps:
+            at(seconds, action)
+        if soundtrack.position != expected:
+            print(f"ERRO: {description}: posição {soundtrack.position}, esperada {expected}", file=sys.stderr)
+            failed += 1
+    if failed:
+        sys.exit(1)
+    print(f"{len(cases)} casos conferem")
+
+if __name__ == '__main__':
+    main()
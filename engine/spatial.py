@@ -0,0 +1,76 @@
+"""Índices espaciais usados nas colisões com o cenário."""
+
+class UniformGrid:
+    """
+    Índice espacial estático: uma grade uniforme de células retangulares.
+
+    Cada item é registrado em todas as células que o seu retângulo toca. A
+    consulta devolve os itens das células tocadas pelo retângulo pedido, sem
+    repetição e na mesma ordem em que foram inseridos, para que quem percorre
+    o resultado com `break` continue vendo os itens na ordem original.
+    """
+    def __init__(self, cell_width=256, cell_height=256):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.items = []
+        self._cells = {}
+        self._cell_items = {}
+    def __len__(self):
+        return len(self.items)
+    def _span(self, rect):
+        return (int(rect.left // self.cell_width), int(rect.right // self.cell_width),
+                int(rect.top // self.cell_height), int(rect.bottom // self.cell_height))
+    def insert(self, item, rect=None):
+        """Registra um item; sem `rect`, usa o próprio item como retângulo."""
+        rect = item if rect is None else rect
+        index = len(self.items)
+        self.items.append(item)
+        x0, x1, y0, y1 = self._span(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._cells.setdefault((cx, cy), []).append(index)
+                self._cell_items.setdefault((cx, cy), []).append(item)
+    def clear(self):
+        self.items.clear()
+        self._cells.clear()
+        self._cell_items.clear()
+    def query(self, rect):
+        """Devolve os itens que podem colidir com `rect`, na ordem de inserção."""
+        x0, x1, y0, y1 = self._span(rect)
+        if x0 == x1 and y0 == y1:
+            return self._cell_items.get((x0, y0), ())
+        found = set()
+        cells = self._cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        items = self.items
+        return [items[i] for i in sorted(found)]
+
+def merge_spans(rects, make_rect):
+    """
+    Funde retângulos coplanares (mesmo topo e mesma altura) que se tocam ou se
+    sobrepõem em faixas contínuas de colisão, criadas com `make_rect(x, y, w, h)`.
+
+    As faixas saem na ordem do primeiro retângulo de cada uma, preservando a
+    prioridade que a lista original dava às plataformas.
+    """
+    rows = {}
+    for order, rect in enumerate(rects):
+        rows.setdefault((rect.top, rect.height), []).append((rect.left, rect.right, order))
+    spans = []
+    for (top, height), row in rows.items():
+        row.sort()
+        left, right, first = row[0]
+        for next_left, next_right, order in row[1:]:
+            if next_left <= right:
+                right = max(right, next_right)
+                first = min(first, order)
+            else:
+                spans.append((first, left, right, top, height))
+                left, right, first = next_left, next_right, order
+        spans.append((first, left, right, top, height))
+    spans.sort()
+    return [make_rect(left, top, right - left, height) for _, left, right, top, height in spans]
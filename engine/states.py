@@ -0,0 +1,106 @@
+"""Máquina de estados do jogo: handlers por estado despachados por tabela."""
+import time
+
+# Etapas medidas em cada estado
+STAGES = ('update', 'draw', 'on_key_down')
+
+class State:
+    """
+    Um estado do jogo e seus handlers, todos opcionais: `update(dt)`,
+    `draw(*args)` e `on_key_down(key)`, despachados pela máquina enquanto o
+    estado está ativo, e os ganchos `enter(anterior)` e `exit(próximo)`,
+    chamados na troca de estado com o nome do outro estado.
+    """
+    __slots__ = ('name', 'update', 'draw', 'on_key_down', 'enter', 'exit')
+    def __init__(self, name, update=None, draw=None, on_key_down=None, enter=None, exit=None):
+        self.name = name
+        self.update = update
+        self.draw = draw
+        self.on_key_down = on_key_down
+        self.enter = enter
+        self.exit = exit
+    def __repr__(self):
+        return f"State({self.name!r})"
+
+class StateMachine:
+    """
+    Guarda o estado atual e despacha para os handlers dele, sem comparar
+    nomes a cada quadro. `change()` roda o `exit` do estado atual e o
+    `enter` do novo, mesmo quando é o mesmo estado (reentrar reinicia).
+
+    O estado inicial, definido com `start()`, só tem o `enter` chamado no
+    primeiro despacho, quando o jogo já está rodando, e não enquanto o módulo
+    do jogo ainda está sendo carregado (ou importado sem rodar, como no modo
+    headless).
+
+    O tempo gasto por cada handler é somado por estado e etapa; `timings()`
+    devolve os totais para o profiler.
+    """
+    def __init__(self, states=(), clock=time.perf_counter):
+        self.states = {}
+        for state in states:
+            self.add(state)
+        self.current = None
+        self.transitions = 0
+        self.clock = clock
+        self._entered = True
+        self._timings = {}
+    def add(self, state):
+        self.states[state.name] = state
+    @property
+    def name(self):
+        return self.current.name if self.current is not None else None
+    def _get(self, name):
+        try:
+            return self.states[name]
+        except KeyError:
+            raise ValueError(f"estado desconhecido: {name!r}") from None
+    def start(self, name):
+        """Define o estado inicial sem chamar o `enter` ainda."""
+        self.current = self._get(name)
+        self._entered = False
+    def change(self, name):
+        """Troca para o estado `name`, chamando os ganchos de saída e de entrada."""
+        state = self._get(name)
+        previous = self.current
+        if previous is not None and self._entered and previous.exit is not None:
+            previous.exit(name)
+        self.current = state
+        self._entered = True
+        self.transitions += 1
+        if state.enter is not None:
+            state.enter(previous.name if previous is not None else None)
+    def _dispatch(self, stage, args):
+        if not self._entered:
+            self._entered = True
+            if self.current.enter is not None:
+                self.current.enter(None)
+        state = self.current
+        handler = getattr(state, stage)
+        if handler is None:
+            return
+        clock = self.clock
+        start = clock()
+        try:
+            handler(*args)
+        finally:
+            key = (state.name, stage)
+            totals = self._timings.get(key)
+            if totals is None:
+                totals = self._timings[key] = [0, 0.0]
+            totals[0] += 1
+            totals[1] += clock() - start
+    def update(self, dt):
+        self._dispatch('update', (dt,))
+    def draw(self, *args):
+        self._dispatch('draw', args)
+    def on_key_down(self, key):
+        self._dispatch('on_key_down', (key,))
+    def timings(self):
+        """`{estado: {etapa: {'calls': n, 'seconds': s}}}` dos handlers chamados até agora."""
+        result = {}
+        for (state, stage), (calls, seconds) in self._timings.items():
+            result.setdefault(state, {})[stage] = {'calls': calls, 'seconds': seconds}
+        return result
+    def reset_timings(self):
+        self._timings.clear()
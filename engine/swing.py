@@ -0,0 +1,50 @@
+"""Trajetória pré-calculada de um golpe em arco (a rede do coelho)."""
+import math
+
+class SwingArc:
+    """
+    Um golpe que percorre um arco de `start_angle` a `end_angle` em volta de
+    quem ataca, trocando os quadros de `frames` ao longo do caminho.
+
+    A tabela guarda, para `samples + 1` valores de progresso entre 0 e 1, o
+    quadro da animação e a direção unitária do ângulo, já com o eixo y da
+    tela invertido. A posição de verdade é o centro de quem ataca mais essa
+    direção vezes o raio, que pode mudar de um golpe para outro. Com
+    `samples` múltiplo de `len(frames) - 1`, o quadro consultado é sempre o
+    mesmo que o progresso exato daria.
+    """
+    def __init__(self, frames, start_angle, end_angle, samples=128):
+        self.frames = tuple(frames)
+        self.start_angle = start_angle
+        self.end_angle = end_angle
+        self.samples = samples
+        last = len(self.frames) - 1
+        table = []
+        for i in range(samples + 1):
+            progress = i / samples
+            angle = start_angle + (end_angle - start_angle) * progress
+            frame = int(progress * last)
+            table.append((frame, self.frames[frame], math.cos(angle), -math.sin(angle)))
+        self.table = tuple(table)
+    def sample(self, progress):
+        """Devolve `(índice do quadro, quadro, dx, dy)` da amostra da tabela logo abaixo de `progress`."""
+        if progress <= 0:
+            return self.table[0]
+        if progress >= 1:
+            return self.table[-1]
+        return self.table[int(progress * self.samples)]
+    def sweep(self, progress_from, progress_to, radius, spacing):
+        """
+        Direções `(dx, dy)` ao longo do arco percorrido entre dois progressos,
+        sem incluir o ponto de partida (que já foi testado no passo anterior)
+        e espaçadas no máximo `spacing` pixels num raio `radius`. A última é
+        sempre a de `progress_to`.
+        """
+        length = abs(progress_to - progress_from) * abs(self.end_angle - self.start_angle) * radius
+        steps = max(1, math.ceil(length / spacing))
+        sample = self.sample
+        points = []
+        for k in range(1, steps + 1):
+            _, _, dx, dy = sample(progress_from + (progress_to - progress_from) * k / steps)
+            points.append((dx, dy))
+        return points
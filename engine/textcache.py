@@ -0,0 +1,70 @@
+"""Cache de superfícies de texto já renderizadas."""
+import time
+from collections import OrderedDict
+
+class TextCache:
+    """
+    Cache LRU de textos renderizados, chaveado por (texto, tamanho, cor).
+
+    `render(text, fontsize, color)` só é chamado quando a combinação ainda não
+    está no cache; quando o cache passa de `maxsize`, sai a superfície usada há
+    mais tempo. Cada renderização de fonte é contada, e `renders_per_second()`
+    dá a taxa medida na última janela de um segundo (o valor muda no máximo uma
+    vez por segundo, para não ter que renderizar o próprio contador a cada quadro).
+    """
+    def __init__(self, render, maxsize=128, clock=time.perf_counter):
+        self._render = render
+        self.maxsize = maxsize
+        self._clock = clock
+        self._surfaces = OrderedDict()
+        self._window_start = clock()
+        self._window_renders = 0
+        self._rate = 0
+        self.hits = 0
+        self.renders = 0
+    def __len__(self):
+        return len(self._surfaces)
+    def get(self, text, fontsize, color):
+        key = (text, fontsize, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        surface = self._render(text, fontsize, color)
+        self.renders += 1
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+    def renders_per_second(self):
+        now = self._clock()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self._rate = round((self.renders - self._window_renders) / elapsed)
+            self._window_start = now
+            self._window_renders = self.renders
+        return self._rate
+    def clear(self):
+        self._surfaces.clear()
+    def stats(self):
+        return {'size': len(self._surfaces), 'hits': self.hits, 'renders': self.renders,
+                'renders_per_second': self.renders_per_second()}
+
+class TextField:
+    """
+    Um texto da HUD montado a partir de valores: o modelo só é formatado, e a
+    superfície só é buscada no cache, quando algum valor muda.
+    """
+    def __init__(self, cache, template, fontsize, color):
+        self.cache = cache
+        self.template = template
+        self.fontsize = fontsize
+        self.color = color
+        self._values = None
+        self._surface = None
+    def surface(self, *values):
+        if values != self._values:
+            self._values = values
+            self._surface = self.cache.get(self.template.format(*values), self.fontsize, self.color)
+        return self._surface
@@ -0,0 +1,107 @@
+"""
+Passo fixo da simulação, desacoplado da taxa de quadros.
+
+O movimento do jogo é somado a cada chamada (velocidades e gravidade em
+pixels por passo), enquanto os cronômetros usam o `dt`. Para que os dois
+andem juntos com qualquer taxa de quadros, o `dt` de cada quadro vai para
+um acumulador, gasto em passos de duração fixa: um quadro lento roda dois
+ou três passos e desenha uma vez só (os quadros do meio são pulados, mas a
+simulação não fica para trás), e um quadro rápido pode não rodar nenhum.
+
+Um quadro roda no máximo `max_steps` passos. Se ainda assim sobrar atraso,
+ele é descartado e o jogo fica mais lento naquele trecho: sem esse limite,
+cada quadro lento pediria mais passos, que deixariam o quadro seguinte
+ainda mais lento (a "espiral da morte").
+
+Como a simulação anda em degraus, o desenho interpola as posições entre o
+penúltimo e o último passo pela fração `alpha` do passo que sobrou no
+acumulador (`Interpolation`), sempre um passo atrás da simulação.
+"""
+
+class FixedTimestep:
+    """Acumula o `dt` dos quadros e o gasta em passos de `step` segundos, no máximo `max_steps` por quadro."""
+    def __init__(self, step, max_steps):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.frames = 0
+        self.steps = 0
+        self.skipped_frames = 0
+        self.dropped_time = 0.0
+    def reset(self):
+        """Esvazia o acumulador, para que uma partida comece (e o replay a refaça) do mesmo jeito."""
+        self.accumulator = 0.0
+    def advance(self, dt):
+        """Soma o `dt` de um quadro e devolve quantos passos fixos a simulação deve rodar agora."""
+        step = self.step
+        accumulator = self.accumulator + dt
+        steps = 0
+        while accumulator >= step and steps < self.max_steps:
+            accumulator -= step
+            steps += 1
+        if accumulator >= step:
+            # Atraso demais para um quadro: os passos inteiros que sobraram são descartados
+            remainder = accumulator % step
+            self.dropped_time += accumulator - remainder
+            accumulator = remainder
+        self.accumulator = accumulator
+        self.frames += 1
+        self.steps += steps
+        if steps > 1:
+            self.skipped_frames += steps - 1
+        return steps
+    @property
+    def alpha(self):
+        """Fração do próximo passo já acumulada, de 0 a 1."""
+        return self.accumulator / self.step
+    def stats(self):
+        return {'frames': self.frames, 'steps': self.steps, 'skipped_frames': self.skipped_frames,
+                'dropped_ms': self.dropped_time * 1e3}
+
+class Interpolation:
+    """
+    Guarda a posição dos atores antes do último passo de um quadro, para
+    desenhá-los entre ela e a posição atual. O desenho acontece com os
+    atores deslocados por `apply()`, e `restore()` devolve cada um à posição
+    exata da simulação, que nunca vê as posições interpoladas.
+
+    Quem andou mais de `max_distance` pixels num passo (o coelho que volta
+    do outro lado do mundo, uma entidade reaproveitada pela pool) é
+    desenhado direto na posição nova.
+    """
+    def __init__(self, max_distance):
+        self.max_distance = max_distance
+        self._previous = []
+        self._previous_view = None
+        self._moved = []
+    def clear(self):
+        """Esquece as posições guardadas (a partida recomeçou)."""
+        self._previous = []
+        self._previous_view = None
+    def capture(self, actors, view_left=0):
+        """Guarda a posição de `actors` e o x da câmera antes do último passo do quadro."""
+        self._previous = [(actor, actor.x, actor.y) for actor in actors]
+        self._previous_view = view_left
+    def apply(self, alpha, view_left=0):
+        """Leva os atores guardados às posições interpoladas e devolve o x interpolado da câmera."""
+        limit = self.max_distance
+        moved = self._moved
+        back = alpha - 1
+        for actor, x, y in self._previous:
+            dx = actor.x - x
+            dy = actor.y - y
+            if (dx or dy) and abs(dx) <= limit and abs(dy) <= limit:
+                left, top = actor.left, actor.top
+                moved.append((actor, left, top))
+                actor.left = left + dx * back
+                actor.top = top + dy * back
+        previous = self._previous_view
+        if previous is None or abs(view_left - previous) > limit:
+            return view_left
+        return int(round(previous + (view_left - previous) * alpha))
+    def restore(self):
+        """Devolve os atores deslocados por `apply()` às posições da simulação."""
+        for actor, left, top in self._moved:
+            actor.left = left
+            actor.top = top
+        self._moved.clear()
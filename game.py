@@ -1,7 +1,41 @@
 import pgzrun
+from pgzero import ptext
 from pgzero.rect import Rect
 import random
 import math
+import os
+import sys
+import time
+
+# Permite importar o pacote engine/ também ao rodar com 'pgzrun game.py'
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+if GAME_DIR not in sys.path:
+    sys.path.insert(0, GAME_DIR)
+
+from engine.animation import AnimationScheduler, Clip
+from engine.assets import AssetManifest
+from engine.audio import AudioQueue
+from engine.governor import SpawnGovernor
+from engine.atlas import install_atlas
+from engine.broadphase import BroadPhase, RemovalQueue
+from engine.level import Camera, ChunkStreamer, load_level
+from engine.pool import Pool
+from engine.profiler import FrameProfiler
+from engine.render import LayeredRenderer
+from engine.replay import ReplayRecorder, new_seed
+from engine.sky import Sky
+from engine.soundtrack import Soundtrack
+from engine.spatial import UniformGrid, merge_spans
+from engine.states import State, StateMachine
+from engine.swing import SwingArc
+from engine.textcache import TextCache, TextField
+from engine.timestep import FixedTimestep, Interpolation
+
+try:
+    from engine.batched import BatchedEnemies
+except ImportError:
+    # NumPy é opcional: sem ele o passo vetorizado dos inimigos fica indisponível
+    BatchedEnemies = None
 
 # ==============================================================================
 #                      CONFIGURAÇÕES E VARIÁVEIS GLOBAIS
@@ -23,26 +57,116 @@ FLEEING_SPEED = 8
 GRAVITY = 1
 JUMP_STRENGTH = -18
 ATTACK_ANIMATION_SPEED = 0.05
+# Raio do arco da rede, como fração da altura do coelho, e amostras da trajetória pré-calculada
+NET_SWING_RADIUS = 0.55
+NET_ARC_SAMPLES = 128
 COIN_ANIMATION_SPEED = 0.3
+BOSS_ANIMATION_SPEED = 0.3
 CARROT_ANIMATION_SPEED = 0.2
+# Tamanho das células do índice espacial das plataformas
+PLATFORM_GRID_CELL = 256
+# Largura das colunas da fase ampla das colisões do jogador
+BROADPHASE_COLUMN = 128
+# Nível carregado de levels/<nome>.json ('meadow' é a tela única original; 'valley' rola por dez telas)
+LEVEL_NAME = 'meadow'
+# Quantos pixels além de cada borda da câmera ficam carregados (e com as nuvens em atividade)
+STREAM_MARGIN = 635
+# Duração de um passo da simulação: as velocidades e a gravidade do jogo são por passo
+SIMULATION_STEP = 1 / 60
+# Passos que um quadro lento pode rodar para alcançar o tempo real; além disso o jogo fica mais lento
+MAX_CATCHUP_STEPS = 5
+# Acima desta distância, em pixels, num passo, um ator é desenhado sem interpolação (teleportes)
+INTERPOLATION_MAX_DISTANCE = 64
+# Máximo de entidades de cada tipo em jogo: acima disso as nuvens e o chefão não criam mais
+SPAWN_CAPS = {'enemy': 12, 'flyman': 12, 'flame': 12}
+# Tempo médio, em segundos, de um passo da simulação acima do qual os spawns ficam mais espaçados;
+# cada nível de desaceleração alonga o intervalo das nuvens em SPAWN_STRETCH_PER_LEVEL, até
+# SPAWN_MAX_THROTTLE níveis (o replay guarda no máximo 15, o governor.MAX_LEVEL)
+SPAWN_TICK_BUDGET = 0.008
+SPAWN_STRETCH_PER_LEVEL = 0.25
+SPAWN_MAX_THROTTLE = 8
+# Modo de estresse: move todos os inimigos num único passo vetorizado (requer NumPy)
+USE_BATCHED_ENEMIES = False
+# Céu de cada fase: (segundos desde o início da fase, cor). A partida vai do
+# verde-azulado ao verde-limão; o prelúdio parte da cor em que a partida está
+# quando ele começa (a cor None, preenchida em enter_boss_prelude, já que o
+# boss_fight_threshold pode mudar) e escurece até o entardecer da luta com o chefão.
+SKY_KEYFRAMES = {
+    'PLAYING': [(0, (0, 139, 139)), (120, (173, 255, 47))],
+    'BOSS_PRELUDE': [(0, None), (6, (255, 140, 0))],
+    'BOSS_FIGHT': [(0, (255, 140, 0)), (8, (120, 50, 90))],
+}
+# Cores pré-calculadas por segundo de cada linha do tempo do céu
+SKY_SAMPLES_PER_SECOND = 60
+# Usa as folhas do atlas de texturas (python -m engine.atlas build), quando existirem
+USE_ATLAS = True
+# Tempo máximo (em segundos) gasto por quadro pré-carregando recursos no menu
+ASSET_PRELOAD_BUDGET = 0.004
+# Imprime o tempo de carga de cada recurso quando o pré-carregamento termina
+PRINT_ASSET_REPORT = False
+# Quantas superfícies de texto renderizadas ficam guardadas no cache
+TEXT_CACHE_SIZE = 128
+# Mostra no canto da tela quantas renderizações de fonte acontecem por segundo
+SHOW_TEXT_STATS = False
+# Grava a entrada de cada partida em replays/, para refazê-la com 'python -m engine.replay'
+SAVE_REPLAYS = True
+REPLAY_DIR = os.path.join(GAME_DIR, 'replays')
+# Etapas do update() e do draw() medidas pelo profiler: (rótulo, função ou método do jogo).
+# F3 liga o profiler e mostra o painel; F4 exporta os passos medidos para profiles/
+PROFILED_STAGES = (
+    ('update', 'states.update'),
+    ('jogador', 'Player.move'),
+    ('câmera', 'update_camera'),
+    ('nuvens', 'update_spawners'),
+    ('inimigos', 'update_enemies'),
+    ('física', 'PhysicsEntity.apply_physics'),
+    ('animações', 'update_animations'),
+    ('interações', 'update_player_interactions'),
+    ('chefão', 'Boss.move'),
+    ('chamas', 'update_flames'),
+    ('golpes', 'update_boss_fight_collisions'),
+    ('áudio', 'audio.flush'),
+    ('draw', 'states.draw'),
+)
+# Passos usados nos percentis do painel e intervalo, em segundos, entre duas atualizações dele
+PROFILER_WINDOW = 600
+PROFILER_OVERLAY_REFRESH = 0.5
+PROFILE_DIR = os.path.join(GAME_DIR, 'profiles')
 
 # Variáveis de estado do jogo
 # Estados: 'MAIN_MENU', 'HOW_TO_PLAY', 'PLAYING', 'BOSS_PRELUDE', 'BOSS_FIGHT', 'GAMEOVER', 'WIN'
+# game_state só espelha o estado atual da máquina `states` (no fim do arquivo);
+# para trocar de estado, use change_state()
 game_state = 'MAIN_MENU'
 game_timer = 0.0
+# Semente do `random` na próxima partida; com None, cada partida sorteia a sua
+match_seed = None
 second_spawner_threshold = 30
 boss_fight_threshold = 120
 BOSS_PRELUDE_DURATION = 6.0
 prelude_timer = 0.0
+boss_fight_timer = 0.0
 powerup_duration = 4
 powerup_carrots_required = 8
 boss_invincibility_duration = 4.0
+# Segundos de partida até as nuvens chegarem ao menor intervalo entre dois inimigos
+difficulty_ramp_seconds = 90
+# Intervalo sorteado, em segundos, entre dois ataques do chefão
+boss_attack_cooldown_min = 0.5
+boss_attack_cooldown_max = 1.5
 
 # Variáveis de controle de áudio e menu
-menu_music_playing = False
 walk_sound_timer = 0.0
 WALK_SOUND_COOLDOWN = 0.3
-is_muted = False
+# Vozes simultâneas por som: os curtos e repetitivos tocam um de cada vez
+SOUND_VOICES = {'grass_walk': 1, 'coin_catch': 2, 'flame_sound': 2, 'boss_attack': 1, 'net_impact': 2}
+DEFAULT_SOUND_VOICES = 2
+# Intervalo mínimo, em segundos, entre duas mensagens de erro do mesmo som
+SOUND_ERROR_INTERVAL = 5.0
+audio = AudioQueue(sounds, SOUND_VOICES, DEFAULT_SOUND_VOICES, SOUND_ERROR_INTERVAL)
+# Duração, em segundos, da transição cruzada entre duas músicas
+MUSIC_CROSSFADE = 1.0
+soundtrack = Soundtrack(music, os.path.join(GAME_DIR, 'music'), MUSIC_CROSSFADE)
 
 mute_button = None
 menu_selection = 0
@@ -54,8 +178,30 @@ carrots = []
 enemies = []
 spawners = []
 flames = []
+collision_spans = []
+platform_index = None
+# Plataformas criadas de cada pedaço carregado do nível, por índice do pedaço
+chunk_platforms = {}
 player = None
 boss = None
+hud = None
+
+# Fase ampla das colisões do jogador e remoções adiadas, refeitas a cada quadro
+broadphase = BroadPhase(BROADPHASE_COLUMN)
+removals = RemovalQueue()
+renderer = LayeredRenderer()
+animations = AnimationScheduler()
+recorder = ReplayRecorder()
+timestep = FixedTimestep(SIMULATION_STEP, MAX_CATCHUP_STEPS)
+interpolation = Interpolation(INTERPOLATION_MAX_DISTANCE)
+governor = SpawnGovernor(SPAWN_CAPS, SPAWN_TICK_BUDGET, SPAWN_STRETCH_PER_LEVEL, SPAWN_MAX_THROTTLE)
+profiler = FrameProfiler(globals(), PROFILED_STAGES, PROFILER_WINDOW)
+profiler_overlay = None
+sky = Sky(SKY_KEYFRAMES, SKY_KEYFRAMES['PLAYING'][0][1], SKY_SAMPLES_PER_SECOND)
+batched_enemies = None
+level = load_level(LEVEL_NAME, os.path.join(GAME_DIR, 'levels'))
+camera = Camera(WIDTH, level.width)
+streamer = None
 
 # ==============================================================================
 #                              CLASSES DO JOGO
@@ -63,17 +209,22 @@ boss = None
 
 class Platform:
     """Uma classe para representar as plataformas no jogo."""
+    __slots__ = ('actor',)
     def __init__(self, image, x, y):
         self.actor = Actor(image)
         self.actor.midtop = (x, y)
     def draw(self):
-        self.actor.draw()
+        renderer.draw(self.actor)
 
 class PhysicsEntity:
     """
     Classe base para entidades que interagem com a física, como gravidade e
     colisão com plataformas.
+
+    As entidades usam __slots__ e guardam as listas de quadros de animação na
+    classe, compartilhadas por todas as instâncias.
     """
+    __slots__ = ('actor', 'vy', 'on_ground')
     def __init__(self, actor):
         self.actor = actor
         self.vy = 0
@@ -83,32 +234,44 @@ class PhysicsEntity:
         if not self.on_ground:
             self.vy += GRAVITY
         self.on_ground = False
-        for platform in platforms:
-            if self.actor.colliderect(platform.actor):
-                if self.vy > 0 and old_y + self.actor.height / 2 <= platform.actor.y + platform.actor.height / 2:
-                    self.actor.bottom = platform.actor.top
+        for span in platform_index.query(self.actor):
+            if self.actor.colliderect(span):
+                if self.vy > 0 and old_y + self.actor.height / 2 <= span.bottom:
+                    self.actor.bottom = span.top
                     self.vy = 0
                     self.on_ground = True
                     break
 
 class Player(PhysicsEntity):
     """Uma classe para representar o jogador (o coelho)."""
+    __slots__ = ('original_image', 'frame_index', 'facing_left', 'jumping', 'frame_timer',
+                 'lives', 'score', 'is_attacking', 'attack_timer', 'attack_frame_index', 'net',
+                 'attack_cooldown', 'cooldown_timer', 'collected_carrots', 'is_invincible',
+                 'powerup_timer', 'attack_progress', 'net_hitboxes', 'is_walking')
+    walk_right_frames = ('bunny1_walk_right1', 'bunny1_walk_right2')
+    walk_left_frames = ('bunny1_walk_left1', 'bunny1_walk_left2')
+    stand_frames = ('bunny1_ready', 'bunny1_stand')
+    jump_frames = ('bunny1_ready', 'bunny1_jump')
+    attack_right_frames = tuple(f'net_right{i}' for i in range(1, 10))
+    attack_left_frames = tuple(f'net_left{i}' for i in range(1, 10))
+    walk_right_clip = Clip(walk_right_frames, WALK_ANIMATION_SPEED)
+    walk_left_clip = Clip(walk_left_frames, WALK_ANIMATION_SPEED)
+    stand_clip = Clip(stand_frames, STAND_ANIMATION_SPEED)
+    attack_image_right = 'bunny1_walk_right1'
+    attack_image_left = 'bunny1_walk_left1'
+    attack_duration = ATTACK_ANIMATION_SPEED * len(attack_right_frames)
+    # A rede vai de trás para a frente por cima da cabeça: da esquerda para a direita olhando para a direita
+    net_arc_right = SwingArc(attack_right_frames, math.pi, 0, NET_ARC_SAMPLES)
+    net_arc_left = SwingArc(attack_left_frames, 0, math.pi, NET_ARC_SAMPLES)
     def __init__(self, x, y):
         super().__init__(Actor('bunny1_ready'))
         self.actor.midbottom = (x, y)
-        self.walk_right_frames = ['bunny1_walk_right1', 'bunny1_walk_right2']
-        self.walk_left_frames = ['bunny1_walk_left1', 'bunny1_walk_left2']
-        self.stand_frames = ['bunny1_ready', 'bunny1_stand']
-        self.jump_frames = ['bunny1_ready', 'bunny1_jump']
-        self.attack_right_frames = [f'net_right{i}' for i in range(1, 10)]
-        self.attack_left_frames = [f'net_left{i}' for i in range(1, 10)]
-        self.attack_image_right = 'bunny1_walk_right1'
-        self.attack_image_left = 'bunny1_walk_left1'
         self.original_image = self.actor.image
         self.frame_index = 0
         self.facing_left = False
         self.jumping = False
         self.frame_timer = 0.0
+        self.is_walking = False
         self.lives = 3
         self.score = 0
         self.is_attacking = False
@@ -116,6 +279,8 @@ class Player(PhysicsEntity):
         self.attack_frame_index = 0
         self.net = Actor(self.attack_right_frames[0])
         self.net.visible = False
+        self.attack_progress = 0.0
+        self.net_hitboxes = []
         self.attack_cooldown = 1.5
         self.cooldown_timer = 0.0
         self.collected_carrots = 0
@@ -139,29 +304,25 @@ class Player(PhysicsEntity):
         if is_moving_horizontally and self.on_ground:
             walk_sound_timer += dt
             if walk_sound_timer >= WALK_SOUND_COOLDOWN:
-                try:
-                    if not is_muted:
-                        sounds.grass_walk.play()
-                except Exception:
-                    print("Erro ao tentar tocar 'grass_walk.wav'")
+                audio.play('grass_walk')
                 walk_sound_timer = 0.3
         else:
             walk_sound_timer = 0.0
-        self.animate(dt, is_moving_horizontally)
-        if self.actor.x > WIDTH:
-            self.actor.x = 0
-        if self.actor.x < 0:
-            self.actor.x = WIDTH
+        self.is_walking = is_moving_horizontally
+        left, right = world_bounds()
+        if level.wrap:
+            if self.actor.x > right:
+                self.actor.x = left
+            if self.actor.x < left:
+                self.actor.x = right
+        else:
+            self.actor.x = min(max(self.actor.x, left), right)
         if keyboard.up and self.on_ground and not self.is_attacking:
             self.vy = JUMP_STRENGTH
             self.jumping = True
             self.on_ground = False
             self.actor.image = self.jump_frames[1]
-            try:
-                if not is_muted:
-                    sounds.jump.play()
-            except Exception:
-                print("Erro ao tentar tocar 'jump.wav'")
+            audio.play('jump')
         if keyboard.space and not self.is_attacking and self.cooldown_timer <= 0:
             self.attack()
         if self.is_attacking:
@@ -174,33 +335,25 @@ class Player(PhysicsEntity):
             self.jumping = False
             self.on_ground = False
     def take_damage(self):
-        global game_state, enemies, flames
+        global enemies, flames
         if self.is_invincible:
             return
-        try:
-            if not is_muted:
-                sounds.bunny_hurt.play()
-        except Exception:
-            print("Erro ao tentar tocar 'bunny_hurt.wav'")
+        audio.play('bunny_hurt')
         self.lives -= 1
         if self.lives <= 0:
-            game_state = 'GAMEOVER'
+            change_state('GAMEOVER')
         else:
-            self.actor.midbottom = (150, 0)
+            self.actor.midbottom = respawn_point()
             self.vy = 0
             self.jumping = False
             self.on_ground = False
-            enemies.clear()
-            flames.clear()
+            discard_entities(enemies)
+            discard_entities(flames)
     def activate_powerup(self):
         self.is_invincible = True
         self.powerup_timer = 0
         self.collected_carrots = 0
-        try:
-            if not is_muted:
-                sounds.powerup_sound.play()
-        except Exception:
-            print("Erro ao tentar tocar 'powerup_sound.wav'")
+        audio.play('powerup_sound')
     def update_powerup(self, dt):
         if self.is_invincible:
             self.powerup_timer += dt
@@ -211,71 +364,64 @@ class Player(PhysicsEntity):
         self.is_attacking = True
         self.attack_timer = 0.0
         self.attack_frame_index = 0
+        self.attack_progress = 0.0
         self.net.visible = True
         self.cooldown_timer = self.attack_cooldown
         if self.facing_left:
             self.actor.image = self.attack_image_left
         else:
             self.actor.image = self.attack_image_right
-        try:
-            if not is_muted:
-                sounds.net_attack.play()
-        except Exception:
-            print("Erro ao tentar tocar 'net_attack.wav'")
+        audio.play('net_attack')
     def update_attack(self, dt):
+        """
+        Avança o golpe pela trajetória pré-calculada da rede. Em `net_hitboxes`
+        ficam os retângulos da rede ao longo do arco percorrido neste passo,
+        para que um golpe rápido (ou um quadro longo) não atravesse um inimigo.
+        """
         self.attack_timer += dt
-        total_frames = len(self.attack_right_frames)
-        attack_total_duration = ATTACK_ANIMATION_SPEED * total_frames
-        progress = min(1.0, self.attack_timer / attack_total_duration)
-        frame = int(progress * (total_frames - 1))
-        self.attack_frame_index = frame
-        start_angle = 0 if self.facing_left else math.pi
-        end_angle = math.pi if self.facing_left else 0
-        current_angle = start_angle + (end_angle - start_angle) * progress
+        arc = self.net_arc_left if self.facing_left else self.net_arc_right
+        previous_progress = self.attack_progress
+        self.attack_progress = progress = min(1.0, self.attack_timer / self.attack_duration)
+        self.attack_frame_index, frame, dx, dy = arc.sample(progress)
         center_x = self.actor.x
         center_y = self.actor.y
-        radius = self.actor.height * 0.55
-        net_x = center_x + radius * math.cos(current_angle)
-        net_y = center_y - radius * math.sin(current_angle)
-        if self.facing_left:
-            self.net.image = self.attack_left_frames[self.attack_frame_index]
-        else:
-            self.net.image = self.attack_right_frames[self.attack_frame_index]
-        self.net.center = (net_x, net_y)
-        if self.attack_timer >= attack_total_duration:
+        radius = self.actor.height * NET_SWING_RADIUS
+        if self.net.image != frame:
+            self.net.image = frame
+        self.net.center = (center_x + radius * dx, center_y + radius * dy)
+        w, h = self.net.width, self.net.height
+        left, top = center_x - w / 2, center_y - h / 2
+        self.net_hitboxes = [(left + radius * dx, top + radius * dy, w, h)
+                             for dx, dy in arc.sweep(previous_progress, progress, radius, min(w, h) / 2)]
+        if self.attack_timer >= self.attack_duration:
             self.is_attacking = False
             self.net.visible = False
             self.actor.image = 'bunny1_ready'
-    def animate(self, dt, is_moving_horizontally):
-        if self.is_attacking:
-            return
-        self.frame_timer += dt
-        if self.jumping and not self.on_ground:
-            return
-        if is_moving_horizontally and self.on_ground:
-            if self.frame_timer >= WALK_ANIMATION_SPEED:
-                self.frame_timer = 0
-                self.frame_index = (self.frame_index + 1) % len(self.walk_right_frames)
-                self.actor.image = (self.walk_left_frames if self.facing_left else self.walk_right_frames)[self.frame_index]
-        elif self.on_ground:
-            if self.frame_timer >= STAND_ANIMATION_SPEED:
-                self.frame_timer = 0
-                self.frame_index = (self.frame_index + 1) % len(self.stand_frames)
-                self.actor.image = self.stand_frames[self.frame_index]
+    def animation_clip(self):
+        """Andando ou parado no chão; no ar e durante o golpe a imagem fica a do pulo ou do ataque."""
+        if self.is_attacking or not self.on_ground:
+            return None
+        if self.is_walking:
+            return self.walk_left_clip if self.facing_left else self.walk_right_clip
+        return self.stand_clip
     def draw(self):
         if self.net.visible:
-            self.net.draw()
+            renderer.draw(self.net)
         if self.is_invincible:
             if int(self.powerup_timer * 5) % 2 == 0:
-                self.actor.draw()
+                renderer.draw(self.actor)
         else:
-            self.actor.draw()
+            renderer.draw(self.actor)
 
 class CloudSpawner:
-    """Uma classe para representar a nuvem que gera outros inimigos."""
-    def __init__(self, x, y):
+    """Uma classe para representar a nuvem que gera outros inimigos, patrulhando de `patrol_left` a `patrol_right`."""
+    __slots__ = ('actor', 'vx', 'spawn_timer', 'spawn_cooldown', 'base_cooldown', 'min_cooldown',
+                 'is_fleeing', 'patrol_left', 'patrol_right')
+    def __init__(self, x, y, patrol_left=0, patrol_right=WIDTH):
         self.actor = Actor('cloud')
         self.actor.midtop = (x, y)
+        self.patrol_left = patrol_left
+        self.patrol_right = patrol_right
         self.vx = CLOUD_SPEED if random.choice([True, False]) else -CLOUD_SPEED
         self.spawn_timer = 0.0
         self.spawn_cooldown = random.uniform(3, 8)
@@ -285,33 +431,42 @@ class CloudSpawner:
     def move(self, dt):
         if not self.is_fleeing:
             self.actor.x += self.vx
-            if self.actor.x > WIDTH or self.actor.x < 0:
+            x = self.actor.x
+            if (x > self.patrol_right and self.vx > 0) or (x < self.patrol_left and self.vx < 0):
                 self.vx *= -1
             if game_timer > 0:
-                difficulty_factor = min(1.0, game_timer / 90)
+                difficulty_factor = min(1.0, game_timer / difficulty_ramp_seconds)
                 self.spawn_cooldown = self.base_cooldown - (self.base_cooldown - self.min_cooldown) * difficulty_factor
             self.spawn_timer -= dt
             if self.spawn_timer <= 0:
-                new_enemy_x = self.actor.x
-                new_enemy_y = self.actor.bottom
-                if random.random() < 0.5:
-                    enemies.append(Enemy(new_enemy_x, new_enemy_y))
-                else:
-                    enemies.append(Flyman(new_enemy_x, new_enemy_y))
-                self.spawn_timer = self.spawn_cooldown
+                kind = 'enemy' if random.random() < 0.5 else 'flyman'
+                spawn(kind, enemies, self.actor.x, self.actor.bottom)
+                self.spawn_timer = governor.interval(self.spawn_cooldown)
         else:
             self.actor.x += self.vx
     def draw(self):
-        self.actor.draw()
+        renderer.draw(self.actor)
 
 class Enemy(PhysicsEntity):
     """Uma classe para os inimigos terrestres (espetos)."""
+    __slots__ = ('vx', 'frame_timer', 'frame_index', 'is_fleeing')
+    flies = False
+    walk_right_frames = ('spikeman_walk_right1', 'spikeman_walk_right2')
+    walk_left_frames = ('spikeman_walk_left1', 'spikeman_walk_left2')
+    walk_right_clip = Clip(walk_right_frames, ENEMY_WALK_ANIMATION_SPEED)
+    walk_left_clip = Clip(walk_left_frames, ENEMY_WALK_ANIMATION_SPEED)
+    idle_clip = Clip(walk_right_frames[:1], ENEMY_WALK_ANIMATION_SPEED)
     def __init__(self, x, y):
         super().__init__(Actor('spikeman_walk_right1'))
-        self.walk_right_frames = ['spikeman_walk_right1', 'spikeman_walk_right2']
-        self.walk_left_frames = ['spikeman_walk_left1', 'spikeman_walk_left2']
+        self.reset(x, y)
+    def reset(self, x, y):
+        """Reinicia o inimigo em (x, y) para ser reaproveitado pela pool."""
+        if self.actor.image != self.walk_right_frames[0]:
+            self.actor.image = self.walk_right_frames[0]
         self.actor.midtop = (x, y)
         self.vx = 0
+        self.vy = 0
+        self.on_ground = False
         self.frame_timer = 0.0
         self.frame_index = 0
         self.is_fleeing = False
@@ -327,34 +482,38 @@ class Enemy(PhysicsEntity):
                     self.vx = 0
             else:
                 if self.vx == 0:
-                    self.vx = FLEEING_SPEED if self.actor.x < WIDTH / 2 else -FLEEING_SPEED
+                    self.vx = FLEEING_SPEED if self.actor.x < camera.center_x else -FLEEING_SPEED
                 self.vx = self.vx
             self.actor.x += self.vx
         self.apply_physics(old_y)
-        self.animate(dt)
-    def animate(self, dt):
-        self.frame_timer += dt
-        if self.frame_timer >= ENEMY_WALK_ANIMATION_SPEED:
-            self.frame_timer = 0
-            if self.vx > 0:
-                self.frame_index = (self.frame_index + 1) % len(self.walk_right_frames)
-                self.actor.image = self.walk_right_frames[self.frame_index]
-            elif self.vx < 0:
-                self.frame_index = (self.frame_index + 1) % len(self.walk_left_frames)
-                self.actor.image = self.walk_left_frames[self.frame_index]
-            else:
-                self.actor.image = self.walk_right_frames[0]
+    def animation_clip(self):
+        if self.vx > 0:
+            return self.walk_right_clip
+        if self.vx < 0:
+            return self.walk_left_clip
+        return self.idle_clip
     def draw(self):
-        self.actor.draw()
+        renderer.draw(self.actor)
 
 class Flyman(PhysicsEntity):
     """Uma classe para um novo tipo de inimigo que voa."""
+    __slots__ = ('vx', 'frame_timer', 'frame_index', 'ground_timer', 'is_flying', 'is_fleeing')
+    flies = True
+    stand_frames = ('flyman_still_stand', 'flyman_stand')
+    fly_frames = ('flyman_fly',)
+    stand_clip = Clip(stand_frames, STAND_ANIMATION_SPEED)
+    fly_clip = Clip(fly_frames, FLYMAN_FLY_SPEED)
     def __init__(self, x, y):
         super().__init__(Actor('flyman_stand'))
-        self.stand_frames = ['flyman_still_stand', 'flyman_stand']
-        self.fly_frames = ['flyman_fly']
+        self.reset(x, y)
+    def reset(self, x, y):
+        """Reinicia o inimigo voador em (x, y) para ser reaproveitado pela pool."""
+        if self.actor.image != 'flyman_stand':
+            self.actor.image = 'flyman_stand'
         self.actor.midtop = (x, y)
         self.vx = 0
+        self.vy = 0
+        self.on_ground = False
         self.frame_timer = 0.0
         self.frame_index = 0
         self.ground_timer = 4.0
@@ -386,69 +545,62 @@ class Flyman(PhysicsEntity):
                 self.actor.y += self.vy
         else:
             if self.vx == 0:
-                self.vx = FLEEING_SPEED if self.actor.x < WIDTH / 2 else -FLEEING_SPEED
+                self.vx = FLEEING_SPEED if self.actor.x < camera.center_x else -FLEEING_SPEED
             self.actor.x += self.vx
             self.actor.y += self.vy
             self.vy += GRAVITY
-        self.animate(dt)
-    def animate(self, dt):
-        self.frame_timer += dt
+    def animation_clip(self):
         if self.is_flying and not self.is_fleeing:
-            if self.frame_timer >= FLYMAN_FLY_SPEED:
-                self.frame_timer = 0
-                self.frame_index = (self.frame_index + 1) % len(self.fly_frames)
-                self.actor.image = self.fly_frames[self.frame_index]
-        else:
-            if self.frame_timer >= STAND_ANIMATION_SPEED:
-                self.frame_timer = 0
-                self.frame_index = (self.frame_index + 1) % len(self.stand_frames)
-                self.actor.image = self.stand_frames[self.frame_index]
+            return self.fly_clip
+        return self.stand_clip
     def draw(self):
-        self.actor.draw()
+        renderer.draw(self.actor)
 
 class Coin:
     """Uma classe para as moedas coletáveis."""
+    __slots__ = ('actor', 'points', 'clip', 'frame_index', 'frame_timer')
+    frames_by_type = {
+        coin_type: tuple(f'{coin_type}_{i}' for i in range(1, 5))
+        for coin_type in ('bronze', 'silver', 'gold')
+    }
+    clips_by_type = {coin_type: Clip(frames, COIN_ANIMATION_SPEED)
+                     for coin_type, frames in frames_by_type.items()}
+    points_by_type = {'bronze': 5, 'silver': 10, 'gold': 20}
     def __init__(self, x, y, coin_type):
         self.actor = Actor(f'{coin_type}_1')
         self.actor.midbottom = (x, y)
-        self.points = 0
-        self.animation_frames = [f'{coin_type}_{i}' for i in range(1, 5)]
+        self.points = self.points_by_type.get(coin_type, 0)
+        self.clip = self.clips_by_type[coin_type]
         self.frame_index = 0
         self.frame_timer = 0.0
-        if coin_type == 'bronze':
-            self.points = 5
-        elif coin_type == 'silver':
-            self.points = 10
-        elif coin_type == 'gold':
-            self.points = 20
-    def animate(self, dt):
-        self.frame_timer += dt
-        if self.frame_timer >= COIN_ANIMATION_SPEED:
-            self.frame_timer = 0
-            self.frame_index = (self.frame_index + 1) % len(self.animation_frames)
-            self.actor.image = self.animation_frames[self.frame_index]
+    def animation_clip(self):
+        return self.clip
     def draw(self):
-        self.actor.draw()
+        renderer.draw(self.actor)
 
 class Carrot:
-    """Uma classe para as cenouras que ativam o power-up."""
+    """Uma classe para as cenouras que ativam o power-up (uma imagem parada, sem animação)."""
+    __slots__ = ('actor',)
+    animation_frames = ('carrot',)
     def __init__(self, x, y):
         self.actor = Actor('carrot')
         self.actor.midbottom = (x, y)
-        self.animation_frames = ['carrot']
-        self.frame_index = 0
-        self.frame_timer = 0.0
-    def animate(self, dt):
-        pass
     def draw(self):
-        self.actor.draw()
+        renderer.draw(self.actor)
 
 class Boss:
     """Uma classe para o chefão do jogo."""
-    def __init__(self):
+    __slots__ = ('actor', 'target_y', 'vx', 'vy', 'frame_timer', 'frame_index', 'max_hp',
+                 'hits_taken', 'attack_cooldown_min', 'attack_cooldown_max', 'attack_timer',
+                 'max_flames', 'is_descending', 'is_invincible', 'invincibility_timer',
+                 'is_moving_after_hit', 'target_x', 'arena_left')
+    animation_frames = ('sun1', 'sun2')
+    clip = Clip(animation_frames, BOSS_ANIMATION_SPEED)
+    def __init__(self, arena_left=0):
+        # A luta acontece na tela em que a câmera parou, a partir de `arena_left`
+        self.arena_left = arena_left
         self.actor = Actor('sun1')
-        self.animation_frames = ['sun1', 'sun2']
-        self.actor.midtop = (WIDTH // 2, -100)
+        self.actor.midtop = (arena_left + WIDTH // 2, -100)
         self.target_y = 50
         self.vx = 0
         self.vy = 2
@@ -456,8 +608,8 @@ class Boss:
         self.frame_index = 0
         self.max_hp = 5
         self.hits_taken = 0
-        self.attack_cooldown_min = 0.5
-        self.attack_cooldown_max = 1.5
+        self.attack_cooldown_min = boss_attack_cooldown_min
+        self.attack_cooldown_max = boss_attack_cooldown_max
         self.attack_timer = random.uniform(self.attack_cooldown_min, self.attack_cooldown_max)
         self.max_flames = 3
         self.is_descending = True
@@ -466,18 +618,13 @@ class Boss:
         self.is_moving_after_hit = False
         self.target_x = self.actor.x
     def move(self, dt):
-        self.animate(dt)
         if self.is_descending:
             self.actor.y += self.vy
             if self.actor.y >= self.target_y:
                 self.actor.y = self.target_y
                 self.is_descending = False
                 self.vy = 0
-                try:
-                    if not is_muted:
-                        sounds.boss_arriving.play()
-                except Exception:
-                    print("Erro ao tentar tocar 'boss_arriving.wav'")
+                audio.play('boss_arriving')
                 return
         if self.is_moving_after_hit:
             if abs(self.actor.x - self.target_x) < 5:
@@ -499,13 +646,9 @@ class Boss:
     def attack(self):
         num_flames_to_shoot = random.choice([2, 3])
         for _ in range(num_flames_to_shoot):
-            if len(flames) < self.max_flames:
-                flames.append(Flame(self.actor.midbottom[0], self.actor.midbottom[1]))
-                try:
-                    if not is_muted:
-                        sounds.boss_attack.play()
-                except Exception:
-                    print("Erro ao tentar tocar 'boss_attack.wav'")
+            if len(flames) < self.max_flames and spawn('flame', flames, *self.actor.midbottom) is not None:
+                audio.play('flame_sound')
+                audio.play('boss_attack')
     def take_damage(self):
         if self.is_invincible:
             return False
@@ -515,36 +658,32 @@ class Boss:
         if self.hits_taken >= self.max_hp:
             return True
         else:
-            self.target_x = random.randint(self.actor.width // 2, WIDTH - self.actor.width // 2)
+            self.target_x = random.randint(self.arena_left + self.actor.width // 2,
+                                           self.arena_left + WIDTH - self.actor.width // 2)
             if self.target_x > self.actor.x:
                 self.vx = 2
             else:
                 self.vx = -2
             self.is_moving_after_hit = True
             return False
-    def animate(self, dt):
-        self.frame_timer += dt
-        if self.frame_timer >= 0.3:
-            self.frame_timer = 0
-            self.frame_index = (self.frame_index + 1) % len(self.animation_frames)
-            self.actor.image = self.animation_frames[self.frame_index]
+    def animation_clip(self):
+        return self.clip
     def draw(self):
         if self.is_invincible:
             if int(self.invincibility_timer * 2.5) % 2 == 0:
-                self.actor.draw()
+                renderer.draw(self.actor)
         else:
-            self.actor.draw()
+            renderer.draw(self.actor)
 
 class Flame:
     """Uma classe para a bolinha de fogo do boss."""
+    __slots__ = ('actor', 'vx', 'vy', 'bounce_count', 'max_bounces')
     def __init__(self, x, y):
         self.actor = Actor('flame_1')
+        self.reset(x, y)
+    def reset(self, x, y):
+        """Reinicia a chama em (x, y) para ser reaproveitada pela pool."""
         self.actor.midtop = (x, y)
-        try:
-            if not is_muted:
-                sounds.flame_sound.play()
-        except Exception:
-            print("Erro ao tentar tocar 'flame_sound.wav'")
         self.vx = random.choice([-3, 3])
         self.vy = random.uniform(-9, -6)
         self.bounce_count = 0
@@ -554,48 +693,292 @@ class Flame:
         self.actor.x += self.vx
         self.actor.y += self.vy
         self.vy += GRAVITY
-        if self.actor.x > WIDTH:
-            self.actor.x = 0
-        if self.actor.x < 0:
-            self.actor.x = WIDTH
-        for platform in platforms:
-            if self.actor.colliderect(platform.actor):
-                if self.vy > 0 and old_y + self.actor.height / 2 <= platform.actor.y + platform.actor.height / 2:
-                    self.actor.bottom = platform.actor.top
+        left, right = world_bounds()
+        if self.actor.x > right:
+            self.actor.x = left
+        if self.actor.x < left:
+            self.actor.x = right
+        for span in platform_index.query(self.actor):
+            if self.actor.colliderect(span):
+                if self.vy > 0 and old_y + self.actor.height / 2 <= span.bottom:
+                    self.actor.bottom = span.top
                     self.vy *= -0.7
                     self.vx *= 0.9
                     self.bounce_count += 1
                     break
         if not player.is_invincible and self.actor.colliderect(player.actor):
             player.take_damage()
-            if self in flames:
-                flames.remove(self)
+            removals.remove(flames, self)
         if self.actor.y > HEIGHT or self.bounce_count >= self.max_bounces:
-            if self in flames:
-                flames.remove(self)
+            removals.remove(flames, self)
+    def draw(self):
+        renderer.draw(self.actor)
+
+# Pools das entidades criadas e descartadas o tempo todo durante a partida
+enemy_pool = Pool(Enemy)
+flyman_pool = Pool(Flyman)
+flame_pool = Pool(Flame)
+ENTITY_POOLS = {Enemy: enemy_pool, Flyman: flyman_pool, Flame: flame_pool}
+# As mesmas pools pelo nome do tipo usado em SPAWN_CAPS
+SPAWN_POOLS = {'enemy': enemy_pool, 'flyman': flyman_pool, 'flame': flame_pool}
+# Entidades criadas por spawn() ainda em jogo, por classe, para o governador não varrer as listas
+spawned_alive = {Enemy: 0, Flyman: 0, Flame: 0}
+
+# Manifesto de todos os recursos do jogo; um arquivo faltando interrompe o jogo já aqui
+assets = AssetManifest(
+    GAME_DIR,
+    images=(
+        *Player.stand_frames, *Player.walk_right_frames, *Player.walk_left_frames, *Player.jump_frames,
+        *Player.attack_right_frames, *Player.attack_left_frames,
+        *Enemy.walk_right_frames, *Enemy.walk_left_frames, *Flyman.stand_frames, *Flyman.fly_frames,
+        *(frame for frames in Coin.frames_by_type.values() for frame in frames),
+        *Carrot.animation_frames, *Boss.animation_frames,
+        'cloud', 'flame_1', 'ground_grass', 'ground_grass copia', 'lifes', 'mute_icon', 'unmute_icon',
+    ),
+    sounds=(
+        'grass_walk', 'jump', 'bunny_hurt', 'powerup_sound', 'net_attack', 'net_impact', 'coin_catch',
+        'bunny_eat', 'enemy_defeat', 'boss_arriving', 'boss_attack', 'flame_sound', 'boss_defeat',
+    ),
+    music=('menu_game', 'boss_arriving', 'boss_appair'),
+)
+assets.validate()
+if USE_ATLAS:
+    # As imagens do atlas entram direto no cache do carregador; sem atlas, cada uma vem do seu arquivo
+    install_atlas(images, os.path.join(GAME_DIR, 'atlas'), os.path.join(GAME_DIR, 'images'))
+
+def render_text(text, fontsize, color):
+    """Renderiza um texto com a fonte padrão do PgZero (o cache fica por conta de text_cache)."""
+    return ptext.getsurf(text, fontsize=fontsize, color=color, cache=False)
+
+# Textos já renderizados, que só são renderizados de novo quando mudam
+text_cache = TextCache(render_text, TEXT_CACHE_SIZE)
+text_stats_text = TextField(text_cache, "Textos renderizados/s: {}", 24, "white")
+
+class Hud:
+    """
+    Camada persistente da interface, criada uma vez por partida: o ícone de
+    vida, as posições, a geometria da barra de cenouras e os campos de texto
+    ficam prontos, e cada quadro só faz os blits.
+    """
+    __slots__ = ('life_icon', 'life_positions', 'bar_back', 'bar_fill', 'bar_carrots',
+                 'score_text', 'timer_text', 'invincible_text', 'boss_hp_text', 'invincible_center')
+    BAR_WIDTH = 200
+    BAR_HEIGHT = 20
+    BAR_BACK_COLOR = (100, 100, 100)
+    BAR_FILL_COLOR = (255, 165, 0)
+    def __init__(self):
+        self.life_icon = images.lifes
+        step = self.life_icon.get_width() + 5
+        # Ícones além da borda da tela não aparecem, então nem são desenhados
+        self.life_positions = tuple((10 + i * step, 10) for i in range((WIDTH - 10) // step + 1))
+        bar_x = WIDTH // 2 - self.BAR_WIDTH // 2
+        bar_y = HEIGHT - self.BAR_HEIGHT - 10
+        self.bar_back = Rect(bar_x, bar_y, self.BAR_WIDTH, self.BAR_HEIGHT)
+        self.bar_fill = Rect(bar_x, bar_y, 0, self.BAR_HEIGHT)
+        self.bar_carrots = 0
+        self.score_text = TextField(text_cache, "Pontuação: {}", 40, "white")
+        self.timer_text = TextField(text_cache, "Tempo: {:02}:{:02}", 40, "white")
+        self.invincible_text = TextField(text_cache, "INVENCÍVEL! {}s", 30, "yellow")
+        self.boss_hp_text = TextField(text_cache, "Boss HP: {} / {}", 30, "red")
+        self.invincible_center = (WIDTH // 2, HEIGHT - self.BAR_HEIGHT - 35)
+    def draw(self, boss=None):
+        """Desenha a interface da partida; com `boss`, mostra também a vida do chefão."""
+        icon = self.life_icon
+        positions = self.life_positions
+        for i in range(min(player.lives, len(positions))):
+            renderer.blit(icon, positions[i])
+        blit_text(self.score_text.surface(player.score), (WIDTH - 250, 10))
+        blit_text(self.timer_text.surface(int(game_timer / 60), int(game_timer % 60)), (WIDTH - 250, 50))
+        if player.collected_carrots != self.bar_carrots:
+            self.bar_carrots = player.collected_carrots
+            self.bar_fill.width = (self.bar_carrots / powerup_carrots_required) * self.BAR_WIDTH
+        renderer.fill(self.bar_back, self.BAR_BACK_COLOR)
+        renderer.fill(self.bar_fill, self.BAR_FILL_COLOR)
+        if player.is_invincible:
+            time_left = round(powerup_duration - player.powerup_timer, 1)
+            blit_text(self.invincible_text.surface(time_left), center=self.invincible_center)
+        if boss is not None:
+            blit_text(self.boss_hp_text.surface(boss.max_hp - boss.hits_taken, boss.max_hp), center=(WIDTH // 2, 20))
+
+class ProfilerOverlay:
+    """
+    Painel do profiler, logo abaixo do botão de mudo: p50, p95 e p99 do
+    quadro e de cada etapa, em milissegundos. Os números só são atualizados
+    a cada PROFILER_OVERLAY_REFRESH segundos, para que o painel não
+    renderize texto a cada quadro, e usam um cache próprio, para não
+    expulsar os textos da HUD. Nas últimas linhas, quantos quadros o passo
+    fixo deixou de desenhar para alcançar o tempo real e quanto atraso
+    descartou, e quanto o governador alongou os spawns e quantos negou.
+    """
+    __slots__ = ('header_label', 'header_values', 'labels', 'values', 'catchup', 'spawns', 'rows',
+                 'catchup_values', 'spawn_values', 'next_refresh')
+    LEFT = WIDTH - 330
+    TOP = 90
+    LINE_HEIGHT = 20
+    VALUES_OFFSET = 130
+    BACK_COLOR = (20, 20, 20)
+    def __init__(self):
+        cache = TextCache(render_text, len(PROFILED_STAGES) * 16)
+        self.header_label = cache.get("etapa (ms)", 20, "yellow")
+        self.header_values = cache.get("{:>7} {:>7} {:>7}".format('p50', 'p95', 'p99'), 20, "yellow")
+        slots = len(PROFILED_STAGES) + 1
+        self.labels = [TextField(cache, "{}", 20, "white") for _ in range(slots)]
+        self.values = [TextField(cache, "{:>7.2f} {:>7.2f} {:>7.2f}", 20, "white") for _ in range(slots)]
+        self.catchup = TextField(cache, "{} quadros pulados, {:.0f} ms descartados", 20, "yellow")
+        self.spawns = TextField(cache, "spawns x{:.2f}, {} negados", 20, "yellow")
+        self.rows = []
+        self.catchup_values = (0, 0.0)
+        self.spawn_values = (1.0, 0)
+        self.next_refresh = 0.0
     def draw(self):
-        self.actor.draw()
+        now = time.perf_counter()
+        if now >= self.next_refresh:
+            self.rows = profiler.summary()
+            self.catchup_values = (timestep.skipped_frames, timestep.dropped_time * 1e3)
+            self.spawn_values = (governor.stretch, sum(governor.blocked.values()))
+            self.next_refresh = now + PROFILER_OVERLAY_REFRESH
+        rows = self.rows
+        renderer.fill(Rect(self.LEFT - 8, self.TOP - 4, WIDTH - self.LEFT, (len(rows) + 3) * self.LINE_HEIGHT + 8),
+                      self.BACK_COLOR)
+        renderer.blit(self.header_label, (self.LEFT, self.TOP))
+        renderer.blit(self.header_values, (self.LEFT + self.VALUES_OFFSET, self.TOP))
+        for i, (label, p50, p95, p99) in enumerate(rows):
+            y = self.TOP + (i + 1) * self.LINE_HEIGHT
+            renderer.blit(self.labels[i].surface(label), (self.LEFT, y))
+            renderer.blit(self.values[i].surface(p50, p95, p99), (self.LEFT + self.VALUES_OFFSET, y))
+        y = self.TOP + (len(rows) + 1) * self.LINE_HEIGHT
+        renderer.blit(self.catchup.surface(*self.catchup_values), (self.LEFT, y))
+        renderer.blit(self.spawns.surface(*self.spawn_values), (self.LEFT, y + self.LINE_HEIGHT))
 
 # ==============================================================================
 #                      FUNÇÕES DE INICIALIZAÇÃO E LÓGICA
 # ==============================================================================
 
-def setup_platforms():
-    """Cria e posiciona todas as plataformas no jogo."""
-    ground_tile = Actor('ground_grass copia')
-    ground_tile_width = ground_tile.width
-    for i in range(int(WIDTH / ground_tile_width) + 2):
-        platforms.append(Platform('ground_grass', i * ground_tile_width + (ground_tile_width // 2), HEIGHT - 20))
-    platforms.append(Platform('ground_grass', 10, 520))
-    platforms.append(Platform('ground_grass', 200, 220))
-    platforms.append(Platform('ground_grass', 400, 420))
-    platforms.append(Platform('ground_grass', 600, 220))
-    platforms.append(Platform('ground_grass', 800, 520))
-    platforms.append(Platform('ground_grass', 1000, 220))
-    platforms.append(Platform('ground_grass', 1200, 420))
-
-def spawn_coins_and_carrots():
-    """Gera moedas e cenouras em posições aleatórias nas plataformas."""
+def release_entities(objs):
+    """Devolve às pools as entidades reaproveitáveis que saíram de jogo."""
+    for obj in objs:
+        cls = type(obj)
+        pool = ENTITY_POOLS.get(cls)
+        if pool:
+            pool.release(obj)
+            # As criadas fora de spawn() (os benchmarks de estresse) não foram contadas
+            if spawned_alive[cls]:
+                spawned_alive[cls] -= 1
+
+def discard_entities(items):
+    """Esvazia uma lista de entidades, devolvendo às pools as que forem reaproveitáveis."""
+    release_entities(items)
+    items.clear()
+
+def flush_removals():
+    """Aplica as remoções adiadas e devolve às pools as entidades removidas."""
+    release_entities(removals.flush())
+
+def pool_stats():
+    """Acertos e falhas das pools de entidades, para o profiling."""
+    return {kind: pool.stats() for kind, pool in SPAWN_POOLS.items()}
+
+def spawn(kind, items, x, y):
+    """
+    Cria em (x, y) uma entidade do tipo `kind` (um nome de SPAWN_CAPS) e a
+    põe em `items`, a menos que o governador negue por já haver entidades
+    demais desse tipo. Devolve a entidade, ou None.
+    """
+    pool = SPAWN_POOLS[kind]
+    if not governor.allow(kind, spawned_alive[pool.factory]):
+        return None
+    obj = pool.acquire(x, y)
+    items.append(obj)
+    spawned_alive[pool.factory] += 1
+    return obj
+
+def preload_assets(budget=ASSET_PRELOAD_BUDGET):
+    """Carrega (e converte) mais alguns recursos do manifesto, gastando no máximo `budget` segundos."""
+    if assets.done:
+        return
+    if assets.preload_step({'images': images.load, 'sounds': sounds.load}, budget) and PRINT_ASSET_REPORT:
+        print(f"{len(assets)} recursos carregados em {sum(assets.load_times.values()) * 1000:.1f} ms")
+        for kind, name, seconds in assets.report():
+            print(f"  {seconds * 1000:7.2f} ms  {kind}/{name}")
+
+def load_chunk(chunk):
+    """
+    Cria as plataformas de um pedaço do nível que entrou na região carregada.
+    Na primeira vez as moedas e cenouras dele são sorteadas; depois voltam as
+    que sobraram quando ele foi descarregado.
+    """
+    chunk_platforms[chunk.index] = created = [Platform(image, x, y) for image, x, y in chunk.platforms]
+    if chunk.populated:
+        for item in chunk.loot:
+            (coins if isinstance(item, Coin) else carrots).append(item)
+        chunk.loot = []
+    else:
+        chunk.populated = True
+        spawn_coins_and_carrots(created)
+
+def unload_chunk(chunk):
+    """Descarta as plataformas de um pedaço que saiu da região e guarda as moedas e cenouras que sobraram nele."""
+    del chunk_platforms[chunk.index]
+    for items in (coins, carrots):
+        kept = []
+        for item in items:
+            if level.chunk_index(item.actor.x) == chunk.index:
+                chunk.loot.append(item)
+            else:
+                kept.append(item)
+        items[:] = kept
+
+def rebuild_level():
+    """Refaz a lista de plataformas, a colisão e a camada de fundo a partir dos pedaços carregados."""
+    platforms[:] = [platform for index in sorted(chunk_platforms) for platform in chunk_platforms[index]]
+    compile_level_collision()
+    renderer.set_layer('level', [platform.actor for platform in platforms])
+
+def world_bounds():
+    """Limites do eixo x para o jogador e as chamas: o nível todo, ou só a tela na luta contra o chefão."""
+    if camera.locked:
+        return camera.left, camera.right
+    return 0, level.width
+
+def respawn_point():
+    """
+    Onde o coelho volta depois de um dano: na tela atual, à mesma distância
+    da borda esquerda da câmera que o início do nível fica da borda do mundo
+    (na luta contra o chefão, a câmera travada é a arena).
+    """
+    x, y = level.player_start
+    left, right = world_bounds()
+    return (min(max(camera.left + x, left), right), y)
+
+def update_camera():
+    """
+    Faz a câmera seguir o jogador e carrega ou descarrega os pedaços do nível
+    em volta dela; inimigos que ficaram fora da região carregada somem.
+    """
+    camera.follow(player.actor.x)
+    if not streamer.update(camera.left, camera.right):
+        return
+    rebuild_level()
+    region_left, region_right = streamer.region()
+    for enemy in enemies:
+        if not region_left <= enemy.actor.x < region_right:
+            removals.remove(enemies, enemy)
+    flush_removals()
+
+def compile_level_collision():
+    """
+    Compila a geometria de colisão do nível: funde plataformas vizinhas na mesma
+    altura em faixas contínuas e indexa as faixas. O desenho continua usando os
+    blocos individuais de `platforms`.
+    """
+    global collision_spans, platform_index
+    collision_spans = merge_spans([platform.actor for platform in platforms], Rect)
+    platform_index = UniformGrid(PLATFORM_GRID_CELL, PLATFORM_GRID_CELL)
+    for span in collision_spans:
+        platform_index.insert(span)
+
+def spawn_coins_and_carrots(platforms):
+    """Gera moedas e cenouras em posições aleatórias nas plataformas dadas."""
     for p in platforms:
         if p.actor.midtop[1] < HEIGHT - 50:
             x = p.actor.x
@@ -614,179 +997,257 @@ def spawn_coins_and_carrots():
 
 def reset_game():
     """Reinicia todas as variáveis e entidades do jogo para um novo começo."""
-    global game_timer, prelude_timer, player, enemies, spawners, coins, carrots, flames, boss, menu_music_playing, menu_selection
-    try:
-        music.stop()
-    except Exception:
-        print("Erro ao tentar parar a música.")
-    menu_music_playing = False
+    global game_timer, prelude_timer, boss_fight_timer, player, enemies, spawners, coins, carrots, flames, boss, hud, menu_selection
+    global camera, streamer
+    soundtrack.stop()
+    # O que o menu não teve tempo de carregar é carregado agora, antes da partida
+    preload_assets(float('inf'))
     game_timer = 0.0
     prelude_timer = 0.0
-    player = Player(150, 0)
-    enemies.clear()
+    boss_fight_timer = 0.0
+    player = Player(*level.player_start)
+    discard_entities(enemies)
     spawners.clear()
     coins.clear()
     carrots.clear()
-    flames.clear()
+    discard_entities(flames)
+    for cls in spawned_alive:
+        spawned_alive[cls] = 0
     platforms.clear()
+    chunk_platforms.clear()
     boss = None
-    setup_platforms()
-    spawners.append(CloudSpawner(600, 30))
-    spawn_coins_and_carrots()
+    level.reset()
+    camera = Camera(WIDTH, level.width)
+    camera.follow(player.actor.x)
+    for x, y, patrol_left, patrol_right in level.spawners:
+        spawners.append(CloudSpawner(x, y, patrol_left, patrol_right))
+    streamer = ChunkStreamer(level, STREAM_MARGIN, load_chunk, unload_chunk)
+    streamer.update(camera.left, camera.right)
+    rebuild_level()
+    hud = Hud()
     menu_selection = 0
+    timestep.reset()
+    interpolation.clear()
+    governor.reset()
 
 def start_prelude_phase():
     """Ativa o comportamento de fuga para inimigos e spawners."""
     global spawners
     coins.clear()
     carrots.clear()
-    try:
-        if not is_muted:
-            sounds.boss_arriving.play()
-    except Exception:
-        print("Erro ao tentar tocar 'boss_arriving.wav'")
+    # Os pedaços ainda não visitados também ficam sem moedas e cenouras
+    for chunk in level.chunks:
+        chunk.populated = True
+        chunk.loot = []
     for enemy in enemies:
         enemy.is_fleeing = True
-        if enemy.actor.x < WIDTH / 2:
+        if enemy.actor.x < camera.center_x:
             enemy.vx = FLEEING_SPEED
         else:
             enemy.vx = -FLEEING_SPEED
     for spawner in spawners:
         spawner.is_fleeing = True
-        if spawner.actor.x < WIDTH / 2:
+        if spawner.actor.x < camera.center_x:
             spawner.vx = FLEEING_SPEED
         else:
             spawner.vx = -FLEEING_SPEED
 
 def toggle_mute():
-    """Alterna entre silenciar e reativar o áudio."""
-    global is_muted
-    is_muted = not is_muted
-    if is_muted:
-        music.stop()
-        is_muted = True
-        mute_button.image = 'mute_icon'
-    else:
-        music.play('menu_game')
-        is_muted = False
-        mute_button.image = 'unmute_icon'
+    """Alterna entre silenciar e reativar o áudio; ao reativar, volta a música da tela atual."""
+    audio.muted = soundtrack.muted = not audio.muted
+    mute_button.image = 'mute_icon' if audio.muted else 'unmute_icon'
+
+def toggle_profiler():
+    """Liga ou desliga o profiler de quadros e o painel dele."""
+    global profiler_overlay
+    if profiler.toggle() and profiler_overlay is None:
+        profiler_overlay = ProfilerOverlay()
+
+def export_profile():
+    """Grava em profiles/ os passos medidos pelo profiler, em CSV e em JSON."""
+    base = os.path.join(PROFILE_DIR, time.strftime('%Y%m%d-%H%M%S'))
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        for ext in ('csv', 'json'):
+            rows = profiler.export(f'{base}.{ext}')
+        print(f"{rows} passos exportados para {base}.csv/.json")
+    except OSError as e:
+        print(f"Erro ao exportar o perfil: {e}")
+
+def change_state(name):
+    """Troca o estado do jogo, rodando os ganchos de saída do atual e de entrada do novo."""
+    global game_state
+    states.change(name)
+    game_state = states.name
+
+def enter_menu(previous):
+    """Toca a música do menu (sem recomeçar ao ir do menu para as instruções e voltar)."""
+    soundtrack.play('menu_game')
+
+def exit_menu(next_state):
+    """Para a música do menu ao sair para a partida."""
+    if next_state not in MENU_STATES:
+        soundtrack.stop()
+
+def enter_playing(previous):
+    """Começa uma partida com a semente sorteada (ou `match_seed`) e grava a entrada dela."""
+    seed = match_seed if match_seed is not None else new_seed()
+    random.seed(seed)
+    recorder.start(seed, level.name)
+    reset_game()
+
+def enter_boss_prelude(previous):
+    """Começa o prelúdio; enquanto a chegada do chefão toca, a música da luta é decodificada."""
+    start_prelude_phase()
+    sky.start('BOSS_PRELUDE', sky.color_at('PLAYING', game_timer))
+    soundtrack.play('boss_arriving', loop=False)
+    soundtrack.prebuffer('boss_appair')
+
+def enter_boss_fight(previous):
+    """Trava a câmera onde ela está: a tela atual vira a arena do chefão."""
+    global boss
+    camera.locked = True
+    boss = Boss(camera.left)
+    soundtrack.play('boss_appair')
+
+def enter_game_over(previous):
+    soundtrack.stop()
+    finish_replay()
+
+def enter_win(previous):
+    soundtrack.stop()
+    audio.play('boss_defeat')
+    finish_replay()
+
+def finish_replay():
+    """Encerra a gravação da partida e, com SAVE_REPLAYS, grava o replay em replays/."""
+    if not recorder.active:
+        return
+    log = recorder.finish(states.name, player.score)
+    if not SAVE_REPLAYS:
+        return
+    path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{log.seed}.bbr")
+    try:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        log.save(path)
+    except OSError as e:
+        print(f"Erro ao gravar o replay: {e}")
 
 # ==============================================================================
 #                          FUNÇÕES DO LOOP PRINCIPAL
 # ==============================================================================
 
 def draw():
-    """Função de desenho principal, chamada 60 vezes por segundo."""
-    global menu_music_playing
-
-    if (game_state == 'MAIN_MENU' or game_state == 'HOW_TO_PLAY') and not menu_music_playing:
-        try:
-            music.play('menu_game')
-            menu_music_playing = True
-        except Exception:
-            print("Erro ao tentar tocar 'menu_game.mp3'")
-    elif game_state != 'MAIN_MENU' and game_state != 'HOW_TO_PLAY' and menu_music_playing:
-        try:
-            music.stop()
-        except Exception:
-            print("Erro ao tentar parar a música.")
-        menu_music_playing = False
-
-    start_color = (0, 139, 139)
-    end_color = (173, 255, 47)
-    transition_time = 120
-    progress = min(1.0, game_timer / transition_time)
-    red = int(start_color[0] + (end_color[0] - start_color[0]) * progress)
-    green = int(start_color[1] + (end_color[1] - start_color[1]) * progress)
-    blue = int(start_color[2] + (end_color[2] - start_color[2]) * progress)
-    current_color = (red, green, blue)
-    screen.fill(current_color)
-
-    if game_state == 'MAIN_MENU':
-        draw_main_menu()
-    elif game_state == 'HOW_TO_PLAY':
-        draw_how_to_play()
-    else:
-        for platform in platforms:
-            platform.draw()
-        for coin in coins:
-            coin.draw()
-        for carrot in carrots:
-            carrot.draw()
-        player.draw()
-
-        if game_state == 'PLAYING' or game_state == 'BOSS_PRELUDE':
-            for spawner in spawners:
-                spawner.draw()
-            for enemy in enemies:
-                enemy.draw()
-        elif game_state == 'BOSS_FIGHT':
-            if boss:
-                boss.draw()
-            for flame in flames:
-                flame.draw()
-
-        draw_hud()
-
-        if game_state == 'BOSS_PRELUDE':
-            if int(prelude_timer * 2) % 2 == 0:
-                screen.draw.text("Atenção: Chefe!", center=(WIDTH // 2, HEIGHT // 2), fontsize=80, color="red")
-        if game_state == 'GAMEOVER':
-            screen.draw.text("Game Over", center=(WIDTH / 2, HEIGHT / 2 - 50), fontsize=80, color="red")
-            screen.draw.text("Pressione ENTER para tentar novamente", center=(WIDTH / 2, HEIGHT / 2 + 50), fontsize=30, color="white")
-        if game_state == 'WIN':
-            screen.draw.text("Vitória!", center=(WIDTH / 2, HEIGHT / 2 - 50), fontsize=80, color="green")
-            screen.draw.text("Pressione ENTER para jogar novamente", center=(WIDTH / 2, HEIGHT / 2 + 50), fontsize=30, color="white")
-    
+    """Função de desenho principal, chamada uma vez por quadro, depois de update()."""
+    # O que se move é desenhado entre os dois últimos passos da simulação, e volta ao lugar depois
+    view_left = camera.left
+    camera.left = interpolation.apply(timestep.alpha, view_left)
+    states.draw(sky.update(game_state, sky_clock()))
+    interpolation.restore()
+    camera.left = view_left
     # Desenha o botão de mudo em todas as telas
-    mute_button.draw()
+    renderer.draw_overlay(mute_button)
+    if profiler.enabled:
+        profiler_overlay.draw()
+    if SHOW_TEXT_STATS:
+        draw_text_stats()
+
+def sky_clock():
+    """Segundos desde o início da fase atual, que indexam a linha do tempo do céu."""
+    if game_state == 'BOSS_PRELUDE':
+        return prelude_timer
+    if game_state == 'BOSS_FIGHT':
+        return boss_fight_timer
+    return game_timer
 
-def draw_main_menu():
+def draw_main_menu(color):
     """Desenha o menu principal."""
-    screen.draw.text("Bunny Brave", center=(WIDTH / 2, HEIGHT / 4), fontsize=100, color="yellow")
+    renderer.begin(screen.surface, color)
+    draw_text("Bunny Brave", center=(WIDTH / 2, HEIGHT / 4), fontsize=100, color="yellow")
     menu_options = ["Iniciar Jogo", "Como Jogar", "Sair"]
     for i, option in enumerate(menu_options):
         color = "white"
         if i == menu_selection:
             color = "red"
-        screen.draw.text(option, center=(WIDTH / 2, HEIGHT / 2 + i * 80), fontsize=50, color=color)
+        draw_text(option, center=(WIDTH / 2, HEIGHT / 2 + i * 80), fontsize=50, color=color)
 
-def draw_how_to_play():
+def draw_how_to_play(color):
     """Desenha a tela de instruções."""
-    screen.draw.text("Como Jogar", center=(WIDTH / 2, 50), fontsize=80, color="white")
-    screen.draw.text("Controles:", (50, 150), fontsize=40, color="white")
-    screen.draw.text("- Setas Esquerda/Direita: Mover o coelho", (70, 200), fontsize=30, color="white")
-    screen.draw.text("- Seta para Cima: Pular", (70, 250), fontsize=30, color="white")
-    screen.draw.text("- ESPAÇO: Atacar com a rede", (70, 300), fontsize=30, color="white")
-    screen.draw.text("Objetivos:", (50, 400), fontsize=40, color="white")
-    screen.draw.text("- Colete moedas para aumentar a pontuação.", (70, 450), fontsize=30, color="white")
-    screen.draw.text("- Colete cenouras para ativar a invencibilidade.", (70, 500), fontsize=30, color="white")
-    screen.draw.text("- Derrote inimigos para ganhar pontos e sobreviver.", (70, 550), fontsize=30, color="white")
-    screen.draw.text("- Sobreviva até a luta contra o chefão!", (70, 600), fontsize=30, color="white")
-    screen.draw.text("Pressione BACKSPACE para voltar ao menu", center=(WIDTH / 2, HEIGHT - 50), fontsize=30, color="yellow")
-
-def draw_hud():
-    """Desenha todos os elementos da interface do usuário."""
-    life_icon = Actor('lifes')
-    for i in range(player.lives):
-        screen.blit('lifes', (10 + i * (life_icon.width + 5), 10))
-    screen.draw.text(f"Pontuação: {player.score}", (WIDTH - 250, 10), fontsize=40, color="white")
-    minutes = int(game_timer / 60)
-    seconds = int(game_timer % 60)
-    screen.draw.text(f"Tempo: {minutes:02}:{seconds:02}", (WIDTH - 250, 50), fontsize=40, color="white")
-    BAR_HEIGHT = 20
-    BAR_WIDTH = 200
-    bar_x = WIDTH // 2 - BAR_WIDTH // 2
-    bar_y = HEIGHT - BAR_HEIGHT - 10
-    screen.draw.filled_rect(Rect(bar_x, bar_y, BAR_WIDTH, BAR_HEIGHT), (100, 100, 100))
-    filled_width = (player.collected_carrots / powerup_carrots_required) * BAR_WIDTH
-    screen.draw.filled_rect(Rect(bar_x, bar_y, filled_width, BAR_HEIGHT), (255, 165, 0))
-    if player.is_invincible:
-        time_left = round(powerup_duration - player.powerup_timer, 1)
-        screen.draw.text(f"INVENCÍVEL! {time_left}s", center=(WIDTH // 2, HEIGHT - BAR_HEIGHT - 35), fontsize=30, color="yellow")
-    if game_state == 'BOSS_FIGHT' and boss:
-        boss_hp_text = f"Boss HP: {boss.max_hp - boss.hits_taken} / {boss.max_hp}"
-        screen.draw.text(boss_hp_text, center=(WIDTH // 2, 20), fontsize=30, color="red")
+    renderer.begin(screen.surface, color)
+    draw_text("Como Jogar", center=(WIDTH / 2, 50), fontsize=80, color="white")
+    draw_text("Controles:", (50, 150), fontsize=40, color="white")
+    draw_text("- Setas Esquerda/Direita: Mover o coelho", (70, 200), fontsize=30, color="white")
+    draw_text("- Seta para Cima: Pular", (70, 250), fontsize=30, color="white")
+    draw_text("- ESPAÇO: Atacar com a rede", (70, 300), fontsize=30, color="white")
+    draw_text("Objetivos:", (50, 400), fontsize=40, color="white")
+    draw_text("- Colete moedas para aumentar a pontuação.", (70, 450), fontsize=30, color="white")
+    draw_text("- Colete cenouras para ativar a invencibilidade.", (70, 500), fontsize=30, color="white")
+    draw_text("- Derrote inimigos para ganhar pontos e sobreviver.", (70, 550), fontsize=30, color="white")
+    draw_text("- Sobreviva até a luta contra o chefão!", (70, 600), fontsize=30, color="white")
+    draw_text("Pressione BACKSPACE para voltar ao menu", center=(WIDTH / 2, HEIGHT - 50), fontsize=30, color="yellow")
+
+def draw_match(color):
+    """Começa um quadro da partida: o fundo com as plataformas, os colecionáveis e o jogador."""
+    # As plataformas ficam na camada estática, já composta junto com o fundo
+    renderer.begin(screen.surface, color, 'level', camera.left)
+    for coin in coins:
+        coin.draw()
+    for carrot in carrots:
+        carrot.draw()
+    player.draw()
+
+def draw_playing(color):
+    """Desenha a partida com os spawners e os inimigos."""
+    draw_match(color)
+    for spawner in spawners:
+        spawner.draw()
+    for enemy in enemies:
+        enemy.draw()
+    hud.draw()
+
+def draw_boss_prelude(color):
+    """Desenha a partida com o aviso piscante da chegada do chefão."""
+    draw_playing(color)
+    if int(prelude_timer * 2) % 2 == 0:
+        draw_text("Atenção: Chefe!", center=(WIDTH // 2, HEIGHT // 2), fontsize=80, color="red")
+
+def draw_boss_fight(color):
+    """Desenha a luta contra o chefão."""
+    draw_match(color)
+    if boss:
+        boss.draw()
+    for flame in flames:
+        flame.draw()
+    hud.draw(boss)
+
+def draw_game_over(color):
+    """Desenha a tela de derrota por cima da partida parada."""
+    draw_match(color)
+    hud.draw()
+    draw_text("Game Over", center=(WIDTH / 2, HEIGHT / 2 - 50), fontsize=80, color="red")
+    draw_text("Pressione ENTER para tentar novamente", center=(WIDTH / 2, HEIGHT / 2 + 50), fontsize=30, color="white")
+
+def draw_win(color):
+    """Desenha a tela de vitória por cima da partida parada."""
+    draw_match(color)
+    hud.draw()
+    draw_text("Vitória!", center=(WIDTH / 2, HEIGHT / 2 - 50), fontsize=80, color="green")
+    draw_text("Pressione ENTER para jogar novamente", center=(WIDTH / 2, HEIGHT / 2 + 50), fontsize=30, color="white")
+
+def draw_text(text, pos=None, center=None, fontsize=40, color="white"):
+    """Desenha um texto usando o cache de superfícies renderizadas."""
+    blit_text(text_cache.get(text, fontsize, color), pos, center)
+
+def blit_text(surface, pos=None, center=None):
+    """Desenha um texto já renderizado no canto `pos` ou centrado em `center`, como o screen.draw.text."""
+    if center is not None:
+        pos = (int(round(center[0] - 0.5 * surface.get_width())),
+               int(round(center[1] - 0.5 * surface.get_height())))
+    renderer.blit(surface, pos)
+
+def draw_text_stats():
+    """Mostra quantas renderizações de fonte aconteceram no último segundo."""
+    blit_text(text_stats_text.surface(text_cache.renders_per_second()), (10, HEIGHT - 30))
 
 def on_mouse_down(pos):
     """Lida com cliques do mouse."""
@@ -794,148 +1255,226 @@ def on_mouse_down(pos):
         toggle_mute()
 
 def on_key_down(key):
-    """Lida com pressionamento de teclas para navegação do menu."""
-    global game_state, menu_selection
-    if game_state == 'MAIN_MENU':
-        if key == keys.UP:
-            menu_selection = (menu_selection - 1 + 3) % 3
-        elif key == keys.DOWN:
-            menu_selection = (menu_selection + 1) % 3
-        elif key == keys.RETURN:
-            if menu_selection == 0:
-                reset_game()
-                game_state = 'PLAYING'
-            elif menu_selection == 1:
-                game_state = 'HOW_TO_PLAY'
-            elif menu_selection == 2:
-                exit()
-    elif game_state == 'HOW_TO_PLAY':
-        if key == keys.BACKSPACE:
-            game_state = 'MAIN_MENU'
-    elif game_state == 'GAMEOVER' or game_state == 'WIN':
-        if key == keys.RETURN:
-            game_state = 'MAIN_MENU'
+    """Lida com pressionamento de teclas: as do profiler valem em qualquer tela."""
+    if key == keys.F3:
+        toggle_profiler()
+    elif key == keys.F4:
+        export_profile()
+    else:
+        states.on_key_down(key)
+
+def key_down_main_menu(key):
+    global menu_selection
+    if key == keys.UP:
+        menu_selection = (menu_selection - 1 + 3) % 3
+    elif key == keys.DOWN:
+        menu_selection = (menu_selection + 1) % 3
+    elif key == keys.RETURN:
+        if menu_selection == 0:
+            change_state('PLAYING')
+        elif menu_selection == 1:
+            change_state('HOW_TO_PLAY')
+        elif menu_selection == 2:
+            exit()
+
+def key_down_how_to_play(key):
+    if key == keys.BACKSPACE:
+        change_state('MAIN_MENU')
+
+def key_down_end_screen(key):
+    if key == keys.RETURN:
+        change_state('MAIN_MENU')
 
 def update(dt):
-    """Função de atualização principal, chamada 60 vezes por segundo."""
-    global game_state, game_timer, prelude_timer, boss, menu_music_playing
-
-    if game_state == 'PLAYING':
-        game_timer += dt
-        player.move(dt)
-        if game_timer >= boss_fight_threshold - BOSS_PRELUDE_DURATION:
-            game_state = 'BOSS_PRELUDE'
-            start_prelude_phase()
-        update_spawners(dt)
-        update_enemies(dt)
-        update_collectibles(dt)
-        update_player_interactions()
-        update_game_entities(dt)
-    elif game_state == 'BOSS_PRELUDE':
-        prelude_timer += dt
-        update_spawners(dt)
-        update_enemies(dt)
-        update_collectibles(dt)
-        update_player_interactions()
-        player.move(dt)
-        if prelude_timer >= BOSS_PRELUDE_DURATION:
-            game_state = 'BOSS_FIGHT'
-            boss = Boss()
-            try:
-                music.play('boss_appair', loop=True)
-            except Exception:
-                print("Erro ao tentar tocar 'boss_appair.mp3'")
-    elif game_state == 'BOSS_FIGHT':
-        if not music.is_playing('boss_appair'):
-            try:
-                music.play('boss_appair', loop=True)
-            except Exception:
-                print("Erro ao tentar tocar 'boss_appair.mp3'")
-        player.move(dt)
-        boss.move(dt)
-        update_flames(dt)
-        update_player_interactions()
-        update_boss_fight_collisions(dt)
-        if boss and boss.hits_taken >= boss.max_hp:
-            game_state = 'WIN'
-            try:
-                music.stop()
-                if not is_muted:
-                    sounds.boss_defeat.play()
-            except Exception:
-                print("Erro ao tentar parar a música ou tocar 'boss_defeat.wav'")
-        elif player.lives <= 0:
-            game_state = 'GAMEOVER'
-            try:
-                music.stop()
-            except Exception:
-                print("Erro ao tentar parar a música.")
+    """
+    Função de atualização principal, chamada uma vez por quadro. O `dt` do
+    quadro vira zero ou mais passos fixos de SIMULATION_STEP segundos.
+    """
+    if profiler.enabled:
+        profiler.next_tick(recorder.tick if recorder.active else None, game_state, dt)
+    # As teclas, o dt e o nível de desaceleração dos spawns de cada quadro da partida vão para o replay
+    if recorder.active:
+        recorder.record(keyboard, dt, governor.level)
+    steps = timestep.advance(dt)
+    start = time.perf_counter()
+    for step in range(steps):
+        if step == steps - 1 and player is not None:
+            interpolation.capture(moving_actors(), camera.left)
+        states.update(SIMULATION_STEP)
+    if steps:
+        governor.measure((time.perf_counter() - start) / steps)
+    # Os sons pedidos durante o quadro tocam todos de uma vez, aqui
+    audio.flush()
+
+def moving_actors():
+    """Os atores que andam a cada passo: o coelho e a rede, as nuvens, os inimigos, o chefão e as chamas."""
+    actors = [player.actor, player.net]
+    actors += [spawner.actor for spawner in spawners]
+    actors += [enemy.actor for enemy in enemies]
+    actors += [flame.actor for flame in flames]
+    if boss is not None:
+        actors.append(boss.actor)
+    return actors
+
+def update_menu(dt):
+    """No menu e nas instruções o jogo só adianta o carregamento dos recursos."""
+    preload_assets()
+
+def update_playing(dt):
+    global game_timer
+    game_timer += dt
+    player.move(dt)
+    update_camera()
+    if game_timer >= boss_fight_threshold - BOSS_PRELUDE_DURATION:
+        change_state('BOSS_PRELUDE')
+    update_spawners(dt)
+    update_entities(dt)
+    update_player_interactions()
+
+def update_boss_prelude(dt):
+    global prelude_timer
+    prelude_timer += dt
+    update_spawners(dt)
+    update_entities(dt)
+    update_player_interactions()
+    player.move(dt)
+    update_camera()
+    if prelude_timer >= BOSS_PRELUDE_DURATION:
+        change_state('BOSS_FIGHT')
+
+def update_boss_fight(dt):
+    global boss_fight_timer
+    boss_fight_timer += dt
+    player.move(dt)
+    update_camera()
+    boss.move(dt)
+    update_flames(dt)
+    update_animations(dt)
+    update_player_interactions()
+    update_boss_fight_collisions(dt)
+    # A derrota já troca de estado em Player.take_damage()
+    if boss and boss.hits_taken >= boss.max_hp:
+        change_state('WIN')
 
 def update_spawners(dt):
-    """Atualiza todos os spawners."""
+    """Atualiza os spawners perto da câmera; os mais longe ficam parados até o jogador chegar."""
     global spawners
+    active_left = camera.left - STREAM_MARGIN
+    active_right = camera.right + STREAM_MARGIN
     for spawner in list(spawners):
-        spawner.move(dt)
-        if spawner.is_fleeing and (spawner.actor.x > WIDTH + 50 or spawner.actor.x < -50):
-            spawners.remove(spawner)
+        if spawner.is_fleeing:
+            spawner.move(dt)
+            if spawner.actor.x > camera.right + 50 or spawner.actor.x < camera.left - 50:
+                spawners.remove(spawner)
+        elif active_left <= spawner.actor.x <= active_right:
+            spawner.move(dt)
+
+def update_entities(dt):
+    """Atualiza os inimigos e depois a animação de tudo que é animado."""
+    update_enemies(dt)
+    update_animations(dt)
+
+def enable_batched_enemies(enabled=True):
+    """Liga ou desliga o passo vetorizado (NumPy) do movimento dos inimigos."""
+    global batched_enemies
+    if not enabled:
+        batched_enemies = None
+    elif BatchedEnemies is None:
+        raise RuntimeError("O passo vetorizado dos inimigos requer NumPy.")
+    else:
+        batched_enemies = BatchedEnemies(ENEMY_FOLLOW_SPEED, FLYMAN_FOLLOW_SPEED, FLEEING_SPEED,
+                                         GRAVITY, WIDTH)
 
 def update_enemies(dt):
     """Atualiza todos os inimigos."""
-    for enemy in list(enemies):
-        enemy.move(dt)
-        if enemy.actor.y > HEIGHT + 50:
-            enemies.remove(enemy)
+    if batched_enemies is not None:
+        batched_enemies.step(enemies, player.actor, collision_spans, dt, camera.left)
+        for enemy in enemies:
+            if enemy.actor.y > HEIGHT + 50:
+                removals.remove(enemies, enemy)
+    else:
+        for enemy in enemies:
+            enemy.move(dt)
+            if enemy.actor.y > HEIGHT + 50:
+                removals.remove(enemies, enemy)
+    flush_removals()
 
 def update_flames(dt):
     """Atualiza todas as chamas."""
     for flame in list(flames):
         flame.move(dt)
+    flush_removals()
 
-def update_collectibles(dt):
-    """Atualiza a lógica de coleta de moedas e cenouras."""
-    for coin in list(coins):
-        coin.animate(dt)
-        if player.actor.colliderect(coin.actor):
-            player.score += coin.points
-            try:
-                if not is_muted:
-                    sounds.coin_catch.play()
-            except Exception:
-                print("Erro ao tentar tocar 'coin_catch.wav'")
-            coins.remove(coin)
-    for carrot in list(carrots):
-        carrot.animate(dt)
-        if player.actor.colliderect(carrot.actor):
-            player.collected_carrots += 1
-            if player.collected_carrots >= powerup_carrots_required:
-                player.activate_powerup()
-            try:
-                if not is_muted:
-                    sounds.bunny_eat.play()
-            except Exception:
-                print("Erro ao tentar tocar 'bunny_eat.wav'")
-            carrots.remove(carrot)
+def update_animations(dt):
+    """
+    Avança numa única passagem as animações do jogador, dos inimigos, das
+    moedas e do chefão. Cenouras e chamas têm uma imagem só e ficam de fora.
+    """
+    animations.update(dt, (player,), enemies, coins, (boss,) if boss is not None else ())
 
 def update_player_interactions():
-    """Verifica interações do jogador com inimigos e colecionáveis."""
-    for enemy in list(enemies):
-        if player.is_attacking and player.net.colliderect(enemy.actor):
-            player.score += 50
-            try:
-                if not is_muted:
-                    sounds.net_impact.play()
-                    sounds.enemy_defeat.play()
-            except Exception:
-                print("Erro ao tentar tocar 'net_impact.wav' ou 'enemy_defeat.wav'")
-            enemies.remove(enemy)
-            continue
-        if player.actor.colliderect(enemy.actor):
-            player.take_damage()
-    for flame in list(flames):
-        if player.actor.colliderect(flame.actor):
-            if not player.is_invincible:
-                player.take_damage()
-                flames.remove(flame)
+    """Verifica, numa única passagem, as interações do jogador com moedas, cenouras, inimigos e chamas."""
+    broadphase.clear()
+    broadphase.add_group('coin', coins)
+    broadphase.add_group('carrot', carrots)
+    broadphase.add_group('enemy', enemies)
+    broadphase.add_group('flame', flames)
+    probes = [('player', player.actor)]
+    if player.is_attacking:
+        probes.extend(('net', rect) for rect in player.net_hitboxes)
+    lives = player.lives
+    alive = None
+    for group, obj, touched in broadphase.collisions(probes):
+        if player.lives != lives and group in ('enemy', 'flame'):
+            # O dano já levou o coelho de volta e descartou inimigos e chamas; os toques
+            # seguintes foram achados com a posição antiga, então só valem os da rede nos que restaram
+            if alive is None:
+                alive = {id(item) for items in (enemies, flames) for item in items}
+            touched = [tag for tag in touched if tag != 'player']
+            if not touched or id(obj) not in alive:
+                continue
+        PLAYER_INTERACTIONS[group](obj, touched)
+    flush_removals()
+
+def collect_coin(coin, touched):
+    """Soma os pontos da moeda tocada pelo jogador."""
+    if 'player' in touched:
+        player.score += coin.points
+        audio.play('coin_catch')
+        removals.remove(coins, coin)
+
+def collect_carrot(carrot, touched):
+    """Conta a cenoura tocada pelo jogador e ativa o power-up quando houver o bastante."""
+    if 'player' in touched:
+        player.collected_carrots += 1
+        if player.collected_carrots >= powerup_carrots_required:
+            player.activate_powerup()
+        audio.play('bunny_eat')
+        removals.remove(carrots, carrot)
+
+def touch_enemy(enemy, touched):
+    """Derrota o inimigo pego pela rede ou causa dano ao jogador que encostar nele."""
+    if 'net' in touched:
+        player.score += 50
+        audio.play('net_impact')
+        audio.play('enemy_defeat')
+        removals.remove(enemies, enemy)
+    elif 'player' in touched:
+        player.take_damage()
+
+def touch_flame(flame, touched):
+    """Causa dano ao jogador atingido por uma chama."""
+    if 'player' in touched and not player.is_invincible:
+        player.take_damage()
+        removals.remove(flames, flame)
+
+# Tratamento das interações por tipo de entidade candidata da fase ampla
+PLAYER_INTERACTIONS = {
+    'coin': collect_coin,
+    'carrot': collect_carrot,
+    'enemy': touch_enemy,
+    'flame': touch_flame,
+}
 
 def update_boss_fight_collisions(dt):
     """Lógica de colisão durante a luta contra o chefe."""
@@ -944,49 +1483,34 @@ def update_boss_fight_collisions(dt):
                        boss.actor.y - boss.actor.height // 2 + 20,
                        boss.actor.width - 40,
                        boss.actor.height - 40)
-    if player.is_attacking and player.net.colliderect(boss_hitbox):
+    if player.is_attacking and any(boss_hitbox.colliderect(rect) for rect in player.net_hitboxes):
         if not boss.is_invincible:
-            try:
-                if not is_muted:
-                    sounds.net_impact.play()
-            except Exception:
-                print("Erro ao tentar tocar 'net_impact.wav'")
-        if boss.take_damage():
-            game_state = 'WIN'
+            audio.play('net_impact')
+        boss.take_damage()
     if not player.is_invincible and player.actor.colliderect(boss_hitbox):
         player.take_damage()
 
-def update_game_entities(dt):
-    """Atualiza moedas e inimigos."""
-    for coin in coins:
-        coin.animate(dt)
-    for enemy in list(enemies):
-        enemy.move(dt)
-        # remove inimigos que caíram da tela
-        if enemy.actor.y > HEIGHT:
-            enemies.remove(enemy)
-    if game_state == 'BOSS_FIGHT' and boss:
-        boss.move(dt)
-    for coin in list(coins):
-        if player.actor.colliderect(coin.actor):
-            player.score += coin.points
-            try:
-                if not is_muted:
-                    sounds.coin_catch.play()
-            except Exception:
-                print("Erro ao tentar tocar 'coin_catch.wav'")
-            coins.remove(coin)
-    for carrot in list(carrots):
-        if player.actor.colliderect(carrot.actor):
-            player.collected_carrots += 1
-            if player.collected_carrots >= powerup_carrots_required:
-                player.activate_powerup()
-            try:
-                if not is_muted:
-                    sounds.bunny_eat.play()
-            except Exception:
-                print("Erro ao tentar tocar 'bunny_eat.wav'")
-            carrots.remove(carrot)
+# ==============================================================================
+#                              ESTADOS DO JOGO
+# ==============================================================================
+
+MENU_STATES = ('MAIN_MENU', 'HOW_TO_PLAY')
+
+states = StateMachine([
+    State('MAIN_MENU', update=update_menu, draw=draw_main_menu, on_key_down=key_down_main_menu,
+          enter=enter_menu, exit=exit_menu),
+    State('HOW_TO_PLAY', update=update_menu, draw=draw_how_to_play, on_key_down=key_down_how_to_play,
+          enter=enter_menu, exit=exit_menu),
+    State('PLAYING', update=update_playing, draw=draw_playing, enter=enter_playing),
+    State('BOSS_PRELUDE', update=update_boss_prelude, draw=draw_boss_prelude, enter=enter_boss_prelude),
+    State('BOSS_FIGHT', update=update_boss_fight, draw=draw_boss_fight, enter=enter_boss_fight),
+    State('GAMEOVER', draw=draw_game_over, on_key_down=key_down_end_screen, enter=enter_game_over),
+    State('WIN', draw=draw_win, on_key_down=key_down_end_screen, enter=enter_win),
+])
+states.start(game_state)
+
+if USE_BATCHED_ENEMIES:
+    enable_batched_enemies()
 
 # Inicializa o botão de mudo
 mute_button = Actor('unmute_icon')
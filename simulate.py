@@ -0,0 +1,248 @@
+"""
+Simulação em lote do Bunny Brave, para calibrar a dificuldade.
+
+Joga muitas partidas headless (`random` semeado e um bot no lugar do
+teclado) num pool de processos, um por núcleo, e resume os resultados:
+tempo de sobrevivência, distribuição da pontuação, taxa de vitória contra o
+chefão, fase em que o coelho perdeu e picos de entidades na tela.
+
+Cada processo carrega o game.py uma única vez e joga em sequência as
+partidas que recebe. Como cada partida tem a sua semente, o resultado não
+depende de quantos processos foram usados, e todas as configurações de um
+--sweep jogam com as mesmas sementes.
+
+Uso:
+    python simulate.py                      # 200 partidas com o bot 'fighter'
+    python simulate.py --matches 2000 --workers 8
+    python simulate.py --set boss_fight_threshold=90 --set powerup_carrots_required=6
+    python simulate.py --sweep difficulty_ramp_seconds=60,90,120
+    python simulate.py --scaling            # partidas/s com 1, 2, 4... processos
+    python simulate.py --json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+from engine.headless import MAX_MATCH_SECONDS, SCRIPTS, HeadlessGame
+
+# Parâmetros de dificuldade do game.py que podem ser trocados com --set e --sweep.
+# O second_spawner_threshold fica de fora: nenhuma parte do jogo o lê.
+TUNABLES = (
+    'boss_fight_threshold',
+    'difficulty_ramp_seconds',
+    'powerup_carrots_required',
+    'powerup_duration',
+    'boss_invincibility_duration',
+    'boss_attack_cooldown_min',
+    'boss_attack_cooldown_max',
+)
+
+# ==============================================================================
+#                      PROCESSOS DO POOL
+# ==============================================================================
+
+# Em cada processo: o jogo carregado e os valores originais dos parâmetros
+_runner = None
+_defaults = None
+
+def init_worker(script, level):
+    global _runner, _defaults
+    _runner = HeadlessGame(script=script, level=level)
+    _defaults = {name: getattr(_runner.game, name) for name in TUNABLES}
+
+def play_match(task):
+    """Joga a partida da semente `seed` com os parâmetros `overrides` e devolve o resumo dela."""
+    config, seed, overrides, max_seconds = task
+    runner = _runner
+    game = runner.game
+    for name, value in {**_defaults, **overrides}.items():
+        setattr(game, name, value)
+    runner.seed = seed
+    peaks = {'enemies': 0, 'flames': 0, 'entities': 0}
+    last_state = ['PLAYING']
+    def on_tick(runner):
+        enemies, flames = len(game.enemies), len(game.flames)
+        peaks['enemies'] = max(peaks['enemies'], enemies)
+        peaks['flames'] = max(peaks['flames'], flames)
+        peaks['entities'] = max(peaks['entities'],
+                                enemies + flames + len(game.spawners) + len(game.coins) + len(game.carrots))
+        last_state[0] = game.game_state
+    runner.run_match(max_seconds, on_tick)
+    outcome = game.game_state if runner.finished() else 'TIMEOUT'
+    return {
+        'config': config,
+        'seed': seed,
+        'outcome': outcome,
+        'ended_in': last_state[0],
+        'seconds': runner.tick * runner.dt,
+        'score': game.player.score,
+        'lives': max(game.player.lives, 0),
+        'reached_boss': game.boss is not None,
+        'boss_hits': game.boss.hits_taken if game.boss is not None else 0,
+        'peak_enemies': peaks['enemies'],
+        'peak_flames': peaks['flames'],
+        'peak_entities': peaks['entities'],
+    }
+
+def run_batch(tasks, workers, script, level):
+    """Joga todas as partidas de `tasks` com `workers` processos; devolve os resultados e os segundos gastos."""
+    start = time.perf_counter()
+    if workers <= 1:
+        init_worker(script, level)
+        results = [play_match(task) for task in tasks]
+    else:
+        # Pedaços pequenos o bastante para equilibrar os processos até o fim
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with multiprocessing.Pool(workers, initializer=init_worker, initargs=(script, level)) as pool:
+            results = list(pool.imap_unordered(play_match, tasks, chunksize))
+            # O SDL dos processos trata o SIGTERM como um pedido de saída do jogo, então o
+            # terminate() da saída do `with` ficaria esperando: eles são encerrados antes
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    results.sort(key=lambda r: (r['config'], r['seed']))
+    return results, elapsed
+
+# ==============================================================================
+#                      RESUMO DOS RESULTADOS
+# ==============================================================================
+
+def percentile(values, point):
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    last = len(ordered) - 1
+    return ordered[min(last, int(round(last * point / 100)))]
+
+def summarize(results):
+    """Estatísticas de um conjunto de partidas jogadas com a mesma configuração."""
+    count = len(results)
+    wins = sum(r['outcome'] == 'WIN' for r in results)
+    reached = sum(r['reached_boss'] for r in results)
+    seconds = [r['seconds'] for r in results]
+    scores = [r['score'] for r in results]
+    losses = {}
+    for r in results:
+        if r['outcome'] == 'GAMEOVER':
+            losses[r['ended_in']] = losses.get(r['ended_in'], 0) + 1
+    return {
+        'matches': count,
+        'win_rate': wins / count,
+        'boss_reached_rate': reached / count,
+        'boss_win_rate': wins / reached if reached else 0.0,
+        'timeouts': sum(r['outcome'] == 'TIMEOUT' for r in results),
+        'losses_by_state': losses,
+        'survival_seconds': {'mean': sum(seconds) / count, 'p10': percentile(seconds, 10),
+                             'p50': percentile(seconds, 50), 'p90': percentile(seconds, 90)},
+        'score': {'mean': sum(scores) / count, 'p10': percentile(scores, 10), 'p50': percentile(scores, 50),
+                  'p90': percentile(scores, 90), 'max': max(scores)},
+        'peak_enemies': {'mean': sum(r['peak_enemies'] for r in results) / count,
+                         'max': max(r['peak_enemies'] for r in results)},
+        'peak_flames': max(r['peak_flames'] for r in results),
+        'peak_entities': max(r['peak_entities'] for r in results),
+    }
+
+def describe(overrides):
+    return ' '.join(f'{name}={value}' for name, value in overrides.items()) or 'padrão'
+
+def print_summaries(configs, summaries):
+    print(f"{'configuração':<36} {'vitória':>8} {'chefão':>7} {'vit/chefão':>10} "
+          f"{'sobrev. p10/p50/p90 (s)':>24} {'pontos p10/p50/p90':>19} {'pico inim.':>10}")
+    for overrides, s in zip(configs, summaries):
+        survival, score = s['survival_seconds'], s['score']
+        print(f"{describe(overrides):<36} {s['win_rate']:>8.1%} {s['boss_reached_rate']:>7.1%} "
+              f"{s['boss_win_rate']:>10.1%} "
+              f"{survival['p10']:>8.0f}/{survival['p50']:.0f}/{survival['p90']:<7.0f} "
+              f"{score['p10']:>9}/{score['p50']}/{score['p90']:<5} {s['peak_enemies']['max']:>10}")
+    print("derrotas por fase:")
+    for overrides, s in zip(configs, summaries):
+        losses = ', '.join(f'{state} {count}' for state, count in sorted(s['losses_by_state'].items()))
+        timeouts = f", {s['timeouts']} sem fim" if s['timeouts'] else ''
+        print(f"  {describe(overrides):<34} {losses or 'nenhuma'}{timeouts}")
+
+# ==============================================================================
+#                      LINHA DE COMANDO
+# ==============================================================================
+
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def parse_assignment(text, multiple=False):
+    """'nome=valor' (ou 'nome=v1,v2,...' com `multiple`) de um parâmetro de TUNABLES."""
+    name, sep, value = text.partition('=')
+    if not sep or name not in TUNABLES:
+        raise argparse.ArgumentTypeError(f"use nome=valor com um destes nomes: {', '.join(TUNABLES)}")
+    try:
+        if multiple:
+            return name, [parse_value(v) for v in value.split(',')]
+        return name, parse_value(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inválido para {name}: {value}") from None
+
+def build_configs(args):
+    base = dict(args.set)
+    if args.sweep is None:
+        return [base]
+    name, values = args.sweep
+    return [{**base, name: value} for value in values]
+
+def run_scaling(args, tasks):
+    """Joga o mesmo lote com 1, 2, 4... processos e mostra o ganho de cada um."""
+    counts = []
+    workers = 1
+    while workers < args.workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.workers)
+    baseline = None
+    print(f"{len(tasks)} partidas com o bot '{args.script}' ({os.cpu_count()} núcleos)")
+    print(f"{'processos':>9} {'partidas/s':>11} {'ganho':>7}")
+    for workers in counts:
+        _, elapsed = run_batch(tasks, workers, args.script, args.level)
+        rate = len(tasks) / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>9} {rate:>11.2f} {rate / baseline:>6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--matches', type=int, default=200, help='partidas por configuração')
+    parser.add_argument('--seed', type=int, default=0, help='primeira semente')
+    parser.add_argument('--script', choices=sorted(SCRIPTS), default='fighter', help='bot que joga as partidas')
+    parser.add_argument('--level', default=None, help='nível em levels/ (padrão: o do game.py)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='processos do pool')
+    parser.add_argument('--max-seconds', type=float, default=MAX_MATCH_SECONDS,
+                        help='limite de tempo de jogo por partida')
+    parser.add_argument('--set', type=parse_assignment, action='append', default=[], metavar='NOME=VALOR',
+                        help='troca um parâmetro de dificuldade em todas as partidas')
+    parser.add_argument('--sweep', type=lambda text: parse_assignment(text, multiple=True),
+                        metavar='NOME=V1,V2,...', help='joga o lote uma vez para cada valor do parâmetro')
+    parser.add_argument('--scaling', action='store_true', help='mede partidas/s com 1, 2, 4... processos')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+    configs = build_configs(args)
+    tasks = [(index, seed, overrides, args.max_seconds)
+             for index, overrides in enumerate(configs)
+             for seed in range(args.seed, args.seed + args.matches)]
+    if args.scaling:
+        run_scaling(args, tasks)
+        return
+    results, elapsed = run_batch(tasks, args.workers, args.script, args.level)
+    summaries = [summarize([r for r in results if r['config'] == index]) for index in range(len(configs))]
+    if args.json:
+        print(json.dumps({
+            'script': args.script, 'matches': args.matches, 'workers': args.workers, 'seconds': elapsed,
+            'configs': [{'overrides': overrides, 'summary': summary}
+                        for overrides, summary in zip(configs, summaries)],
+        }, indent=2))
+        return
+    print(f"Bot '{args.script}', {args.matches} partidas por configuração, {args.workers} processo(s): "
+          f"{len(tasks)} partidas em {elapsed:.1f}s ({len(tasks) / elapsed:.1f} partidas/s)")
+    print_summaries(configs, summaries)
+
+if __name__ == '__main__':
+    main()